@@ -1,20 +1,8 @@
-# New function to send WhatsApp message
+from utils.whatsapp_sender import whatsapp_sender
+
+# Send a WhatsApp text reply through the shared, rate-limited sender
 async def send_whatsapp_message(sender, reply_text):
-    url = f"https://graph.facebook.com/v15.0/{PHONE_NUMBER_ID}/messages"
-    headers = {
-        "Authorization": f"Bearer {ACCESS_TOKEN}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "messaging_product": "whatsapp",
-        "to": sender,
-        "text": {"body": reply_text}
-    }
-
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, json=payload)
-
-    return response.status_code == 200
+    return await whatsapp_sender.send_text(sender, reply_text)
 
 
 import sqlite3
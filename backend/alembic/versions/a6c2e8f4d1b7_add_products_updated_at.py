@@ -0,0 +1,43 @@
+"""add products.updated_at for report cache versions
+
+Revision ID: a6c2e8f4d1b7
+Revises: e3b9d4f1c6a2
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c2e8f4d1b7'
+down_revision: Union[str, Sequence[str], None] = 'e3b9d4f1c6a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table_name: str):
+    """Column names of a table, None if it does not exist yet (create_all adds the column itself)"""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return None
+    return {column['name'] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Offline (--sql) runs cannot inspect the database; emit the statement
+    columns = set() if op.get_context().as_sql else _columns('products')
+    # Nullable with no default so the column is added without rewriting the table;
+    # the ORM fills it on every insert and update from now on
+    if columns is not None and 'updated_at' not in columns:
+        op.add_column('products', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    columns = {'updated_at'} if op.get_context().as_sql else _columns('products')
+    if columns and 'updated_at' in columns:
+        op.drop_column('products', 'updated_at')
@@ -0,0 +1,50 @@
+"""add report_jobs for background report rendering and delivery
+
+Revision ID: b7d1e5a9c3f2
+Revises: a6c2e8f4d1b7
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d1e5a9c3f2'
+down_revision: Union[str, Sequence[str], None] = 'a6c2e8f4d1b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('report_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('seller_id', sa.Integer(), nullable=False),
+    sa.Column('report_type', sa.String(), nullable=False),
+    sa.Column('params', sa.Text(), nullable=False),
+    sa.Column('seller_info', sa.Text(), nullable=False),
+    sa.Column('deliver_to', sa.String(), nullable=True),
+    sa.Column('language', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('cache_key', sa.String(), nullable=True),
+    sa.Column('delivery_status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Workers claim the oldest queued job: WHERE status = 'queued' ORDER BY id
+    op.create_index('ix_report_jobs_status_id', 'report_jobs', ['status', 'id'], unique=False)
+    op.create_index('ix_report_jobs_seller_id', 'report_jobs', ['seller_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_report_jobs_seller_id', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_status_id', table_name='report_jobs')
+    op.drop_table('report_jobs')
@@ -0,0 +1,70 @@
+"""add indexes for hot query predicates
+
+Revision ID: c4a7e1d9b2f3
+Revises: 900000000000
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e1d9b2f3'
+down_revision: Union[str, Sequence[str], None] = '900000000000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns) for the btree indexes
+INDEXES = [
+    # update-stock and check-stock look products up by seller and name
+    ('ix_products_seller_id_name', 'products', ['seller_id', 'name']),
+    # low-stock filters by seller and stock < threshold
+    ('ix_products_seller_id_stock', 'products', ['seller_id', 'stock']),
+    # reports filter orders by date range
+    ('ix_orders_date', 'orders', ['date']),
+    # buyer discovery matches sellers by category and pincode
+    ('ix_sellers_category_pincode', 'sellers', ['category', 'pincode']),
+]
+
+
+def _has_table(table_name: str) -> bool:
+    # Offline (--sql) runs cannot inspect the database; emit every statement
+    if op.get_context().as_sql:
+        return True
+    conn = op.get_bind()
+    return conn.dialect.has_table(conn, table_name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if _has_table(table):
+                op.create_index(name, table, columns, unique=False,
+                                postgresql_concurrently=True, if_not_exists=True)
+
+        if is_postgres and _has_table('products'):
+            # Trigram index for the check-stock ilike('%name%') search
+            op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            op.create_index('ix_products_name_trgm', 'products', ['name'], unique=False,
+                            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+
+    with op.get_context().autocommit_block():
+        if is_postgres and _has_table('products'):
+            op.drop_index('ix_products_name_trgm', table_name='products',
+                          postgresql_concurrently=True, if_exists=True)
+        for name, table, columns in reversed(INDEXES):
+            if _has_table(table):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,43 @@
+"""add (seller_id, id) index for keyset-paginated product listings
+
+Revision ID: c9e4a2f7b1d6
+Revises: b7d1e5a9c3f2
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e4a2f7b1d6'
+down_revision: Union[str, Sequence[str], None] = 'b7d1e5a9c3f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(table_name: str) -> bool:
+    # Offline (--sql) runs cannot inspect the database; emit every statement
+    if op.get_context().as_sql:
+        return True
+    conn = op.get_bind()
+    return conn.dialect.has_table(conn, table_name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Product listings page with WHERE seller_id = :s AND id > :cursor ORDER BY id
+    with op.get_context().autocommit_block():
+        if _has_table('products'):
+            op.create_index('ix_products_seller_id_id', 'products', ['seller_id', 'id'], unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        if _has_table('products'):
+            op.drop_index('ix_products_seller_id_id', table_name='products',
+                          postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,42 @@
+"""add products.version for conditional stock updates
+
+Revision ID: d2f6a8c4e1b9
+Revises: c9e4a2f7b1d6
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6a8c4e1b9'
+down_revision: Union[str, Sequence[str], None] = 'c9e4a2f7b1d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table_name: str):
+    """Column names of a table, None if it does not exist yet (create_all adds the column itself)"""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return None
+    return {column['name'] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Offline (--sql) runs cannot inspect the database; emit the statement
+    columns = set() if op.get_context().as_sql else _columns('products')
+    # A constant server default fills existing rows without rewriting the table on PostgreSQL 11+
+    if columns is not None and 'version' not in columns:
+        op.add_column('products', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    columns = {'version'} if op.get_context().as_sql else _columns('products')
+    if columns and 'version' in columns:
+        op.drop_column('products', 'version')
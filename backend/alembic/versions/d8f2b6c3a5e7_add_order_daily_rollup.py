@@ -0,0 +1,47 @@
+"""add order daily rollup and rollup checkpoints
+
+Revision ID: d8f2b6c3a5e7
+Revises: c4a7e1d9b2f3
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f2b6c3a5e7'
+down_revision: Union[str, Sequence[str], None] = 'c4a7e1d9b2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('order_daily_rollup',
+    sa.Column('seller_id', sa.Integer(), nullable=False),
+    sa.Column('product', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('seller_id', 'product', 'day')
+    )
+    op.create_index('ix_order_daily_rollup_seller_id_day', 'order_daily_rollup', ['seller_id', 'day'], unique=False)
+    op.create_table('rollup_checkpoints',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('last_order_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Run `python backend/rollup_orders.py --backfill` afterwards to load history
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rollup_checkpoints')
+    op.drop_index('ix_order_daily_rollup_seller_id_day', table_name='order_daily_rollup')
+    op.drop_table('order_daily_rollup')
@@ -0,0 +1,44 @@
+"""add orders (buyer, date) index for the customer report
+
+Revision ID: e3b9d4f1c6a2
+Revises: d8f2b6c3a5e7
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b9d4f1c6a2'
+down_revision: Union[str, Sequence[str], None] = 'd8f2b6c3a5e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(table_name: str) -> bool:
+    # Offline (--sql) runs cannot inspect the database; emit every statement
+    if op.get_context().as_sql:
+        return True
+    conn = op.get_bind()
+    return conn.dialect.has_table(conn, table_name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        if _has_table('orders'):
+            # /seller/customers/report groups and pages orders by buyer within a date range
+            op.create_index('ix_orders_buyer_date', 'orders', ['buyer', 'date'], unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        if _has_table('orders'):
+            op.drop_index('ix_orders_buyer_date', table_name='orders',
+                          postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,49 @@
+"""add inventory_changes change feed and feed_checkpoints
+
+Revision ID: e7c3a9f5d2b8
+Revises: d2f6a8c4e1b9
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c3a9f5d2b8'
+down_revision: Union[str, Sequence[str], None] = 'd2f6a8c4e1b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('inventory_changes',
+    sa.Column('seq', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('seller_id', sa.Integer(), nullable=True),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('stock', sa.Integer(), nullable=True),
+    sa.Column('previous_stock', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+    # A seller's latest change versions their inventory report: max(seq) WHERE seller_id = ?
+    op.create_index('ix_inventory_changes_seller_id_seq', 'inventory_changes', ['seller_id', 'seq'], unique=False)
+    op.create_table('feed_checkpoints',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('last_seq', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('feed_checkpoints')
+    op.drop_index('ix_inventory_changes_seller_id_seq', table_name='inventory_changes')
+    op.drop_table('inventory_changes')
@@ -0,0 +1,41 @@
+"""add sellers.whatsapp_number for low stock digests
+
+Revision ID: f1b5d7e3c9a4
+Revises: e7c3a9f5d2b8
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b5d7e3c9a4'
+down_revision: Union[str, Sequence[str], None] = 'e7c3a9f5d2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table_name: str):
+    """Column names of a table, None if it does not exist yet (create_all adds the column itself)"""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return None
+    return {column['name'] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Offline (--sql) runs cannot inspect the database; emit the statement
+    columns = set() if op.get_context().as_sql else _columns('sellers')
+    if columns is not None and 'whatsapp_number' not in columns:
+        op.add_column('sellers', sa.Column('whatsapp_number', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    columns = {'whatsapp_number'} if op.get_context().as_sql else _columns('sellers')
+    if columns and 'whatsapp_number' in columns:
+        op.drop_column('sellers', 'whatsapp_number')
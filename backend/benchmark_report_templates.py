@@ -0,0 +1,145 @@
+"""
+Benchmark the PDF report builders against the pre-template builders.
+
+Renders inventory and sales reports of 1k and 10k rows with the current
+builders (shared styles from utils/report_template.py, range status commands,
+fixed row heights) and with a copy of the builders as they were before the
+template module (stylesheet and paragraph styles rebuilt per call, one status
+command per row, every row height measured), and prints the median CPU time
+of each.
+
+Usage:
+    python backend/benchmark_report_templates.py
+    python backend/benchmark_report_templates.py --rows 1000 10000 --runs 5
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import io
+import itertools
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, TableStyle
+
+from routes.inventory import generate_inventory_pdf_report, inventory_status
+from routes.reports import generate_pdf_report, order_table_row
+from utils.report_streaming import StreamedFlowables, REPORT_TABLE_CHUNK_ROWS
+from utils.report_template import REPORT_TABLE_STYLE
+
+SELLER = {"email": "bench@example.com", "name": "Bench Seller"}
+
+
+def make_products(count: int):
+    return [{"id": i, "name": f"Product {i}", "stock": (i * 7) % 25} for i in range(count)]
+
+
+def make_orders(count: int):
+    start = datetime(2025, 6, 1)
+    return [{"id": i, "product": f"Product {i % 300}", "quantity": i % 9 + 1, "price": 10.0 + i % 50,
+             "date": start + timedelta(minutes=i)} for i in range(count)]
+
+
+def _legacy_tables(header, rows, col_widths, row_style=None):
+    """table_chunks as it was: measured row heights and one style command per status cell"""
+    chunk, extra_styles = [list(header)], []
+    for row in rows:
+        if row_style is not None:
+            extra_styles.extend(row_style(row, len(chunk)))
+        chunk.append(row)
+        if len(chunk) > REPORT_TABLE_CHUNK_ROWS:
+            table = LongTable(chunk, colWidths=col_widths, repeatRows=1)
+            table.setStyle(TableStyle(REPORT_TABLE_STYLE + extra_styles))
+            yield table
+            chunk, extra_styles = [list(header)], []
+    if len(chunk) > 1:
+        table = LongTable(chunk, colWidths=col_widths, repeatRows=1)
+        table.setStyle(TableStyle(REPORT_TABLE_STYLE + extra_styles))
+        yield table
+
+
+def _legacy_status_style(row, index):
+    if row[3] == "Out of Stock":
+        return [('TEXTCOLOR', (3, index), (3, index), colors.red)]
+    elif row[3] == "Low Stock":
+        return [('TEXTCOLOR', (3, index), (3, index), colors.orange)]
+    return []
+
+
+def _legacy_report(title, info_text, summary_text, tables):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    seller_style = ParagraphStyle('SellerInfo', parent=styles['Normal'], fontSize=10, leading=12)
+    summary_style = ParagraphStyle('Summary', parent=styles['Normal'], fontSize=12, leading=14, spaceAfter=12)
+    elements = [
+        Paragraph(title, styles["Title"]), Spacer(1, 0.25*inch),
+        Paragraph(info_text, seller_style), Spacer(1, 0.25*inch),
+        Paragraph(summary_text, summary_style), Spacer(1, 0.25*inch),
+    ]
+    doc.build(StreamedFlowables(itertools.chain(elements, tables)))
+    return buffer.getvalue()
+
+
+def legacy_inventory_pdf(products):
+    rows = ([p["id"], p["name"], p["stock"], inventory_status(p["stock"])] for p in products)
+    tables = _legacy_tables(["Product ID", "Product Name", "Stock", "Status"], rows,
+                            [0.8*inch, 3*inch, 0.8*inch, 1.2*inch], _legacy_status_style)
+    return _legacy_report("Inventory Report", f"Seller: {SELLER['email']}<br/>Generated on: now [IST]",
+                          f"<b>Total Products:</b> {len(products)}", tables)
+
+
+def legacy_sales_pdf(orders):
+    rows = (order_table_row(order) for order in orders)
+    tables = _legacy_tables(["Order ID", "Product", "Quantity", "Price", "Total", "Date"], rows,
+                            [0.8*inch, 2*inch, 0.8*inch, 0.8*inch, 0.8*inch, 1*inch])
+    return _legacy_report("Sales Report", f"Seller: {SELLER['email']}<br/>Date Range: bench [IST]",
+                          f"<b>Total Orders:</b> {len(orders)}", tables)
+
+
+def current_inventory_pdf(products):
+    return generate_inventory_pdf_report(products, SELLER)
+
+
+def current_sales_pdf(orders):
+    return generate_pdf_report(orders, SELLER, "bench")
+
+
+def compare(legacy, current, data, runs: int):
+    """Median CPU seconds of each builder, alternating them so machine load hits both alike"""
+    timings = {legacy: [], current: []}
+    for _ in range(runs):
+        for build in (legacy, current):
+            started = time.process_time()
+            build(data)
+            timings[build].append(time.process_time() - started)
+    return statistics.median(timings[legacy]), statistics.median(timings[current])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ("inventory", make_products, legacy_inventory_pdf, current_inventory_pdf),
+        ("sales", make_orders, legacy_sales_pdf, current_sales_pdf),
+    ]
+    print(f"Median CPU seconds of {args.runs} runs, before -> after")
+    for label, make_rows, legacy, current in cases:
+        for count in args.rows:
+            data = make_rows(count)
+            before, after = compare(legacy, current, data, args.runs)
+            print(f"  {label:<10} {count:>7} rows  {before:>8.3f} -> {after:>8.3f}  ({before / max(after, 1e-9):.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
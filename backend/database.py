@@ -1,9 +1,22 @@
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import Session
 from models.base import SessionLocal
+from utils.metrics import db_pool_checkout_wait_seconds, db_pool_timeouts_total
 
 def get_db():
     db = SessionLocal()
     try:
+        # Check a connection out up front so the pool wait is measured once per request
+        started = time.perf_counter()
+        try:
+            db.connection()
+        except PoolTimeoutError:
+            db_pool_timeouts_total.inc()
+            raise
+        finally:
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - started)
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
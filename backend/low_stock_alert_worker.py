@@ -0,0 +1,53 @@
+"""
+Send proactive low stock alerts over WhatsApp.
+
+Tails the inventory change feed (see utils/inventory_feed.py) and, when a
+write takes a product below its threshold, sends the seller one digest of
+their low products after LOW_STOCK_ALERT_WINDOW_SECONDS. Sellers need a
+whatsapp_number to receive digests. Run exactly one of these per database;
+it starts from the newest change the first time it runs.
+
+Usage:
+    python backend/low_stock_alert_worker.py
+    python backend/low_stock_alert_worker.py --window 300 --language hi
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import logging
+
+from models.base import SessionLocal
+from utils.low_stock_alerts import LowStockAlertEngine, LOW_STOCK_ALERT_LANGUAGE, LOW_STOCK_ALERT_WINDOW_SECONDS
+from utils.whatsapp_sender import whatsapp_sender
+
+
+async def run(window: float, language: str):
+    engine = LowStockAlertEngine(SessionLocal, window_seconds=window, language=language)
+    engine.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await engine.stop()
+        await whatsapp_sender.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send low stock digests from the inventory change feed")
+    parser.add_argument("--window", type=float, default=LOW_STOCK_ALERT_WINDOW_SECONDS,
+                        help="Seconds a seller's first alert waits for others before the digest is sent")
+    parser.add_argument("--language", choices=["en", "hi"], default=LOW_STOCK_ALERT_LANGUAGE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        asyncio.run(run(args.window, args.language))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
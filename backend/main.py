@@ -12,23 +12,34 @@ from pydantic import BaseModel
 from fastapi.responses import FileResponse
 from models.base import SessionLocal
 from auth.jwt import create_access_token
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from fastapi import APIRouter
-from routes import auth, products, reports, invoices
+from routes import auth, products, reports, invoices, customers, jobs
 from products.urls import router as products_api_router
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 
 from database import get_db
+from models.base import DB_POOL_SIZE, DB_MAX_OVERFLOW
+from anyio import to_thread
 
 app = FastAPI()
-db = SessionLocal()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
+# SQL statements, built once at import
+SELECT_USER_BY_EMAIL = text("SELECT * FROM users WHERE email = :email")
+INSERT_BOOKING = text("INSERT INTO bookings (buyer_id, seller_id, slot) VALUES (:buyer_id, :seller_id, :slot)")
+SELECT_BOOKINGS = text("SELECT * FROM bookings")
+UPDATE_BOOKING = text("UPDATE bookings SET buyer_id = :buyer_id, seller_id = :seller_id, slot = :slot WHERE id = :id")
+DELETE_BOOKING = text("DELETE FROM bookings WHERE id = :id")
+
 def get_user_by_email(db: Session, email: str):
-    return db.execute("SELECT * FROM users WHERE email = :email", {"email": email}).fetchone()
+    return db.execute(SELECT_USER_BY_EMAIL, {"email": email}).fetchone()
 
+# Handlers below are plain functions so blocking DB calls run in the threadpool,
+# each on its own pooled session from get_db
 @app.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = get_user_by_email(db, form_data.username)
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
@@ -41,7 +52,7 @@ SECRET_KEY = "your-secret-key"
 ALGORITHM = "HS256"
 
 # Function to get the current user
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -81,31 +92,29 @@ class Booking(BaseModel):
 
 # Create a booking
 @app.post("/bookings/")
-async def create_booking(booking: Booking):
-    with db.begin() as conn:
-        conn.execute('INSERT INTO bookings (buyer_id, seller_id, slot) VALUES (:buyer_id, :seller_id, :slot)', booking.dict())
+def create_booking(booking: Booking, db: Session = Depends(get_db)):
+    db.execute(INSERT_BOOKING, booking.dict())
+    db.commit()
     return {"message": "Booking created successfully"}
 
 # Read all bookings
 @app.get("/bookings/")
-async def read_bookings():
-    with db.begin() as conn:
-        result = conn.execute('SELECT * FROM bookings')
-        bookings = result.fetchall()
+def read_bookings(db: Session = Depends(get_db)):
+    bookings = [dict(row) for row in db.execute(SELECT_BOOKINGS).mappings()]
     return {"bookings": bookings}
 
 # Update a booking
 @app.put("/bookings/{booking_id}")
-async def update_booking(booking_id: int, booking: Booking):
-    with db.begin() as conn:
-        conn.execute('UPDATE bookings SET buyer_id = :buyer_id, seller_id = :seller_id, slot = :slot WHERE id = :id', {**booking.dict(), "id": booking_id})
+def update_booking(booking_id: int, booking: Booking, db: Session = Depends(get_db)):
+    db.execute(UPDATE_BOOKING, {**booking.dict(), "id": booking_id})
+    db.commit()
     return {"message": "Booking updated successfully"}
 
 # Delete a booking
 @app.delete("/bookings/{booking_id}")
-async def delete_booking(booking_id: int):
-    with db.begin() as conn:
-        conn.execute('DELETE FROM bookings WHERE id = :id', {"id": booking_id})
+def delete_booking(booking_id: int, db: Session = Depends(get_db)):
+    db.execute(DELETE_BOOKING, {"id": booking_id})
+    db.commit()
     return {"message": "Booking deleted successfully"}
 
 @app.get("/")
@@ -149,15 +158,45 @@ async def get_seller_inventory():
     return {"inventory": "Mock inventory data for seller"}
 
 from whatsapp_webhook import router as whatsapp_router
+from utils.whatsapp_sender import whatsapp_sender
+from utils.metrics import router as metrics_router
+from utils.pdf_render_pool import pdf_render_pool
 
 app.include_router(auth.router)
 app.include_router(products.router)
 app.include_router(reports.router)
 app.include_router(invoices.router)
+app.include_router(customers.router)
+app.include_router(jobs.router)
 app.include_router(admin_router)
 app.include_router(seller_router)
 app.include_router(whatsapp_router)
 app.include_router(products_api_router)
+app.include_router(metrics_router)
+
+# Sync route handlers run in the threadpool; size it to what the DB pool can serve
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", DB_POOL_SIZE + DB_MAX_OVERFLOW))
+
+@app.on_event("startup")
+async def size_threadpool():
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+@app.on_event("startup")
+async def start_report_job_workers():
+    # REPORT_JOB_WORKERS=0 leaves the jobs to backend/report_worker.py
+    jobs.report_job_workers.start()
+
+@app.on_event("shutdown")
+async def stop_report_job_workers():
+    await jobs.report_job_workers.stop()
+
+@app.on_event("shutdown")
+async def close_whatsapp_sender():
+    await whatsapp_sender.aclose()
+
+@app.on_event("shutdown")
+def stop_pdf_render_pool():
+    pdf_render_pool.shutdown()
 
 if os.getenv("ENVIRONMENT") == "production":
     app.add_middleware(HTTPSRedirectMiddleware)
@@ -0,0 +1,145 @@
+"""
+Pre-render routine reports for active sellers into the report cache.
+
+Renders each active seller's sales report for yesterday and current inventory
+report in the PDF render pool, so the morning rush of the same requests is
+served from REPORT_CACHE_DIR. A report whose data has not changed since it was
+last rendered has the same cache key and is skipped. Schedule it nightly,
+shortly after midnight IST, on a host sharing the web servers' cache
+directory:
+
+Usage:
+    python backend/prerender_reports.py
+    python backend/prerender_reports.py --ranges yesterday week --concurrency 2
+    python backend/prerender_reports.py --active-days 0   # every seller with products
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import Callable, Iterable, List
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.base import OrderDailyRollup, Product, Seller, SessionLocal
+from routes.inventory import load_inventory_report_key, open_inventory_report
+from routes.reports import get_report_days, load_sales_report_key, open_sales_report
+from utils.pdf_render_pool import pdf_render_pool
+from utils.report_cache import report_cache
+
+logger = logging.getLogger("prerender_reports")
+
+# Sellers with orders on any of this many recent days count as active; 0 means every seller with products
+REPORT_PRERENDER_ACTIVE_DAYS = int(os.getenv("REPORT_PRERENDER_ACTIVE_DAYS", 7))
+# Reports rendered at once; keep it at or below the render pool's workers
+REPORT_PRERENDER_CONCURRENCY = int(os.getenv("REPORT_PRERENDER_CONCURRENCY", pdf_render_pool.max_workers))
+
+
+def load_active_sellers(db: Session, active_days: int = REPORT_PRERENDER_ACTIVE_DAYS) -> List[dict]:
+    """List sellers worth pre-rendering for, as the seller info the report builders take
+
+    The ids double as 'sub', which is how the inventory endpoint identifies the
+    seller, so pre-rendered reports land on the keys live requests look up.
+    """
+    statement = select(Seller.id, Seller.name).where(Seller.id.in_(select(Product.seller_id)))
+    if active_days > 0:
+        first_day = get_report_days("today")[0] - timedelta(days=active_days)
+        statement = statement.where(Seller.id.in_(
+            select(OrderDailyRollup.seller_id).where(OrderDailyRollup.day >= first_day)
+        ))
+    return [{"id": row.id, "sub": row.id, "name": row.name, "role": "seller"}
+            for row in db.execute(statement.order_by(Seller.id))]
+
+
+async def prerender_seller_reports(db: Session, seller_info: dict, ranges: Iterable[str]) -> Counter:
+    """Render one seller's inventory and sales reports unless they are already cached
+
+    Returns:
+        Counter of 'rendered' and 'skipped' reports
+    """
+    counts = Counter()
+    cache_key = await load_inventory_report_key(db, seller_info["sub"])
+    if await run_in_threadpool(report_cache.contains, cache_key):
+        counts["skipped"] += 1
+    else:
+        pdf_file, _ = await open_inventory_report(db, seller_info, cache_key, wait_for_slot=True)
+        pdf_file.close()
+        counts["rendered"] += 1
+
+    for range_type in ranges:
+        start_day, end_day = get_report_days(range_type)
+        summary, cache_key = await load_sales_report_key(db, seller_info["id"], start_day, end_day)
+        if await run_in_threadpool(report_cache.contains, cache_key):
+            counts["skipped"] += 1
+            continue
+        pdf_file, _ = await open_sales_report(db, seller_info, start_day, end_day, summary, cache_key,
+                                              wait_for_slot=True)
+        pdf_file.close()
+        counts["rendered"] += 1
+    return counts
+
+
+async def prerender_reports(session_factory: Callable[[], Session] = SessionLocal,
+                            ranges: Iterable[str] = ("yesterday",),
+                            active_days: int = REPORT_PRERENDER_ACTIVE_DAYS,
+                            concurrency: int = REPORT_PRERENDER_CONCURRENCY) -> Counter:
+    """Pre-render reports for every active seller, at most `concurrency` sellers at a time
+
+    A seller whose reports fail is logged and counted, and the rest carry on.
+
+    Returns:
+        Counter of 'sellers', 'rendered', 'skipped' and 'failed'
+    """
+    ranges = list(ranges)
+    with session_factory() as db:
+        sellers = await run_in_threadpool(load_active_sellers, db, active_days)
+
+    totals = Counter(sellers=len(sellers))
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(seller_info: dict):
+        async with semaphore:
+            db = session_factory()
+            try:
+                totals.update(await prerender_seller_reports(db, seller_info, ranges))
+            except Exception as e:
+                totals["failed"] += 1
+                logger.error(f"Pre-rendering reports for seller {seller_info['id']} failed: {e}")
+            finally:
+                await run_in_threadpool(db.close)
+
+    await asyncio.gather(*(run(seller_info) for seller_info in sellers))
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render routine reports for active sellers into the report cache")
+    parser.add_argument("--ranges", nargs="+", default=["yesterday"],
+                        help="Sales report ranges to render, e.g. yesterday week (default: yesterday)")
+    parser.add_argument("--active-days", type=int, default=REPORT_PRERENDER_ACTIVE_DAYS,
+                        help="Only sellers with orders in this many recent days; 0 for every seller with products")
+    parser.add_argument("--concurrency", type=int, default=REPORT_PRERENDER_CONCURRENCY)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    started = time.monotonic()
+    try:
+        totals = asyncio.run(prerender_reports(SessionLocal, args.ranges, args.active_days, args.concurrency))
+    finally:
+        pdf_render_pool.shutdown()
+    print(f"Pre-rendered reports for {totals['sellers']} sellers in {time.monotonic() - started:.1f}s: "
+          f"{totals['rendered']} rendered, {totals['skipped']} unchanged, {totals['failed']} sellers failed.")
+    sys.exit(1 if totals["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ from typing import Dict, Any
 from database import get_db
 from models.base import Product
 from .serializers import ProductSerializer
+# Registers the listener that records Product writes in the inventory change feed
+import utils.inventory_feed  # noqa: F401
 
 router = APIRouter(
     prefix="/products",
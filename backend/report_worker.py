@@ -0,0 +1,52 @@
+"""
+Run report job workers outside the web process.
+
+Claims queued jobs from the report_jobs table (see POST /jobs/report), renders
+them in the PDF render pool and delivers them over WhatsApp. Any number of
+these can run next to the web servers; set REPORT_JOB_WORKERS=0 on the web
+servers to leave all jobs to them.
+
+Usage:
+    python backend/report_worker.py
+    python backend/report_worker.py --workers 4
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import logging
+
+from routes.jobs import report_job_workers
+from utils.pdf_render_pool import pdf_render_pool
+from utils.whatsapp_sender import whatsapp_sender
+
+
+async def run(workers: int):
+    report_job_workers.workers = workers
+    report_job_workers.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await report_job_workers.stop()
+        await whatsapp_sender.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run report job workers")
+    parser.add_argument("--workers", type=int, default=max(report_job_workers.workers, 1))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        asyncio.run(run(args.workers))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pdf_render_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
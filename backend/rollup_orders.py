@@ -0,0 +1,45 @@
+"""
+Maintain the order_daily_rollup table.
+
+Usage:
+    python backend/rollup_orders.py                 # fold in orders placed since the last run
+    python backend/rollup_orders.py --backfill      # rebuild the rollup from the full order history
+    python backend/rollup_orders.py --interval 60   # keep folding in new orders every 60 seconds
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import logging
+import time
+
+from models.base import SessionLocal
+from utils.order_rollup import refresh_order_rollup, backfill_order_rollup, ROLLUP_BATCH_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the order_daily_rollup table")
+    parser.add_argument("--backfill", action="store_true", help="Rebuild the rollup from all orders first")
+    parser.add_argument("--interval", type=float, help="Keep running, refreshing every INTERVAL seconds")
+    parser.add_argument("--batch-size", type=int, default=ROLLUP_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    session = SessionLocal()
+    try:
+        if args.backfill:
+            print(f"Backfilled {backfill_order_rollup(session, args.batch_size)} orders.")
+        while True:
+            processed = refresh_order_rollup(session, args.batch_size)
+            print(f"Rolled up {processed} new orders.")
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Local stand-in for the WhatsApp Cloud API media and messages endpoints.
+
+Accepts media uploads (POST /{phone_number_id}/media) and messages
+(POST /{phone_number_id}/messages), keeps what it received, and rejects
+document messages that reference unknown media ids. Point the backend at it to
+exercise report delivery end to end without the Graph API:
+
+Usage:
+    python backend/stub_whatsapp_api.py --port 8900 --save-dir ./tmp/whatsapp_media
+    WHATSAPP_GRAPH_API_URL=http://127.0.0.1:8900 uvicorn main:app
+"""
+import argparse
+import json
+import os
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+def parse_multipart(content_type: str, body: bytes) -> dict:
+    """Parse a multipart/form-data body into {field: value or (filename, mime type, bytes)}"""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        filename = part.get_filename()
+        payload = part.get_payload(decode=True)
+        if filename is not None:
+            fields[name] = (filename, part.get_content_type(), payload)
+        else:
+            fields[name] = payload.decode()
+    return fields
+
+
+class StubWhatsAppAPI:
+    """Threaded HTTP server recording media uploads and messages
+
+    Attributes:
+        media: media id -> {"filename", "mime_type", "content"}
+        messages: Message payloads in the order they arrived
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, save_dir: Optional[str] = None):
+        self.media = {}
+        self.messages = []
+        self.save_dir = save_dir
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                parts = self.path.strip("/").split("/")
+                if len(parts) != 2 or parts[1] not in ("media", "messages"):
+                    return self.reply(404, {"error": {"message": f"Unknown path {self.path}"}})
+                if parts[1] == "media":
+                    return self.reply(*stub.upload(self.headers.get("Content-Type", ""), body))
+                return self.reply(*stub.message(json.loads(body or b"{}")))
+
+            def reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def upload(self, content_type: str, body: bytes):
+        if not content_type.startswith("multipart/form-data"):
+            return 400, {"error": {"message": "Expected multipart/form-data"}}
+        fields = parse_multipart(content_type, body)
+        if fields.get("messaging_product") != "whatsapp" or not isinstance(fields.get("file"), tuple):
+            return 400, {"error": {"message": "messaging_product=whatsapp and a file are required"}}
+        filename, mime_type, content = fields["file"]
+        with self.lock:
+            media_id = f"stub-media-{len(self.media) + 1}"
+            self.media[media_id] = {"filename": filename, "mime_type": fields.get("type", mime_type),
+                                    "content": content}
+        if self.save_dir:
+            os.makedirs(self.save_dir, exist_ok=True)
+            with open(os.path.join(self.save_dir, f"{media_id}_{os.path.basename(filename)}"), "wb") as f:
+                f.write(content)
+        return 200, {"id": media_id}
+
+    def message(self, payload: dict):
+        if payload.get("messaging_product") != "whatsapp" or not payload.get("to"):
+            return 400, {"error": {"message": "messaging_product=whatsapp and to are required"}}
+        document = payload.get("document")
+        with self.lock:
+            if document is not None and document.get("id") not in self.media:
+                return 400, {"error": {"message": f"Unknown media id {document.get('id')}"}}
+            self.messages.append(payload)
+            message_id = f"wamid.stub-{len(self.messages)}"
+        return 200, {"messages": [{"id": message_id}]}
+
+    def start(self) -> "StubWhatsAppAPI":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the WhatsApp Cloud API media and messages endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--save-dir", help="Write uploaded media here")
+    args = parser.parse_args()
+
+    stub = StubWhatsAppAPI(args.host, args.port, args.save_dir)
+    print(f"Stub WhatsApp API on {stub.url}; set WHATSAPP_GRAPH_API_URL={stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  # Add parent directory to path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.database import get_db
+from utils.metrics import db_pool_checkout_wait_seconds
+
+@pytest.fixture(scope="function")
+def bookings_client(tmp_path):
+    # A file database with a real connection pool, one session per request
+    engine = create_engine(f"sqlite:///{tmp_path / 'bookings.db'}", connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE bookings (id INTEGER PRIMARY KEY AUTOINCREMENT, buyer_id TEXT NOT NULL, "
+            "seller_id INTEGER NOT NULL, slot TEXT NOT NULL, UNIQUE (seller_id, slot))"
+        ))
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _get_test_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[main.get_db] = _get_test_db
+    with TestClient(main.app, raise_server_exceptions=False) as test_client:
+        yield test_client
+    main.app.dependency_overrides = {}
+    engine.dispose()
+
+def test_booking_crud(bookings_client):
+    """Test create, read, update and delete of bookings on per-request sessions"""
+    booking = {"buyer_id": "919876543210", "seller_id": 1, "slot": "10:00"}
+    assert bookings_client.post("/bookings/", json=booking).status_code == 200
+
+    bookings = bookings_client.get("/bookings/").json()["bookings"]
+    assert len(bookings) == 1
+    assert bookings[0]["slot"] == "10:00"
+
+    booking_id = bookings[0]["id"]
+    response = bookings_client.put(f"/bookings/{booking_id}", json={**booking, "slot": "11:00"})
+    assert response.status_code == 200
+    assert bookings_client.get("/bookings/").json()["bookings"][0]["slot"] == "11:00"
+
+    assert bookings_client.delete(f"/bookings/{booking_id}").status_code == 200
+    assert bookings_client.get("/bookings/").json()["bookings"] == []
+
+def test_failed_transaction_does_not_poison_later_requests(bookings_client):
+    """Test that a failed insert only affects its own request"""
+    booking = {"buyer_id": "919876543210", "seller_id": 1, "slot": "10:00"}
+    assert bookings_client.post("/bookings/", json=booking).status_code == 200
+    assert bookings_client.post("/bookings/", json=booking).status_code == 500
+
+    assert bookings_client.post("/bookings/", json={**booking, "slot": "12:00"}).status_code == 200
+    assert len(bookings_client.get("/bookings/").json()["bookings"]) == 2
+
+def test_get_db_records_checkout_wait():
+    """Test that each request session records its pool checkout time"""
+    before = (db_pool_checkout_wait_seconds.snapshot() or {"count": 0})["count"]
+    dependency = get_db()
+    db = next(dependency)
+    assert db.execute(text("SELECT 1")).scalar() == 1
+    dependency.close()
+    assert db_pool_checkout_wait_seconds.snapshot()["count"] == before + 1
@@ -21,14 +21,29 @@ router = APIRouter()
 
 from fastapi import HTTPException
 from models.base import Product
+from utils.dedupe import message_dedupe
+from utils.session_store import create_session_store
+# Registers the listener that records Product writes in the inventory change feed
+import utils.inventory_feed  # noqa: F401
 
 @router.post("/")
 async def whatsapp_webhook(payload: dict, db: Session = Depends(get_db)):
-    message = payload.get("message", "")
-    result = parse_command(message)
-    # Just log or return for now
-    action = result.get("action")
-    return handle_action(action, db)
+    # Redelivered events must not repeat product or stock writes
+    message_id = payload.get("message_id") or payload.get("id")
+    if message_id and message_dedupe.check_and_mark(message_id):
+        return {"status": "duplicate", "message_id": message_id}
+
+    try:
+        message = payload.get("message", "")
+        result = parse_command(message)
+        # Just log or return for now
+        action = result.get("action")
+        return handle_action(action, db)
+    except Exception:
+        # Let the redelivery of a message that failed be processed again
+        if message_id:
+            message_dedupe.forget(message_id)
+        raise
 
 
 def handle_action(action: str, db: Session):
@@ -105,42 +120,46 @@ async def verify_webhook(request: Request):
         await send_whatsapp_message(selected_seller['contact'], seller_message)
         return {"status": "booking confirmed"}
 
-# Simple in-memory state management for demonstration purposes
-user_states = {}
+# Registration state shared by all workers when SESSION_BACKEND=sqlite
+user_states = create_session_store("registration")
 
 async def handle_message(sender, text):
-    state = user_states.get(sender, "")
+    session = user_states.get(sender) or {}
+    state = session.get("state", "")
 
     # Handle seller registration
     if text.lower() == "register":
-        user_states[sender] = "awaiting shop name"
+        user_states.set(sender, {"state": "awaiting shop name"})
         reply_text = "What’s your shop name?"
         await send_whatsapp_message(sender, reply_text)
         return {"status": "awaiting shop name"}
 
     if state == "awaiting shop name":
         shop_name = text.strip()
-        user_states[sender] = "awaiting service"
+        user_states.update(sender, state="awaiting service", shop_name=shop_name)
         reply_text = "Which service you offer?"
         await send_whatsapp_message(sender, reply_text)
         return {"status": "awaiting service", "shop_name": shop_name}
 
     if state == "awaiting service":
         service = text.strip()
-        user_states[sender] = "awaiting pincode"
+        user_states.update(sender, state="awaiting pincode", service=service)
         reply_text = "Enter Pincode"
         await send_whatsapp_message(sender, reply_text)
         return {"status": "awaiting pincode", "service": service}
 
     if state == "awaiting pincode":
         pincode = text.strip()
-        user_states[sender] = "awaiting hours"
+        user_states.update(sender, state="awaiting hours", pincode=pincode)
         reply_text = "What’s your working hours?"
         await send_whatsapp_message(sender, reply_text)
         return {"status": "awaiting hours", "pincode": pincode}
 
     if state == "awaiting hours":
         hours = text.strip()
+        shop_name = session.get("shop_name")
+        service = session.get("service")
+        pincode = session.get("pincode")
         # Validate and save to database
         if not validate_seller(shop_name, service, pincode, hours):
             reply_text = "Invalid input or duplicate entry. Please try again."
@@ -149,5 +168,5 @@ async def handle_message(sender, text):
         save_seller(shop_name, service, pincode, hours)
         reply_text = "Registration successful!"
         await send_whatsapp_message(sender, reply_text)
-        user_states.pop(sender, None)  # Clear state after successful registration
-        return {"status": "registration successful"}
+        user_states.delete(sender)  # Clear state after successful registration
+        return {"status": "registration successful"}
\ No newline at end of file
@@ -1,30 +1,68 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
 import os
 from dotenv import load_dotenv
 import sys
 
+from utils.metrics import registry
+
 # Get the project root directory
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 # Load environment variables from the backend .env file
 load_dotenv(os.path.join(project_root, 'backend', '.env'))
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Connection pool sizing; size it to what the database can serve, not to the request rate
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
 # Check if we're using SQLite (for testing) or PostgreSQL (for production)
 if DATABASE_URL.startswith('sqlite'):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_pre_ping=DB_POOL_PRE_PING
+    )
 else:
-    engine = create_engine(DATABASE_URL, connect_args={"sslmode": "require"})
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"sslmode": "require"},
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING
+    )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _pool_metrics():
+    """Expose the current pool occupancy as Prometheus gauges"""
+    lines = []
+    if isinstance(engine.pool, QueuePool):
+        for name, value in (("db_pool_size", engine.pool.size()), ("db_pool_checked_out", engine.pool.checkedout()),
+                            ("db_pool_overflow", engine.pool.overflow())):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return lines
+
+registry.register_collector(_pool_metrics)
 Base = declarative_base()
 
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Date, Index, Text
 
 from datetime import datetime, timezone
 from sqlalchemy import ForeignKey, Float
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_date", "date"),
+        Index("ix_orders_buyer_date", "buyer", "date"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     product = Column(String, nullable=False)
     buyer = Column(String, nullable=False)
@@ -33,6 +71,7 @@ class Order(Base):
 
 class Inventory(Base):
     __tablename__ = "inventory"
+    # The products.id a stock threshold applies to (no foreign key), see utils.low_stock_alerts
     item_id = Column(Integer, primary_key=True, index=True)
     stock_count = Column(Integer, nullable=False)
     threshold = Column(Integer, nullable=False)
@@ -44,14 +83,107 @@ class Seller(Base):
     service = Column(String)
     pincode = Column(String)
     hours = Column(String)
+    # Where low stock digests are sent, see utils.low_stock_alerts
+    whatsapp_number = Column(String)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_seller_id_name", "seller_id", "name"),
+        Index("ix_products_seller_id_stock", "seller_id", "stock"),
+        Index("ix_products_seller_id_id", "seller_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     seller_id = Column(Integer, ForeignKey("sellers.id"))
     name = Column(String, nullable=False)
     description = Column(String)
     price = Column(Float, nullable=False)
     stock = Column(Integer, default=0)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
\ No newline at end of file
+    # Bumped by every utils.stock_mutations write, for optimistic concurrency checks
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+class OrderDailyRollup(Base):
+    """Per seller, product and IST day order totals, maintained by utils.order_rollup
+
+    revenue is priced when the orders are folded in; readers price units at the current price.
+    """
+    __tablename__ = "order_daily_rollup"
+    __table_args__ = (
+        Index("ix_order_daily_rollup_seller_id_day", "seller_id", "day"),
+    )
+    seller_id = Column(Integer, primary_key=True)
+    product = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+class RollupCheckpoint(Base):
+    """High-water mark (last processed order id) of an incremental rollup job"""
+    __tablename__ = "rollup_checkpoints"
+    name = Column(String, primary_key=True)
+    last_order_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+class ReportJob(Base):
+    """A report rendered in the background and optionally delivered over WhatsApp, see utils.report_jobs"""
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        Index("ix_report_jobs_status_id", "status", "id"),
+        Index("ix_report_jobs_seller_id", "seller_id"),
+    )
+    id = Column(Integer, primary_key=True)
+    seller_id = Column(Integer, nullable=False)
+    report_type = Column(String, nullable=False)
+    params = Column(Text, nullable=False, default="{}")
+    seller_info = Column(Text, nullable=False, default="{}")
+    deliver_to = Column(String)
+    language = Column(String, nullable=False, default="en")
+    status = Column(String, nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    cache_key = Column(String)
+    delivery_status = Column(String)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class InventoryChange(Base):
+    """One product or stock write, appended in the writer's transaction, see utils.inventory_feed"""
+    __tablename__ = "inventory_changes"
+    __table_args__ = (
+        Index("ix_inventory_changes_seller_id_seq", "seller_id", "seq"),
+        # Sequence numbers are never reused, even after old changes are pruned
+        {"sqlite_autoincrement": True},
+    )
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    seller_id = Column(Integer)
+    product_id = Column(Integer, nullable=False)
+    operation = Column(String, nullable=False)  # insert, update or delete
+    name = Column(String)
+    stock = Column(Integer)
+    # Stock before the write, when the writer knew it
+    previous_stock = Column(Integer)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+class LowStockAlert(Base):
+    """A product in a seller's next low stock digest, see utils.low_stock_alerts"""
+    __tablename__ = "low_stock_alerts"
+    seller_id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    name = Column(String)
+    stock = Column(Integer, nullable=False)
+    threshold = Column(Integer, nullable=False)
+    # Start of the digest window; reset when sending the digest fails
+    queued_at = Column(DateTime, nullable=False)
+
+class FeedCheckpoint(Base):
+    """Last inventory change sequence number processed by a named feed consumer"""
+    __tablename__ = "feed_checkpoints"
+    name = Column(String, primary_key=True)
+    last_seq = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -1,6 +1,6 @@
 import os
 import uuid
-from sqlalchemy import create_engine, Column, String, Boolean, Enum, Integer
+from sqlalchemy import create_engine, Column, String, Boolean, Enum, Integer, Index
 from sqlalchemy.orm import sessionmaker, declarative_base
 import enum
 from dotenv import load_dotenv
@@ -27,6 +27,9 @@ class User(Base):
 
 class Seller(Base):
     __tablename__ = 'sellers'
+    __table_args__ = (
+        Index('ix_sellers_category_pincode', 'category', 'pincode'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     category = Column(String, nullable=False)
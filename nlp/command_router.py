@@ -3,13 +3,17 @@ import json
 import logging
 import datetime
 import re
+import time
 from typing import Dict, Any, Optional, Union, Tuple, List
 from urllib.parse import urljoin
 from fastapi import APIRouter
 from pydantic import BaseModel
 from nlp.enhanced_multilingual_parser import parse_multilingual_command, format_response
+from utils.logger import start_queue_logging
+from utils.metrics import nlp_stage_seconds, router as metrics_router
 
 router = APIRouter()
+router.include_router(metrics_router)
 
 class CommandInput(BaseModel):
     text: str
@@ -44,11 +48,11 @@ console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
 
-# Configure logger
+# Configure logger; file and console writes happen on a background thread
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+logger.propagate = False
+logger.addHandler(start_queue_logging([file_handler, console_handler]))
 
 logger.info("Command Router initialized - API integration active")
 logger.info(f"Log file location: {log_file}")
@@ -70,7 +74,11 @@ RESPONSE_TEMPLATES = {
         },
         "edit_stock": {
             "success": "Stock updated for {name} to {stock} units.",
-            "error": "Failed to update stock for {name}. Error: {error}"
+            "error": "Failed to update stock for {name}. Error: {error}",
+            "batch_success": "Stock updated:\n{items}",
+            "batch_item": "- {name}: {stock} units",
+            "batch_not_found": "Not found: {names}",
+            "batch_error": "Failed to update stock. Error: {error}"
         },
         "get_inventory": {
             "success": "Current inventory:\n{inventory}",
@@ -85,7 +93,7 @@ RESPONSE_TEMPLATES = {
             "error": "Failed to generate {range} report. Error: {error}"
         },
         "get_inventory_report": {
-            "success": "Inventory report generated successfully. You can download it from the link provided.",
+            "success": "Your inventory report is being prepared. It will be sent to you here shortly.",
             "error": "Failed to generate inventory report. Error: {error}"
         },
         "get_orders": {
@@ -119,7 +127,11 @@ RESPONSE_TEMPLATES = {
         },
         "edit_stock": {
             "success": "{name} का स्टॉक {stock} इकाइयों में अपडेट किया गया।",
-            "error": "{name} के लिए स्टॉक अपडेट करने में विफल। त्रुटि: {error}"
+            "error": "{name} के लिए स्टॉक अपडेट करने में विफल। त्रुटि: {error}",
+            "batch_success": "स्टॉक अपडेट किया गया:\n{items}",
+            "batch_item": "- {name}: {stock} इकाइयाँ",
+            "batch_not_found": "नहीं मिले: {names}",
+            "batch_error": "स्टॉक अपडेट करने में विफल। त्रुटि: {error}"
         },
         "get_inventory": {
             "success": "वर्तमान इन्वेंटरी:\n{inventory}",
@@ -134,7 +146,7 @@ RESPONSE_TEMPLATES = {
             "error": "{range} रिपोर्ट जनरेट करने में विफल। त्रुटि: {error}"
         },
         "get_inventory_report": {
-            "success": "इन्वेंटरी रिपोर्ट सफलतापूर्वक जनरेट की गई है। आप दिए गए लिंक से इसे डाउनलोड कर सकते हैं।",
+            "success": "आपकी इन्वेंटरी रिपोर्ट तैयार की जा रही है। यह जल्द ही आपको यहीं भेज दी जाएगी।",
             "error": "इन्वेंटरी रिपोर्ट जनरेट करने में विफल। त्रुटि: {error}"
         },
         "get_orders": {
@@ -172,6 +184,11 @@ API_ENDPOINTS = {
         "path": "/seller/products/update-stock",
         "method": "POST"
     },
+    "edit_stock_batch": {
+        # Several products from one message, updated in one transaction
+        "path": "/seller/products/update-stock/batch",
+        "method": "POST"
+    },
     "get_inventory": {
         "path": "/seller/products",
         "method": "GET"
@@ -181,12 +198,13 @@ API_ENDPOINTS = {
         "method": "POST"
     },
     "get_report": {
-        "path": "/seller/report",
+        "path": "/seller/orders/summary",
         "method": "GET"
     },
     "get_inventory_report": {
-        "path": "/inventory/report",
-        "method": "GET"
+        # Rendered in the background and sent back as a WhatsApp document
+        "path": "/jobs/report",
+        "method": "POST"
     },
     "get_orders": {
         "path": "/seller/orders",
@@ -229,13 +247,12 @@ def make_api_request(endpoint: str, method: str, params: Dict[str, Any] = None,
     if user_id:
         headers["Authorization"] = f"Bearer {user_id}"
     
-    # Log request details
+    # Log request details; payloads are only formatted when debug logging is on
     logger.info(f"API Request: {method} {url}")
-    logger.info(f"Headers: {headers}")
     if params:
-        logger.info(f"Query Params: {params}")
+        logger.debug("Query Params: %s", params)
     if data:
-        logger.info(f"Request Data: {json.dumps(data)}")
+        logger.debug("Request Data: %s", data)
     
     try:
         if method.upper() == "GET":
@@ -248,7 +265,7 @@ def make_api_request(endpoint: str, method: str, params: Dict[str, Any] = None,
         
         # Log response status and content
         logger.info(f"Response Status: {response.status_code}")
-        logger.info(f"Response Content: {response.text[:500]}" + ("..." if len(response.text) > 500 else ""))
+        logger.debug("Response Content: %.500s", response.text)
         
         # Check if request was successful
         response.raise_for_status()
@@ -505,6 +522,45 @@ def register_seller(entities: Dict[str, Any], language: str, user_id: str = None
         whatsapp_number=entities.get('whatsapp_number', user_id)
     )
 
+def update_stock_batch(entities: Dict[str, Any], language: str, user_id: str = None) -> str:
+    """
+    Update the stock of every product listed in one message with a single request
+    
+    Args:
+        entities: Dictionary containing 'items', a list of {'name', 'stock'}
+        language: Language code ('en' or 'hi')
+        user_id: User ID for authentication
+        
+    Returns:
+        One consolidated response message covering every item
+    """
+    templates = RESPONSE_TEMPLATES[language]["edit_stock"]
+    data = {"items": [{"name": item.get("name", ""), "stock": item.get("stock", 0)} for item in entities["items"]]}
+    logger.info(f"Processing multi-item stock update: {len(data['items'])} items, user_id={user_id}")
+    
+    endpoint_info = API_ENDPOINTS["edit_stock_batch"]
+    started = time.perf_counter()
+    response = make_api_request(endpoint_info["path"], endpoint_info["method"], data=data, user_id=user_id)
+    nlp_stage_seconds.observe(time.perf_counter() - started, stage="api_call", intent="edit_stock", language=language)
+    
+    # If backend is not available, fall back to simulation for testing
+    if "error" in response and "ConnectionError" in response["error"]:
+        logger.warning(f"Backend connection failed, falling back to simulation: {response['error']}")
+        response = simulate_api_response("edit_stock_batch", data)
+    
+    if "error" in response:
+        logger.error(f"Error updating stock for several products: {response['error']}, user_id={user_id}")
+        return templates["batch_error"].format(error=response["error"])
+    
+    lines = []
+    if response.get("updated"):
+        lines.append(templates["batch_success"].format(
+            items="\n".join(templates["batch_item"].format(**product) for product in response["updated"])
+        ))
+    if response.get("not_found"):
+        lines.append(templates["batch_not_found"].format(names=", ".join(response["not_found"])))
+    return "\n".join(lines)
+
 def format_customer_data_response(customers_data: list, language: str, time_range: str) -> str:
     """
     Format customer data into a readable string
@@ -587,7 +643,7 @@ def format_report_response(report_data: Dict[str, Any], language: str, time_rang
     else:  # Hindi
         return f"{display_range} की बिक्री: ₹{report_data['sales']}\nऑर्डर: {report_data['orders']}\nटॉप प्रोडक्ट: {report_data.get('top_product', 'N/A')}"
 
-def route_command(intent_or_parsed_result: Union[str, Dict[str, Any]], entities: Dict[str, Any] = None, language: str = None, user_id: str = None) -> str:
+def route_command(intent_or_parsed_result: Union[str, Dict[str, Any]], entities: Dict[str, Any] = None, language: str = None, user_id: str = None, phone_number: str = None) -> str:
     """
     Route the parsed command to the appropriate API endpoint and return a response
     
@@ -596,6 +652,7 @@ def route_command(intent_or_parsed_result: Union[str, Dict[str, Any]], entities:
         entities: The entities extracted from the command (if intent is provided separately)
         language: The language code (if intent is provided separately)
         user_id: User ID for authentication
+        phone_number: WhatsApp number of the sender, where finished reports are delivered
         
     Returns:
         A formatted response string
@@ -635,6 +692,9 @@ def route_command(intent_or_parsed_result: Union[str, Dict[str, Any]], entities:
     if intent == "register":
         # For register intent, call the dedicated function
         return register_seller(entities, language, user_id)
+    elif intent == "edit_stock" and entities.get("items"):
+        # A message listing several products gets one update and one reply
+        return update_stock_batch(entities, language, user_id)
     elif intent == "add_product":
         data = {
             "product_name": entities.get("name", ""),
@@ -659,8 +719,20 @@ def route_command(intent_or_parsed_result: Union[str, Dict[str, Any]], entities:
         logger.info(f"Processing search_product intent for: {data['name']}")
     elif intent == "get_report":
         params = {"range": entities.get("range", "today")}
+    elif intent == "get_inventory_report":
+        data = {
+            "type": "inventory",
+            # user_id is the auth identity, not a WhatsApp number
+            "deliver_to": phone_number,
+            "language": language
+        }
     elif intent == "get_orders":
         params = {"range": entities.get("range", "all")}
+    elif intent == "get_top_products":
+        params = {
+            "range": entities.get("range", "week"),
+            "limit": entities.get("limit", 5)
+        }
     elif intent == "get_customer_data":
         params = {
             "range": entities.get("range", "this-month"),
@@ -671,7 +743,9 @@ def route_command(intent_or_parsed_result: Union[str, Dict[str, Any]], entities:
     # Make API request
     try:
         # Make actual API calls to the backend
+        started = time.perf_counter()
         response = make_api_request(endpoint_path, method, params, data, user_id)
+        nlp_stage_seconds.observe(time.perf_counter() - started, stage="api_call", intent=intent, language=language)
         
         # Special handling for add_product intent
         if intent == "add_product":
@@ -769,9 +843,30 @@ def route_command(intent_or_parsed_result: Union[str, Dict[str, Any]], entities:
                 range=display_range, report=report_str
             )
             
+        elif intent == "get_top_products":
+            time_range = entities.get("range", "week")
+            limit = entities.get("limit", 5)
+            products_str = format_top_products_response(response.get("products", []), language, time_range, limit)
+            
+            # Translate time range for display in response
+            range_translation = {
+                "today": "आज" if language == "hi" else "today",
+                "yesterday": "कल" if language == "hi" else "yesterday",
+                "week": "इस सप्ताह" if language == "hi" else "this week",
+                "this-week": "इस सप्ताह" if language == "hi" else "this week",
+                "this-month": "इस महीने" if language == "hi" else "this month",
+                "month": "इस महीने" if language == "hi" else "this month",
+                "all": "सभी समय" if language == "hi" else "all time"
+            }
+            
+            display_range = range_translation.get(time_range, time_range)
+            return RESPONSE_TEMPLATES[language][intent]["success"].format(
+                range=display_range, limit=limit, products=products_str
+            )
+        
         elif intent == "get_inventory_report":
-            # For inventory report, we just need to return a success message
-            # The actual PDF will be downloaded by the user from the link
+            # The report job was queued; the PDF follows as a WhatsApp document
+            logger.info(f"Queued inventory report job {response.get('job_id')}")
             return RESPONSE_TEMPLATES[language][intent]["success"]
         
         elif intent == "search_product":
@@ -875,6 +970,19 @@ def simulate_api_response(intent: str, entities: Dict[str, Any]) -> Dict[str, An
             }
         }
     
+    elif intent == "edit_stock_batch":
+        items = entities.get("items", [])
+        negative = [item["name"] for item in items if item["stock"] < 0]
+        if negative:
+            return {
+                "error": f"Quantity cannot be negative for: {', '.join(negative)}"
+            }
+        
+        return {
+            "updated": [{"id": "sim123", "name": item["name"], "stock": item["stock"]} for item in items],
+            "not_found": []
+        }
+    
     elif intent == "get_inventory":
         return {
             "products": [
@@ -1029,11 +1137,11 @@ def simulate_api_response(intent: str, entities: Dict[str, Any]) -> Dict[str, An
             }
             
     elif intent == "get_inventory_report":
-        # For inventory report simulation, we just need to return a success response
-        # The actual PDF would be generated by the backend
+        # For inventory report simulation, we just need to return a queued job
+        # The actual PDF would be rendered and delivered by the backend
         return {
-            "success": True,
-            "message": "Inventory report generated successfully"
+            "job_id": 1,
+            "status": "queued"
         }
     
     elif intent == "get_customer_data":
@@ -24,6 +24,7 @@ from nlp.improved_language_detection import detect_language, detect_mixed_langua
 from nlp.improved_edit_stock import ENHANCED_EDIT_STOCK_PATTERNS, ENHANCED_HINDI_EDIT_STOCK_PATTERNS
 from nlp.improved_edit_stock import extract_enhanced_edit_stock_details, extract_enhanced_hindi_edit_stock_details
 from nlp.improved_time_parsing import extract_time_range, get_date_range_for_time_period
+from utils.metrics import StageTimer, nlp_stage_seconds
 
 # Define enhanced intent patterns by merging existing patterns with improvements
 def get_enhanced_intent_patterns():
@@ -99,8 +100,32 @@ def parse_multilingual_command(command_text):
     """
     Enhanced multilingual command parser that integrates all improvements.
     
+    Stage timings are recorded in the nlp_stage_seconds histogram.
+    
+    Args:
+        command_text (str): The command text to parse
+        
+    Returns:
+        dict: Contains intent, entities, and language information, raw and normalized text
+    """
+    timer = StageTimer()
+    result = _parse_multilingual_command(command_text, timer)
+    # Several "product quantity" pairs are one multi-item stock update
+    from nlp.mixed_entity_extraction import extract_stock_list_items
+    items = extract_stock_list_items(command_text, result.get("intent"))
+    if items:
+        result = {**result, "intent": "edit_stock", "entities": {"items": items}}
+        result.pop("error", None)
+    timer.observe(nlp_stage_seconds, intent=result.get("intent") or "none", language=result.get("language"))
+    return result
+
+def _parse_multilingual_command(command_text, timer):
+    """
+    Parse a command, marking the end of each pipeline stage on the given timer.
+    
     Args:
         command_text (str): The command text to parse
+        timer (StageTimer): Timer receiving one lap per stage
         
     Returns:
         dict: Contains intent, entities, and language information, raw and normalized text
@@ -110,7 +135,9 @@ def parse_multilingual_command(command_text):
     
     # Check for negation patterns before proceeding with intent detection
     from nlp.mixed_entity_extraction import detect_negation
-    if detect_negation(command_text):
+    has_negation = detect_negation(command_text)
+    timer.lap("negation")
+    if has_negation:
         print("NEGATION DETECTED: Bypassing intent detection")
         return {
             "intent": None,  # No intent for negation queries
@@ -153,6 +180,7 @@ def parse_multilingual_command(command_text):
             name_match = re.search(r'(?:add|नया|नई)\s+(?:new\s+)?(?:product|प्रोडक्ट)\s+([\w\s]+)', command_text, re.IGNORECASE)
             if name_match:
                 product_entities = {'name': name_match.group(1).strip().lower()}
+        timer.lap("entity_extraction")
         
         return {
             "intent": "add_product",
@@ -184,6 +212,7 @@ def parse_multilingual_command(command_text):
         
         # Determine primary language for processing
         language = mixed_language_info.get("primary_language", "en")
+        timer.lap("language_detection")
         
         # Always normalize the command regardless of language detection result
         from nlp.mixed_entity_extraction import normalize_mixed_command
@@ -202,6 +231,7 @@ def parse_multilingual_command(command_text):
             print(f"Secondary language: {mixed_language_info.get('secondary_language', 'unknown')}")
             if 'transliterated_words' in mixed_language_info:
                 print(f"Transliterated words: {mixed_language_info['transliterated_words']}")
+        timer.lap("normalization")
         
         # Select appropriate intent patterns based on language
         if language == "en":
@@ -249,6 +279,7 @@ def parse_multilingual_command(command_text):
                         break
                 if result["intent"]:
                     break
+        timer.lap("intent_matching")
         
         # Extract entities based on intent and language
         if result["intent"]:
@@ -265,6 +296,7 @@ def parse_multilingual_command(command_text):
             # If no intent was recognized, set to unknown intent
             result["intent"] = "unknown"
             print(f"No intent recognized for command: {command_text}")
+        timer.lap("entity_extraction")
         
         # Log the final parsing result
         print(f"Final parsing result: Intent={result['intent']}, Language={result['language']}, Mixed={result['is_mixed']}")
@@ -11,13 +11,22 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from nlp.multilingual_handler import parse_multilingual_command
 from nlp.command_router import route_command
 from utils.logger import whatsapp_logger
+from utils.dedupe import message_dedupe
+from utils.session_store import create_session_store
+from utils.metrics import StageTimer, nlp_stage_seconds, nlp_message_seconds
 
 class MessageRouter:
     """Class for routing WhatsApp messages to the appropriate handler"""
     
-    def __init__(self):
-        """Initialize the message router"""
-        self.user_sessions = {}  # Store user session data
+    def __init__(self, dedupe_store=None, session_store=None):
+        """Initialize the message router
+        
+        Args:
+            dedupe_store: Optional store of processed message ids. Defaults to the shared store.
+            session_store: Optional store for user session data. Defaults to the configured backend.
+        """
+        self.user_sessions = session_store if session_store is not None else create_session_store("nlp")
+        self.dedupe_store = dedupe_store if dedupe_store is not None else message_dedupe
     
     def process_message(self, phone_number: str, message_text: str, user_id: Optional[str] = None) -> str:
         """Process a WhatsApp message and return a response
@@ -34,27 +43,38 @@ class MessageRouter:
         if not user_id:
             user_id = f"whatsapp-{phone_number}"
         
+        timer = StageTimer()
+        intent, language = "unknown", "en"
+        
         # Log the incoming message
         whatsapp_logger.log_incoming_message(phone_number, message_text, user_id)
+        timer.lap("logging")
         
         try:
             # Parse the message using the NLP system
             parsed_result = parse_multilingual_command(message_text)
+            intent, language = parsed_result["intent"] or "none", parsed_result["language"]
+            timer.lap("parse")
             whatsapp_logger.log_parsed_result(parsed_result, user_id)
+            timer.lap("logging")
             
             # Store the session data for this user
-            self.user_sessions[user_id] = {
+            self.user_sessions.set(user_id, {
                 "last_intent": parsed_result["intent"],
                 "language": parsed_result["language"],
                 "last_message": message_text
-            }
+            })
+            timer.lap("session")
             
             # Route the command to get a response
             whatsapp_logger.log_route_command(parsed_result, user_id)
-            response = route_command(parsed_result, user_id=user_id)
+            timer.lap("logging")
+            response = route_command(parsed_result, user_id=user_id, phone_number=phone_number)
+            timer.lap("route")
             
             # Log the outgoing message
             whatsapp_logger.log_outgoing_message(phone_number, response, user_id)
+            timer.lap("logging")
             
             return response
         
@@ -72,8 +92,13 @@ class MessageRouter:
             
             # Log the outgoing message
             whatsapp_logger.log_outgoing_message(phone_number, response, user_id)
+            timer.lap("logging")
             
             return response
+        
+        finally:
+            timer.observe(nlp_stage_seconds, intent=intent, language=language)
+            nlp_message_seconds.observe(timer.total(), intent=intent, language=language)
     
     def get_user_session(self, user_id: str) -> Dict[str, Any]:
         """Get the session data for a user
@@ -84,7 +109,7 @@ class MessageRouter:
         Returns:
             The session data for the user
         """
-        return self.user_sessions.get(user_id, {})
+        return self.user_sessions.get(user_id) or {}
     
     def get_user_language(self, user_id: str) -> str:
         """Get the language preference for a user
@@ -118,19 +143,33 @@ class MessageRouter:
             
             # Process each message in the payload
             responses = []
+            duplicates = 0
             for message in messages:
                 phone_number = message.get("from")
+                message_id = message.get("id")
+                
+                # Skip redelivered messages before doing any parsing
+                if message_id and self.dedupe_store.check_and_mark(message_id):
+                    whatsapp_logger.log_duplicate_message(message_id, phone_number)
+                    duplicates += 1
+                    continue
+                
                 message_text = message.get("text", {}).get("body", "")
                 
                 if not phone_number or not message_text:
                     whatsapp_logger.log_error("Invalid message format in webhook payload", "ValidationError", None)
                     continue
                 
-                # Process the message
-                response = self.process_message(phone_number, message_text)
+                # Process the message; on failure forget the id so the redelivery is processed
+                try:
+                    response = self.process_message(phone_number, message_text)
+                except Exception:
+                    if message_id:
+                        self.dedupe_store.forget(message_id)
+                    raise
                 responses.append({"to": phone_number, "response": response})
             
-            return {"status": "success", "responses": responses}
+            return {"status": "success", "responses": responses, "duplicates": duplicates}
         
         except Exception as e:
             # Log the error
@@ -3375,4 +3375,175 @@ def extract_mixed_edit_stock_details(command_text):
                     'confidence': 0.9
                 }
     
-    return result
\ No newline at end of file
+    return result
+
+# Separators between items of a multi-item stock update, e.g. "chawal 20, dal 15 aur aloo 40"
+STOCK_ITEM_SEPARATOR_PATTERN = re.compile(r'\n|[,;&]|\s+(?:and|aur|और|tatha|तथा)\s+', re.IGNORECASE)
+
+# Command words that may lead a stock list or its first item ("update stock: chawal 20")
+STOCK_COMMAND_WORDS = {
+    'update', 'edit', 'set', 'change', 'stock', 'inventory', 'of', 'to', 'qty', 'quantity', 'new',
+    'karo', 'kardo', 'kar', 'do', 'ka', 'ki', 'ko', 'hai',
+    'अपडेट', 'स्टॉक', 'इन्वेंटरी', 'बदलो', 'बदलें', 'करो', 'करें', 'कर', 'दो', 'का', 'की', 'को', 'है', 'मात्रा'
+}
+
+# A stock list item: a name, an optional ":" "=" or spaced "-" separator, a quantity and an optional unit.
+# Units are any non-digit token, since Devanagari vowel signs (as in "किलो") are not word characters.
+STOCK_ITEM_PATTERN = re.compile(r'^(?P<name>.*?[^\W\d_].*?)(?:\s*[:=]\s*|\s+[-–]\s+|\s*)(?P<stock>-?\d+)\s*(?P<unit>[^\d\s]+)?$')
+
+# Words that make a "name number" pair something other than a stock quantity (prices, orders, dates)
+NON_STOCK_KEYWORDS = {
+    'price', 'prices', 'rate', 'mrp', 'cost', 'rs', 'rupee', 'rupees', 'inr', 'daam', 'dam', 'keemat', 'kimat',
+    'order', 'orders', 'id', 'day', 'days', 'din', 'week', 'weeks', 'month', 'months', 'year', 'years',
+    'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october',
+    'november', 'december', 'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+    'दाम', 'कीमत', 'रुपये', 'रुपए', 'रु', 'ऑर्डर', 'आर्डर', 'दिन', 'हफ्ते', 'हफ़्ते', 'महीने', 'महीना', 'साल',
+    'जनवरी', 'फरवरी', 'मार्च', 'अप्रैल', 'मई', 'जून', 'जुलाई', 'अगस्त', 'सितंबर', 'अक्टूबर', 'नवंबर', 'दिसंबर'
+}
+
+# Words that mark a message as a stock update, so an unrecognized message may be read as a stock list
+STOCK_LIST_KEYWORDS = {'stock', 'inventory', 'qty', 'quantity', 'स्टॉक', 'इन्वेंटरी', 'मात्रा'}
+
+# Lower-cased alias -> standardized product name, for whole-word matches only
+PRODUCT_ALIASES = {
+    variation.lower(): standard_name
+    for standard_name, variations in PRODUCT_NAME_VARIATIONS.items()
+    for variation in variations
+}
+
+# Standardized product names, i.e. what stock list items known as aliases are named
+KNOWN_PRODUCT_NAMES = set(PRODUCT_ALIASES.values())
+
+
+def _stock_list_tokens(text):
+    # Split on spaces, digits and separators; Devanagari vowel signs stay inside their word
+    return re.findall(r'[^\s\d:;=,.\-–]+', text.lower())
+
+
+def is_stock_list_message(command_text):
+    """
+    Check whether a message not otherwise recognized may be a multi-item stock update:
+    it is a list of lines, or it names stock ("stock: chawal 20, dal 15").
+    
+    Args:
+        command_text (str): The raw message
+        
+    Returns:
+        bool: True if the message may be read with extract_mixed_edit_stock_items
+    """
+    if not command_text:
+        return False
+    if '\n' in command_text.strip():
+        return True
+    return any(token in STOCK_LIST_KEYWORDS for token in _stock_list_tokens(command_text))
+
+
+def standardize_stock_item_name(name_words):
+    """
+    Standardize a stock list item's name when its words are a known product alias.
+    
+    Only whole words (or the whole name, for aliases like "refined flour") match,
+    so "price" is not rice and "tea" is not tel. Names matching several products
+    are ambiguous and kept as written.
+    
+    Args:
+        name_words (list): The item's name words
+        
+    Returns:
+        str or None: The standardized product name, or None
+    """
+    name = ' '.join(name_words).lower()
+    if name in PRODUCT_ALIASES:
+        return PRODUCT_ALIASES[name]
+    matches = {PRODUCT_ALIASES[word.lower()] for word in name_words if word.lower() in PRODUCT_ALIASES}
+    return matches.pop() if len(matches) == 1 else None
+
+
+def extract_mixed_edit_stock_items(command_text):
+    """
+    Extract every (product, quantity) pair from a multi-item stock update.
+    Handles lists like:
+    - "chawal 20, dal 15, aloo 40"
+    - "update stock: rice 10kg; sugar 5 kg"
+    - "stock update\nchawal 20\ndal 15\naloo 40"
+    - "चावल 20 किलो और दाल 15"
+    
+    Items are split on new lines, commas, semicolons, '&' and 'and'/'aur'/'और'.
+    Each item must have exactly one number, and no word of prices, orders or
+    dates; otherwise the message is not read as a stock list. An item's name is
+    standardized when its words are a known product alias, and kept as
+    written otherwise.
+    
+    Args:
+        command_text (str): The command text to extract items from
+        
+    Returns:
+        list: [{'name', 'stock', 'confidence'}, ...] in message order, or an empty
+        list when the message names fewer than two products (single updates keep
+        using extract_mixed_edit_stock_details)
+    """
+    if not command_text:
+        return []
+    
+    items = []
+    for segment in STOCK_ITEM_SEPARATOR_PATTERN.split(command_text):
+        segment = segment.strip(" \t.:-")
+        numbers = re.findall(r'\d+', segment)
+        if not numbers:
+            # Headers such as "stock update" carry no quantity
+            continue
+        if len(numbers) > 1 or '₹' in segment:
+            # "dal 15 price 30" or "2kg sugar to 7kg": which number is the stock is a guess
+            return []
+        if any(token in NON_STOCK_KEYWORDS for token in _stock_list_tokens(segment)):
+            return []
+        
+        # Drop leading command words, keeping the product words that follow
+        words = segment.replace(':', ' ').split()
+        while words and words[0].lower() in STOCK_COMMAND_WORDS:
+            words.pop(0)
+        # Drop trailing verbs of "chawal ka stock 20 karo"
+        while words and words[-1].lower() in STOCK_COMMAND_WORDS:
+            words.pop()
+        
+        match = STOCK_ITEM_PATTERN.match(' '.join(words))
+        if not match:
+            # A quantity without a product name; not a stock list
+            return []
+        name_words = [word for word in match.group('name').split() if word.lower() not in STOCK_COMMAND_WORDS]
+        if not name_words:
+            return []
+        
+        standardized = standardize_stock_item_name(name_words)
+        if standardized:
+            items.append({'name': standardized, 'stock': int(match.group('stock')), 'confidence': 0.9})
+        else:
+            items.append({'name': ' '.join(name_words), 'stock': int(match.group('stock')), 'confidence': 0.5})
+    
+    return items if len(items) >= 2 else []
+
+
+def extract_stock_list_items(command_text, intent):
+    """
+    Read a multi-item stock update out of a message the parsers have classified.
+    
+    A list of several "product quantity" pairs is one multi-item stock update;
+    it is read from the raw message, before commas and newlines are normalized
+    away. Unrecognized messages qualify when they name stock or are a list of
+    lines, or when every item is a known product alias ("chawal 20, dal 15,
+    aloo 40"), so order numbers and dates are never read as stock.
+    
+    Args:
+        command_text (str): The raw message
+        intent (str): The intent the parser recognized
+        
+    Returns:
+        list: The items from extract_mixed_edit_stock_items, or an empty list
+    """
+    if intent not in ('edit_stock', 'unknown') or not isinstance(command_text, str):
+        return []
+    items = extract_mixed_edit_stock_items(command_text)
+    if intent == 'unknown' and not is_stock_list_message(command_text) and not all(
+            item['name'] in KNOWN_PRODUCT_NAMES for item in items):
+        return []
+    return items
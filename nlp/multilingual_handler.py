@@ -4,6 +4,8 @@ from typing import Dict, Any
 # Import our intent handlers using relative imports
 from .intent_handler import parse_command, detect_language
 from .hindi_support import parse_hindi_command
+from .mixed_entity_extraction import extract_stock_list_items
+from utils.metrics import StageTimer, nlp_stage_seconds
 
 # Setup logging
 logging.basicConfig(
@@ -23,8 +25,11 @@ def parse_multilingual_command(message: str) -> Dict[str, Any]:
     Returns:
         A dictionary with 'intent', 'entities', and 'language' keys
     """
+    timer = StageTimer()
+    
     # Detect the language
     language = detect_language(message)
+    timer.lap("language_detection")
     logger.info(f"Detected language: {language} for message: {message}")
     
     # Parse based on language
@@ -35,8 +40,17 @@ def parse_multilingual_command(message: str) -> Dict[str, Any]:
         result = parse_command(message)
         logger.info(f"English intent recognized: {result['intent']}")
     
+    # Several "product quantity" pairs are one multi-item stock update
+    items = extract_stock_list_items(message, result['intent'])
+    if items:
+        result = {'intent': 'edit_stock', 'entities': {'items': items}}
+        logger.info(f"Multi-item stock update recognized: {len(items)} items")
+    
+    timer.lap("intent_matching")
+    
     # Add language to the result
     result['language'] = language
+    timer.observe(nlp_stage_seconds, intent=result['intent'] or "none", language=language)
     
     return result
 
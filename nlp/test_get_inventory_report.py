@@ -26,8 +26,8 @@ def test_get_inventory_report_command():
     with patch('nlp.command_router.make_api_request') as mock_api:
         # Configure mock to return a success response
         mock_api.return_value = {
-            "success": True,
-            "message": "Inventory report generated successfully"
+            "job_id": 1,
+            "status": "queued"
         }
         
         # Import here to use the patched version
@@ -37,13 +37,13 @@ def test_get_inventory_report_command():
         result = process_command("inventory report", "en", "user123")
         print(f"Command: 'inventory report'")
         print(f"Result: {result}")
-        assert "generated successfully" in result.lower(), "Expected success message not found"
+        assert "being prepared" in result.lower(), "Expected queued message not found"
         
         # Test another English command variation
         result = process_command("generate inventory report", "en", "user123")
         print(f"Command: 'generate inventory report'")
         print(f"Result: {result}")
-        assert "generated successfully" in result.lower(), "Expected success message not found"
+        assert "being prepared" in result.lower(), "Expected queued message not found"
 
 def test_get_inventory_report_command_hindi():
     """
@@ -55,8 +55,8 @@ def test_get_inventory_report_command_hindi():
     with patch('nlp.command_router.make_api_request') as mock_api:
         # Configure mock to return a success response
         mock_api.return_value = {
-            "success": True,
-            "message": "Inventory report generated successfully"
+            "job_id": 1,
+            "status": "queued"
         }
         
         # Import here to use the patched version
@@ -66,13 +66,31 @@ def test_get_inventory_report_command_hindi():
         result = process_command("इन्वेंटरी रिपोर्ट", "hi", "user123")
         print(f"Command: 'इन्वेंटरी रिपोर्ट'")
         print(f"Result: {result}")
-        assert "सफलतापूर्वक" in result.lower(), "Expected success message not found"
+        assert "तैयार" in result.lower(), "Expected queued message not found"
         
         # Test another Hindi command variation
         result = process_command("इन्वेंटरी रिपोर्ट जनरेट करें", "hi", "user123")
         print(f"Command: 'इन्वेंटरी रिपोर्ट जनरेट करें'")
         print(f"Result: {result}")
-        assert "सफलतापूर्वक" in result.lower(), "Expected success message not found"
+        assert "तैयार" in result.lower(), "Expected queued message not found"
+
+def test_inventory_report_is_delivered_to_the_sender():
+    """
+    Test that the report job is addressed to the sender's WhatsApp number, not the auth user id
+    """
+    from nlp.message_router import MessageRouter
+    from utils.session_store import MemorySessionStore
+    
+    parsed_result = {"intent": "get_inventory_report", "entities": {}, "language": "en"}
+    with patch('nlp.message_router.parse_multilingual_command', return_value=parsed_result), \
+            patch('nlp.command_router.make_api_request', return_value={"job_id": 1, "status": "queued"}) as mock_api:
+        router = MessageRouter(session_store=MemorySessionStore())
+        result = router.process_message("919876543210", "inventory report")
+    
+    assert "being prepared" in result.lower(), "Expected queued message not found"
+    endpoint_path, method, params, data, user_id = mock_api.call_args[0]
+    assert data["deliver_to"] == "919876543210"
+    assert user_id == "whatsapp-919876543210"
 
 def test_inventory_report_api_endpoint():
     """
@@ -95,7 +113,7 @@ def test_inventory_report_api_endpoint():
     # For actual testing, you would need valid authentication
     # This is a placeholder for manual testing
     print("To test the API endpoint manually:")
-    print(f"1. GET {BASE_URL}/inventory/report")
+    print(f"1. GET {BASE_URL}/inventory/report (or POST {BASE_URL}/jobs/report with type=inventory)")
     print("2. Include valid authentication token")
     print("3. Verify that a PDF file is returned")
 
@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.orm import Session
+from typing import Optional
+import base64
+import binascii
+import json
+from models.base import Order
+from auth.dependencies import get_current_user, require_role
+from backend.database import get_db
+from routes.reports import get_report_days, seller_prices
+from utils.order_rollup import ist_day_bounds
+
+router = APIRouter(
+    prefix="/seller/customers",
+    tags=["customers"],
+    dependencies=[Depends(require_role("seller"))]
+)
+
+
+def encode_cursor(values: dict) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor"""
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor from encode_cursor, raising 400 if it is malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, dict) or not isinstance(values.get("buyer"), str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def customer_totals_query(seller_id: int, start_date, end_date, sort: str, cursor: Optional[dict], limit: int):
+    """Build the per-buyer aggregation for one page of the customer report
+
+    Sorting by buyer filters on the keyset before grouping, so the
+    (buyer, date) index feeds groups in order and the scan stops after the
+    page. Sorting by spend ranks every buyer in the range, then seeks past
+    the cursor with HAVING.
+    """
+    prices = seller_prices(seller_id)
+    spend = func.sum(Order.quantity * prices.c.price)
+    statement = (
+        select(
+            Order.buyer,
+            func.count(Order.id).label("order_count"),
+            func.sum(Order.quantity).label("units"),
+            spend.label("total_spent"),
+            func.max(Order.date).label("last_order_date")
+        )
+        .select_from(Order)
+        .join(prices, prices.c.name == Order.product)
+        .where(Order.date >= start_date, Order.date <= end_date)
+        .group_by(Order.buyer)
+    )
+
+    if sort == "buyer":
+        if cursor is not None:
+            statement = statement.where(Order.buyer > cursor["buyer"])
+        statement = statement.order_by(Order.buyer)
+    else:
+        if cursor is not None:
+            try:
+                cursor_spend = float(cursor["spend"])
+            except (KeyError, TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            statement = statement.having(or_(
+                spend < cursor_spend,
+                and_(spend == cursor_spend, Order.buyer > cursor["buyer"])
+            ))
+        statement = statement.order_by(spend.desc(), Order.buyer)
+
+    # One extra row tells whether another page exists
+    return statement.limit(limit + 1)
+
+
+@router.get("/report")
+def get_customer_report(
+    range: str = Query("this-month", description="Date range (today, yesterday, week, this-week, this-month, all) or 'YYYY-MM-DD,YYYY-MM-DD'"),
+    start_date: Optional[str] = Query(None, description="Start date in YYYY-MM-DD format (for custom range)"),
+    end_date: Optional[str] = Query(None, description="End date in YYYY-MM-DD format (for custom range)"),
+    limit: int = Query(10, ge=1, le=500),
+    sort: str = Query("spend", pattern="^(spend|buyer)$", description="Rank by total spend or page by buyer name"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get per-buyer order count, units, spend and last order date for a date range, one page at a time"""
+    seller_id = current_user.get("id")
+    if not seller_id:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+    start_day, end_day = get_report_days(range, start_date, end_date)
+    start, end = ist_day_bounds(start_day, end_day)
+    position = decode_cursor(cursor) if cursor else None
+    rows = db.execute(customer_totals_query(seller_id, start, end, sort, position, limit)).all()
+
+    customers = [
+        {
+            "name": row.buyer,
+            "order_count": row.order_count,
+            "units": row.units,
+            "total_spent": round(row.total_spent, 2),
+            "last_order_date": row.last_order_date.isoformat() if row.last_order_date else None
+        }
+        for row in rows[:limit]
+    ]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor({"buyer": last.buyer, "spend": last.total_spent} if sort == "spend"
+                                    else {"buyer": last.buyer})
+
+    return {
+        "customers": customers,
+        "time_range": range,
+        "start_date": start_day.isoformat(),
+        "end_date": end_day.isoformat(),
+        "sort": sort,
+        "next_cursor": next_cursor
+    }
@@ -1,22 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, case
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from pydantic import BaseModel
-from models.base import Product
+from typing import Iterable, Iterator, List, Optional
+from pydantic import BaseModel, Field
+from models.base import Product, SessionLocal
 from auth.dependencies import get_current_user, require_role
 from backend.database import get_db
+from utils.pagination import keyset_page, set_next_page, PAGE_MAX_LIMIT
+from utils.pdf_render_pool import pdf_render_pool
+from utils.report_cache import report_cache, etag_for, etag_matches, not_modified_response, pdf_response
+from utils.report_streaming import StreamedFlowables, table_chunks, iter_csv
+from utils.inventory_feed import latest_change_seq
+from utils.stock_mutations import set_stock, adjust_stock, reserve_stock
+from utils.report_template import (
+    INVENTORY_TABLE, NORMAL_STYLE, SUMMARY_STYLE, column_value_styles, report_header
+)
 import io
+import itertools
+import os
 from datetime import datetime
 import pytz
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.units import inch
 
 # Define IST timezone for reuse
 IST_TZ = pytz.timezone('Asia/Kolkata')
 
+# Products with less stock than this are reported as low stock
+LOW_STOCK_THRESHOLD = 10
+
+# Product rows fetched per round trip when streaming CSV exports
+REPORT_PAGE_SIZE = int(os.getenv("REPORT_PAGE_SIZE", 1000))
+
 router = APIRouter(
     prefix="/inventory",
     tags=["inventory"],
@@ -26,182 +45,305 @@ router = APIRouter(
 class InventoryUpdateRequest(BaseModel):
     product_id: int
     stock: int
+    # Only update if the product is still at this version
+    expected_version: Optional[int] = None
+
+class InventoryAdjustRequest(BaseModel):
+    product_id: int
+    delta: int
+    expected_version: Optional[int] = None
+
+class InventoryReserveRequest(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
 
 @router.get("/", response_model=List[dict])
-async def get_inventory(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    products = db.query(Product).filter(Product.seller_id == current_user.get("sub")).all()
-    return [{"id": p.id, "name": p.name, "stock": p.stock} for p in products]
+def get_inventory(
+    request: Request,
+    response: Response,
+    cursor: Optional[int] = Query(None, ge=0, description="X-Next-Cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT, description="Rows per page; unpaged without cursor or limit"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """List the seller's stock levels by product id, one page at a time"""
+    products, next_cursor = keyset_page(
+        db, (Product.id, Product.name, Product.stock), [Product.seller_id == current_user.get("sub")],
+        Product.id, cursor, limit
+    )
+    set_next_page(request, response, next_cursor)
+    return products
+
+def stock_conflict(db: Session, product_id: int, seller_id, reason: str) -> HTTPException:
+    """Explain why a conditional stock update changed nothing: unknown product (404) or a failed condition (409)"""
+    exists = db.execute(
+        select(Product.id).where(Product.id == product_id, Product.seller_id == seller_id)
+    ).first()
+    if exists is None:
+        return HTTPException(status_code=404, detail="Product not found")
+    return HTTPException(status_code=409, detail=reason)
 
 @router.post("/update")
-async def update_stock(update_request: InventoryUpdateRequest, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.id == update_request.product_id, Product.seller_id == current_user.get("sub")).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
+def update_stock(update_request: InventoryUpdateRequest, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     # Validate that stock is not negative
     if update_request.stock < 0:
         return {"error": "Quantity cannot be negative."}
     
-    # Handle zero/blank quantity with a default value of 0
-    stock_value = update_request.stock if update_request.stock is not None else 0
-    
-    product.stock = stock_value
+    product = set_stock(db, current_user.get("sub"), update_request.product_id, update_request.stock,
+                        update_request.expected_version)
+    if product is None:
+        raise stock_conflict(db, update_request.product_id, current_user.get("sub"),
+                             "Product was changed by another update; reload it and try again")
     db.commit()
-    return {"reply": f"📦 Stock for Product ID {update_request.product_id} updated to {stock_value} units."}
+    return {"reply": f"📦 Stock for Product ID {update_request.product_id} updated to {product['stock']} units.",
+            "product": product}
 
+@router.post("/adjust")
+def adjust_inventory(adjust_request: InventoryAdjustRequest, current_user: dict = Depends(get_current_user),
+                     db: Session = Depends(get_db)):
+    """Add to (positive delta) or take from (negative delta) a product's stock
 
-def generate_inventory_pdf_report(products: List[dict], seller_info: dict):
-    """Generate PDF inventory report using ReportLab"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    elements = []
+    The change is applied by the database, so concurrent adjustments from
+    WhatsApp and the dashboard all count; stock never goes below zero.
+    """
+    product = adjust_stock(db, current_user.get("sub"), adjust_request.product_id, adjust_request.delta,
+                           adjust_request.expected_version)
+    if product is None:
+        raise stock_conflict(db, adjust_request.product_id, current_user.get("sub"),
+                             "Not enough stock, or the product was changed by another update")
+    db.commit()
+    return {"reply": f"📦 Stock for Product ID {adjust_request.product_id} is now {product['stock']} units.",
+            "product": product}
+
+@router.post("/reserve")
+def reserve_inventory(reserve_request: InventoryReserveRequest, current_user: dict = Depends(get_current_user),
+                      db: Session = Depends(get_db)):
+    """Take `quantity` units of a product only if all of them are in stock"""
+    product = reserve_stock(db, current_user.get("sub"), reserve_request.product_id, reserve_request.quantity)
+    if product is None:
+        raise stock_conflict(db, reserve_request.product_id, current_user.get("sub"), "Not enough stock")
+    db.commit()
+    return {"reply": f"📦 Reserved {reserve_request.quantity} units of Product ID {reserve_request.product_id}.",
+            "product": product}
+
+
+def inventory_status(stock: int) -> str:
+    """Get the stock status shown in inventory reports"""
+    if stock == 0:
+        return "Out of Stock"
+    elif stock < LOW_STOCK_THRESHOLD:
+        return "Low Stock"
+    return "In Stock"
+
+
+# Color code the status column
+INVENTORY_STATUS_STYLES = {
+    "Out of Stock": [('TEXTCOLOR', colors.red)],
+    "Low Stock": [('TEXTCOLOR', colors.orange)]
+}
+
+
+def _inventory_status_style(rows) -> list:
+    return column_value_styles(rows, 3, INVENTORY_STATUS_STYLES)
+
+
+def generate_inventory_pdf_report(products: Iterable[dict], seller_info: dict, output=None,
+                                  summary: Optional[dict] = None):
+    """Generate PDF inventory report using ReportLab
     
-    # Add title
-    title_style = styles["Title"]
-    title = Paragraph(f"Inventory Report", title_style)
-    elements.append(title)
-    elements.append(Spacer(1, 0.25*inch))
+    The product table is laid out in LongTable chunks pulled lazily from
+    products, so only the chunk being placed is held as flowables.
     
-    # Add seller info
-    seller_style = ParagraphStyle(
-        'SellerInfo',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=12
-    )
-    seller_text = f"Seller: {seller_info.get('email', 'Unknown')}<br/>"
+    Args:
+        products: Product rows with id, name and stock; may be a generator when summary is given
+        seller_info: The authenticated seller
+        output: File path or binary file to write to; the PDF bytes are returned if omitted
+        summary: Precomputed totals from load_inventory_summary; computed from products if omitted
+    """
+    buffer = io.BytesIO() if output is None else output
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
     
-    # Get current time in IST for the report
+    # Add title and seller info, with the current time in IST
     ist_now = datetime.now(pytz.UTC).astimezone(IST_TZ)
-    seller_text += f"Generated on: {ist_now.strftime('%Y-%m-%d %H:%M:%S')} [IST]"
-    
-    elements.append(Paragraph(seller_text, seller_style))
-    elements.append(Spacer(1, 0.25*inch))
+    elements = report_header("Inventory Report", [
+        f"Seller: {seller_info.get('email') or seller_info.get('name') or 'Unknown'}",
+        f"Generated on: {ist_now.strftime('%Y-%m-%d %H:%M:%S')} [IST]"
+    ])
     
     # Summary statistics
-    total_products = len(products)
-    total_stock = sum(product.get('stock', 0) for product in products)
-    low_stock_count = sum(1 for product in products if product.get('stock', 0) < 10)  # Assuming 10 is low stock threshold
-    out_of_stock = sum(1 for product in products if product.get('stock', 0) == 0)
-    
-    summary_style = ParagraphStyle(
-        'Summary',
-        parent=styles['Normal'],
-        fontSize=12,
-        leading=14,
-        spaceAfter=12
-    )
-    summary_text = f"<b>Total Products:</b> {total_products}<br/>"
-    summary_text += f"<b>Total Stock Units:</b> {total_stock}<br/>"
-    summary_text += f"<b>Low Stock Items:</b> {low_stock_count}<br/>"
-    summary_text += f"<b>Out of Stock Items:</b> {out_of_stock}"
-    elements.append(Paragraph(summary_text, summary_style))
+    if summary is None:
+        products = list(products)
+        summary = {
+            "total_products": len(products),
+            "total_stock": sum(product.get('stock', 0) for product in products),
+            "low_stock": sum(1 for product in products if product.get('stock', 0) < LOW_STOCK_THRESHOLD),
+            "out_of_stock": sum(1 for product in products if product.get('stock', 0) == 0)
+        }
+    
+    summary_text = f"<b>Total Products:</b> {summary['total_products']}<br/>"
+    summary_text += f"<b>Total Stock Units:</b> {summary['total_stock']}<br/>"
+    summary_text += f"<b>Low Stock Items:</b> {summary['low_stock']}<br/>"
+    summary_text += f"<b>Out of Stock Items:</b> {summary['out_of_stock']}"
+    elements.append(Paragraph(summary_text, SUMMARY_STYLE))
     elements.append(Spacer(1, 0.25*inch))
     
     # Create table for inventory
-    if products:
-        data = [["Product ID", "Product Name", "Stock", "Status"]]
-        for product in products:
-            stock = product.get('stock', 0)
-            
-            # Determine status based on stock level
-            if stock == 0:
-                status = "Out of Stock"
-            elif stock < 10:  # Assuming 10 is low stock threshold
-                status = "Low Stock"
-            else:
-                status = "In Stock"
-            
-            data.append([
-                product.get('id', 'N/A'),
-                product.get('name', 'N/A'),
-                stock,
-                status
-            ])
-        
-        # Create the table
-        table = Table(data, colWidths=[0.8*inch, 3*inch, 0.8*inch, 1.2*inch])
-        
-        # Add style to the table
-        table_style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ])
-        
-        # Add zebra striping
-        for i in range(1, len(data)):
-            if i % 2 == 0:
-                table_style.add('BACKGROUND', (0, i), (-1, i), colors.white)
-            
-            # Add color coding for status
-            status_col = 3
-            status = data[i][status_col]
-            if status == "Out of Stock":
-                table_style.add('TEXTCOLOR', (status_col, i), (status_col, i), colors.red)
-            elif status == "Low Stock":
-                table_style.add('TEXTCOLOR', (status_col, i), (status_col, i), colors.orange)
-        
-        table.setStyle(table_style)
-        elements.append(table)
+    if summary["total_products"]:
+        rows = (
+            [product.get('id', 'N/A'), product.get('name', 'N/A'), product.get('stock', 0),
+             inventory_status(product.get('stock', 0))]
+            for product in products
+        )
+        tables = table_chunks(INVENTORY_TABLE, rows, _inventory_status_style)
     else:
-        elements.append(Paragraph("No products found in inventory.", styles["Normal"]))
+        tables = [Paragraph("No products found in inventory.", NORMAL_STYLE)]
     
     # Build the PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer.getvalue()
+    doc.build(StreamedFlowables(itertools.chain(elements, tables)))
+    if output is None:
+        return buffer.getvalue()
+
+
+def load_inventory_summary(db: Session, seller_id) -> dict:
+    """Count a seller's products, stock units, low stock and out of stock items in SQL"""
+    stock = func.coalesce(Product.stock, 0)
+    total_products, total_stock, low_stock, out_of_stock = db.query(
+        func.count(Product.id),
+        func.coalesce(func.sum(stock), 0),
+        func.coalesce(func.sum(case((stock < LOW_STOCK_THRESHOLD, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((stock == 0, 1), else_=0)), 0)
+    ).filter(Product.seller_id == seller_id).one()
+    return {"total_products": total_products, "total_stock": total_stock,
+            "low_stock": low_stock, "out_of_stock": out_of_stock}
+
+
+def iter_inventory_rows(db: Session, seller_id, page_size: int = REPORT_PAGE_SIZE) -> Iterator[dict]:
+    """Stream a seller's products from a server-side cursor, page_size rows per fetch
+    
+    Yields:
+        dicts with id, name and stock
+    """
+    statement = (
+        select(Product.id, Product.name, Product.stock)
+        .where(Product.seller_id == seller_id)
+        .order_by(Product.id)
+        .execution_options(yield_per=page_size)
+    )
+    for row in db.execute(statement):
+        yield {"id": row.id, "name": row.name, "stock": row.stock or 0}
+
+
+def iter_inventory_csv_rows(db: Session, seller_id, page_size: int = REPORT_PAGE_SIZE) -> Iterator[list]:
+    """Stream a seller's products from a server-side cursor as CSV rows"""
+    for product in iter_inventory_rows(db, seller_id, page_size):
+        yield [product["id"], product["name"], product["stock"], inventory_status(product["stock"])]
+
+
+def render_inventory_report(seller_id, seller_info: dict, summary: dict, output):
+    """Render an inventory report PDF in a render pool worker
+    
+    The worker streams the products through its own session, so only the
+    seller crosses the process boundary.
+    """
+    with SessionLocal() as db:
+        generate_inventory_pdf_report(iter_inventory_rows(db, seller_id), seller_info, output=output,
+                                      summary=summary)
+
+
+def load_inventory_version(db: Session, seller_id) -> str:
+    """Get a data version of a seller's products for the report cache key
+    
+    Every product write appends to the inventory change feed, so the seller's
+    newest change sequence number moves exactly when their report would change.
+    """
+    return f"feed:{latest_change_seq(db, seller_id)}"
+
+
+def inventory_report_filename(type: str = "pdf") -> str:
+    # Named after the current IST date
+    ist_now = datetime.now(pytz.UTC).astimezone(IST_TZ)
+    return f"inventory_report_{ist_now.strftime('%Y%m%d')}_IST.{type}"
+
+
+async def load_inventory_report_key(db: Session, owner) -> str:
+    """Get the report cache key of an inventory report from the products' data version"""
+    version = await run_in_threadpool(load_inventory_version, db, owner)
+    return report_cache.key("inventory", owner, version)
+
+
+async def open_inventory_report(db: Session, seller_info: dict, cache_key: str, wait_for_slot: bool = False):
+    """Open an inventory report PDF from the report cache, rendering it on a miss
+    
+    Args:
+        wait_for_slot: Wait for the render pool instead of raising 503 when it is full
+    
+    Returns:
+        (open binary file, mtime)
+    """
+    cached = await run_in_threadpool(report_cache.open, cache_key)
+    if cached is not None:
+        return cached
+    
+    # Totals for this seller's products
+    summary = await run_in_threadpool(load_inventory_summary, db, seller_info.get("sub"))
+    
+    # Render in the PDF process pool straight into a cache temp file, so
+    # neither the products nor the PDF are ever buffered in this process
+    render = pdf_render_pool.render_when_free if wait_for_slot else pdf_render_pool.render
+    tmp_path = report_cache.temp_path()
+    try:
+        await render(
+            "inventory",
+            render_inventory_report,
+            seller_id=seller_info.get("sub"),
+            seller_info=dict(seller_info),
+            output=tmp_path,
+            summary=summary
+        )
+    except BaseException:
+        report_cache.discard(tmp_path)
+        raise
+    return await run_in_threadpool(report_cache.commit, cache_key, tmp_path)
 
 
 @router.get("/report")
 async def get_inventory_report(
-    type: str = Query("pdf", description="Report type (pdf only for now)"),
+    type: str = Query("pdf", description="Report type: pdf or csv"),
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Generate an inventory report for the seller"""
-    if type != "pdf":
-        raise HTTPException(status_code=400, detail="Only PDF reports are supported at this time")
+    """Generate an inventory report for the seller
+    
+    Rendered PDFs are cached on disk per seller and data version; a
+    matching If-None-Match gets 304 without touching the cache. CSV exports
+    stream straight from the database.
+    """
+    if type not in ("pdf", "csv"):
+        raise HTTPException(status_code=400, detail="Only PDF and CSV reports are supported")
     
     # Get seller ID from authenticated user
     seller_id = current_user.get("id")
     if not seller_id:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     
-    # Query products for this seller
-    products = db.query(Product).filter(Product.seller_id == current_user.get("sub")).all()
-    
-    # Convert products to dict for the PDF generator
-    products_data = []
-    for product in products:
-        products_data.append({
-            "id": product.id,
-            "name": product.name,
-            "stock": product.stock
-        })
-    
-    # Generate PDF
-    pdf_data = generate_inventory_pdf_report(
-        products=products_data,
-        seller_info=current_user
-    )
+    # Create filename with current date
+    filename = inventory_report_filename(type)
     
-    # Get current time in IST for filename
-    ist_now = datetime.now(pytz.UTC).astimezone(IST_TZ)
+    if type == "csv":
+        rows = iter_inventory_csv_rows(db, current_user.get("sub"))
+        return StreamingResponse(
+            iter_csv(["Product ID", "Product Name", "Stock", "Status"], rows),
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
     
-    # Create filename with current date
-    filename = f"inventory_report_{ist_now.strftime('%Y%m%d')}_IST.pdf"
-    
-    # Return PDF as downloadable file
-    return Response(
-        content=pdf_data,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
\ No newline at end of file
+    # Unchanged inventory is served from the report cache
+    cache_key = await load_inventory_report_key(db, current_user.get("sub"))
+    etag = etag_for(cache_key)
+    if etag_matches(etag, if_none_match):
+        return not_modified_response(etag)
+    
+    # Stream the PDF file as a download
+    pdf_file, last_modified = await open_inventory_report(db, current_user, cache_key)
+    return pdf_response(pdf_file, filename, etag, last_modified)
\ No newline at end of file
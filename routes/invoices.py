@@ -1,15 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from datetime import datetime
+from collections import deque
 from models.base import Order, Product
 from auth.dependencies import get_current_user, require_role
 from backend.database import get_db
+from routes.reports import get_report_days, seller_prices
+from utils.order_rollup import ist_day_bounds
+from utils.pdf_render_pool import pdf_render_pool, PDF_RENDER_RETRY_AFTER
+from utils.report_template import (
+    INVOICE_TABLE, TITLE_STYLE, INFO_STYLE, INVOICE_SUMMARY_STYLE, FOOTER_STYLE
+)
+from utils.ttl_cache import TTLCache
+import asyncio
 import io
+import logging
+import os
+import uuid
+import zipfile
 from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.units import inch
 
 router = APIRouter(
@@ -18,6 +33,22 @@ router = APIRouter(
     dependencies=[Depends(require_role("seller"))]
 )
 
+logger = logging.getLogger("invoices")
+
+# Orders allowed in one batch request
+INVOICE_BATCH_MAX_ORDERS = int(os.getenv("INVOICE_BATCH_MAX_ORDERS", 1000))
+
+# Progress of batch downloads, kept for a while after the last update
+invoice_batch_progress = TTLCache(ttl_seconds=float(os.getenv("INVOICE_BATCH_PROGRESS_TTL_SECONDS", 3600)))
+
+
+class InvoiceBatchRequest(BaseModel):
+    """Orders to invoice: explicit ids, or a report range / custom dates"""
+    order_ids: Optional[List[int]] = None
+    range: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
 
 def generate_invoice_pdf(order_data: dict, seller_info: dict, customer_info: dict):
     """
@@ -28,55 +59,34 @@ def generate_invoice_pdf(order_data: dict, seller_info: dict, customer_info: dic
     """
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
     elements = []
     
     # Add title
-    title_style = styles["Title"]
-    title = Paragraph(f"Invoice", title_style)
-    elements.append(title)
+    elements.append(Paragraph("Invoice", TITLE_STYLE))
     elements.append(Spacer(1, 0.25*inch))
     
     # Add invoice number and date
-    invoice_style = ParagraphStyle(
-        'InvoiceInfo',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=12
-    )
     invoice_text = f"Invoice #: {order_data.get('id', 'N/A')}<br/>"
     invoice_text += f"Date: {datetime.now().strftime('%Y-%m-%d')}<br/>"
-    elements.append(Paragraph(invoice_text, invoice_style))
+    elements.append(Paragraph(invoice_text, INFO_STYLE))
     elements.append(Spacer(1, 0.25*inch))
     
     # Add seller info
-    seller_style = ParagraphStyle(
-        'SellerInfo',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=12
-    )
     seller_text = f"<b>Seller:</b><br/>"
     seller_text += f"{seller_info.get('name', 'Unknown')}<br/>"
     seller_text += f"{seller_info.get('email', '')}<br/>"
-    elements.append(Paragraph(seller_text, seller_style))
+    elements.append(Paragraph(seller_text, INFO_STYLE))
     elements.append(Spacer(1, 0.25*inch))
     
     # Add customer info
-    customer_style = ParagraphStyle(
-        'CustomerInfo',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=12
-    )
     customer_text = f"<b>Customer:</b><br/>"
     customer_text += f"{customer_info.get('name', 'Unknown')}<br/>"
     customer_text += f"{customer_info.get('email', '')}<br/>"
-    elements.append(Paragraph(customer_text, customer_style))
+    elements.append(Paragraph(customer_text, INFO_STYLE))
     elements.append(Spacer(1, 0.25*inch))
     
     # Create table for order items
-    data = [["Product", "Quantity", "Unit Price", "Total"]]
+    rows = []
     
     # Calculate subtotal
     subtotal = 0
@@ -86,46 +96,18 @@ def generate_invoice_pdf(order_data: dict, seller_info: dict, customer_info: dic
         item_total = price * quantity
         subtotal += item_total
         
-        data.append([
+        rows.append([
             item.get('product', 'N/A'),
             quantity,
             f"${price:.2f}",
             f"${item_total:.2f}"
         ])
     
-    # Create the table
-    table = Table(data, colWidths=[2.5*inch, 1*inch, 1.25*inch, 1.25*inch])
-    
-    # Add style to the table
-    table_style = TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ])
-    
-    # Add zebra striping
-    for i in range(1, len(data)):
-        if i % 2 == 0:
-            table_style.add('BACKGROUND', (0, i), (-1, i), colors.white)
-    
-    table.setStyle(table_style)
-    elements.append(table)
+    # Create the table, zebra striped by the shared table style
+    elements.append(INVOICE_TABLE.table(rows))
     elements.append(Spacer(1, 0.25*inch))
     
     # Add summary with proper discount and tax calculation
-    summary_style = ParagraphStyle(
-        'Summary',
-        parent=styles['Normal'],
-        fontSize=10,
-        alignment=2,  # Right alignment
-        leading=14,
-        spaceAfter=12
-    )
-    
     # Get discount information
     discount_percent = order_data.get('discount_percent', 0)
     discount_amount = order_data.get('discount_amount', 0)
@@ -156,20 +138,13 @@ def generate_invoice_pdf(order_data: dict, seller_info: dict, customer_info: dic
     summary_text += f"<b>Tax ({tax_rate}%):</b> ${tax:.2f}<br/>"
     summary_text += f"<b>Total:</b> ${total:.2f}"
     
-    elements.append(Paragraph(summary_text, summary_style))
+    elements.append(Paragraph(summary_text, INVOICE_SUMMARY_STYLE))
     
     # Add footer with terms
     elements.append(Spacer(1, 0.5*inch))
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=8,
-        leading=10,
-        alignment=1  # Center alignment
-    )
     footer_text = "Thank you for your business!<br/>"
     footer_text += "Terms and conditions apply."
-    elements.append(Paragraph(footer_text, footer_style))
+    elements.append(Paragraph(footer_text, FOOTER_STYLE))
     
     # Build the PDF
     doc.build(elements)
@@ -177,62 +152,253 @@ def generate_invoice_pdf(order_data: dict, seller_info: dict, customer_info: dic
     return buffer.getvalue()
 
 
-@router.get("/{order_id}")
-async def get_invoice(
-    order_id: int,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Generate an invoice PDF for a specific order"""
-    # Get seller ID from authenticated user
-    seller_id = current_user.get("id")
-    if not seller_id:
-        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+def load_invoice_order(db: Session, order_id: int) -> dict:
+    """Load an order and its product price as plain data for the render pool
     
-    # Query the order
+    Raises:
+        HTTPException: 404 if the order or its product does not exist
+    """
     order = db.query(Order).filter(Order.id == order_id).first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    # Get product details
     product = db.query(Product).filter(Product.name == order.product).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Prepare order data for the invoice generator
+    return {"id": order.id, "product": order.product, "quantity": order.quantity,
+            "buyer": order.buyer, "price": product.price}
+
+
+def build_invoice_data(order: dict, discount_percent: float = 0, discount_amount: float = 0):
+    """Build generate_invoice_pdf's order_data and customer_info from a plain order row
+    
+    Returns:
+        (order_data, customer_info)
+    """
     order_data = {
-        "id": order.id,
+        "id": order["id"],
         "items": [
             {
-                "product": order.product,
-                "quantity": order.quantity,
-                "price": product.price
+                "product": order["product"],
+                "quantity": order["quantity"],
+                "price": order["price"]
             }
         ],
         "tax_rate": 10,  # Example tax rate, could be fetched from settings
-        "discount_percent": 0,  # Default to no discount
-        "discount_amount": 0
+        "discount_percent": discount_percent,
+        "discount_amount": discount_amount
     }
     
-    # Check if there's a discount query parameter
-    discount_percent = 0
-    discount_amount = 0
-    
     # Example customer info (in a real app, this would come from the database)
     customer_info = {
-        "name": order.buyer,
+        "name": order["buyer"],
         "email": "customer@example.com"
     }
+    return order_data, customer_info
+
+
+def load_batch_orders(db: Session, seller_id: int, order_ids: Optional[List[int]] = None,
+                      start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                      limit: int = INVOICE_BATCH_MAX_ORDERS) -> List[dict]:
+    """Load the seller's orders with their prices in one query
+    
+    Returns:
+        Up to limit + 1 plain order rows, so callers can tell the batch was too large
+    """
+    prices = seller_prices(seller_id)
+    statement = (
+        select(Order.id, Order.product, Order.quantity, Order.buyer, prices.c.price)
+        .select_from(Order)
+        .join(prices, prices.c.name == Order.product)
+    )
+    if order_ids is not None:
+        statement = statement.where(Order.id.in_(order_ids))
+    else:
+        statement = statement.where(Order.date >= start_date, Order.date <= end_date)
+    rows = db.execute(statement.order_by(Order.id).limit(limit + 1))
+    return [{"id": row.id, "product": row.product, "quantity": row.quantity,
+             "buyer": row.buyer, "price": row.price} for row in rows]
+
+
+class _ZipChunks:
+    """Write-only stream that collects zip output between yields"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
     
-    # Generate PDF
-    pdf_data = generate_invoice_pdf(
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self) -> None:
+        pass
+    
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_invoice_zip(batch_id: str, orders: List[dict], seller_info: dict) -> AsyncIterator[bytes]:
+    """Render invoices on the PDF process pool and stream them as a ZIP in order id order
+    
+    A window of renders runs ahead of the one being written, so the pool
+    stays busy while finished invoices are already on their way out.
+    Invoices that fail to render are listed in errors.txt instead.
+    """
+    progress = invoice_batch_progress.get(batch_id)
+    buffer = _ZipChunks()
+    archive = zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED)
+    window = deque()
+    window_size = pdf_render_pool.max_workers * 2
+    failed = []
+    
+    def start(order: dict):
+        order_data, customer_info = build_invoice_data(order)
+        task = asyncio.ensure_future(pdf_render_pool.render_when_free(
+            "invoice", generate_invoice_pdf,
+            order_data=order_data, seller_info=seller_info, customer_info=customer_info
+        ))
+        window.append((order, task))
+    
+    async def write_next() -> bytes:
+        order, task = window.popleft()
+        try:
+            pdf_data = await task
+            info = zipfile.ZipInfo(f"invoice_{order['id']}.pdf", date_time=datetime.now().timetuple()[:6])
+            archive.writestr(info, pdf_data)
+            progress["rendered"] += 1
+        except Exception as e:
+            logger.error(f"Invoice batch {batch_id}: order {order['id']} failed to render: {e}")
+            failed.append(order["id"])
+            progress["failed"] += 1
+        invoice_batch_progress.set(batch_id, progress)
+        return buffer.take()
+    
+    try:
+        for order in orders:
+            start(order)
+            if len(window) >= window_size:
+                yield await write_next()
+        while window:
+            yield await write_next()
+        
+        if failed:
+            archive.writestr("errors.txt", "Invoices that could not be rendered:\n" +
+                             "".join(f"order {order_id}\n" for order_id in failed))
+        archive.close()
+        progress["status"] = "done"
+        yield buffer.take()
+    finally:
+        # Client went away or rendering crashed: stop the renders still queued
+        for _, task in window:
+            task.cancel()
+        if progress["status"] != "done":
+            progress["status"] = "cancelled"
+        invoice_batch_progress.set(batch_id, progress)
+
+
+@router.post("/batch")
+async def create_invoice_batch(
+    batch: InvoiceBatchRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Stream invoices for many orders as a ZIP
+    
+    Orders are given as order_ids or as a range (same values as the sales
+    report) / start_date and end_date. The X-Batch-Id response header names
+    the batch for GET /seller/invoices/batch/{batch_id} progress polling.
+    """
+    seller_id = current_user.get("id")
+    if not seller_id:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    
+    if batch.order_ids:
+        if len(batch.order_ids) > INVOICE_BATCH_MAX_ORDERS:
+            raise HTTPException(status_code=400, detail=f"At most {INVOICE_BATCH_MAX_ORDERS} orders per batch")
+        orders = await run_in_threadpool(load_batch_orders, db, seller_id, order_ids=batch.order_ids)
+    elif batch.range or (batch.start_date and batch.end_date):
+        start_day, end_day = get_report_days(batch.range or "today", batch.start_date, batch.end_date)
+        start_date, end_date = ist_day_bounds(start_day, end_day)
+        orders = await run_in_threadpool(load_batch_orders, db, seller_id, start_date=start_date, end_date=end_date)
+    else:
+        raise HTTPException(status_code=400, detail="Provide order_ids, a range, or start_date and end_date")
+    
+    if not orders:
+        raise HTTPException(status_code=404, detail="No orders found")
+    if len(orders) > INVOICE_BATCH_MAX_ORDERS:
+        raise HTTPException(status_code=400, detail=f"At most {INVOICE_BATCH_MAX_ORDERS} orders per batch; narrow the range")
+    
+    # Refuse up front: once the ZIP has started streaming a 503 is no longer possible
+    if pdf_render_pool.full:
+        raise HTTPException(
+            status_code=503,
+            detail="Report rendering is busy, please try again shortly",
+            headers={"Retry-After": str(PDF_RENDER_RETRY_AFTER)}
+        )
+    
+    batch_id = uuid.uuid4().hex
+    invoice_batch_progress.set(batch_id, {
+        "batch_id": batch_id,
+        "seller_id": seller_id,
+        "status": "running",
+        "total": len(orders),
+        "rendered": 0,
+        "failed": 0,
+        "started_at": datetime.now().isoformat()
+    })
+    
+    filename = f"invoices_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return StreamingResponse(
+        stream_invoice_zip(batch_id, orders, dict(current_user)),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Batch-Id": batch_id
+        }
+    )
+
+
+@router.get("/batch/{batch_id}")
+def get_invoice_batch_progress(batch_id: str, current_user: dict = Depends(get_current_user)):
+    """Get how many invoices of a batch have been rendered"""
+    progress = invoice_batch_progress.get(batch_id)
+    if progress is None or progress["seller_id"] != current_user.get("id"):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return {key: value for key, value in progress.items() if key != "seller_id"}
+
+
+@router.get("/{order_id}")
+async def get_invoice(
+    order_id: int,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Generate an invoice PDF for a specific order"""
+    # Get seller ID from authenticated user
+    seller_id = current_user.get("id")
+    if not seller_id:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    
+    # Query the order and its product price
+    order = await run_in_threadpool(load_invoice_order, db, order_id)
+    
+    # Prepare order data for the invoice generator
+    order_data, customer_info = build_invoice_data(order)
+    
+    # Render in the PDF process pool so the build never blocks other requests
+    pdf_data = await pdf_render_pool.render(
+        "invoice",
+        generate_invoice_pdf,
         order_data=order_data,
-        seller_info=current_user,
+        seller_info=dict(current_user),
         customer_info=customer_info
     )
     
     # Create filename
-    filename = f"invoice_{order.id}_{datetime.now().strftime('%Y%m%d')}.pdf"
+    filename = f"invoice_{order['id']}_{datetime.now().strftime('%Y%m%d')}.pdf"
     
     # Return PDF as downloadable file
     return Response(
@@ -258,53 +424,27 @@ async def get_invoice_with_discount(
     if not seller_id:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     
-    # Query the order
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    # Query the order and its product price
+    order = await run_in_threadpool(load_invoice_order, db, order_id)
     
-    # Get product details
-    product = db.query(Product).filter(Product.name == order.product).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
-    # Prepare order data for the invoice generator
-    order_data = {
-        "id": order.id,
-        "items": [
-            {
-                "product": order.product,
-                "quantity": order.quantity,
-                "price": product.price
-            }
-        ],
-        "tax_rate": 10,  # Example tax rate, could be fetched from settings
-        "discount_percent": 0,
-        "discount_amount": 0
-    }
-    
-    # Apply discount based on type
+    # Prepare order data for the invoice generator, applying the discount by type
     if discount_type == "percent":
-        order_data["discount_percent"] = discount_value
+        order_data, customer_info = build_invoice_data(order, discount_percent=discount_value)
     else:  # amount
-        order_data["discount_amount"] = discount_value
-    
-    # Example customer info (in a real app, this would come from the database)
-    customer_info = {
-        "name": order.buyer,
-        "email": "customer@example.com"
-    }
+        order_data, customer_info = build_invoice_data(order, discount_amount=discount_value)
     
-    # Generate PDF
-    pdf_data = generate_invoice_pdf(
+    # Render in the PDF process pool so the build never blocks other requests
+    pdf_data = await pdf_render_pool.render(
+        "invoice",
+        generate_invoice_pdf,
         order_data=order_data,
-        seller_info=current_user,
+        seller_info=dict(current_user),
         customer_info=customer_info
     )
     
     # Create filename
     discount_info = f"{discount_value}{'percent' if discount_type == 'percent' else 'amount'}"
-    filename = f"invoice_{order.id}_{discount_info}_{datetime.now().strftime('%Y%m%d')}.pdf"
+    filename = f"invoice_{order['id']}_{discount_info}_{datetime.now().strftime('%Y%m%d')}.pdf"
     
     # Return PDF as downloadable file
     return Response(
@@ -0,0 +1,214 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
+from datetime import date
+from models.base import ReportJob, Seller, SessionLocal
+from auth.dependencies import get_current_user, require_role
+from backend.database import get_db
+from routes.inventory import load_inventory_report_key, open_inventory_report, inventory_report_filename
+from routes.reports import (
+    get_report_days, load_sales_report_key, open_sales_report, sales_report_filename
+)
+from utils.report_cache import report_cache, etag_for, pdf_response
+from utils.report_jobs import ReportJobWorkers, enqueue_report_job, job_data
+from utils.whatsapp_sender import whatsapp_sender
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    dependencies=[Depends(require_role("seller"))]
+)
+
+# Token claims kept on a job so the worker can build the report as this seller
+SELLER_INFO_FIELDS = ("id", "sub", "email", "name", "role")
+
+# Captions and failure notices sent with delivered reports
+DELIVERY_MESSAGES = {
+    "en": {
+        "sales": "Your sales report ({start} to {end})",
+        "inventory": "Your inventory report",
+        "failed": "Sorry, your {report} report could not be prepared. Please try again later."
+    },
+    "hi": {
+        "sales": "आपकी बिक्री रिपोर्ट ({start} से {end})",
+        "inventory": "आपकी इन्वेंटरी रिपोर्ट",
+        "failed": "क्षमा करें, आपकी {report} रिपोर्ट तैयार नहीं हो सकी। कृपया बाद में फिर से प्रयास करें।"
+    }
+}
+
+
+class ReportJobRequest(BaseModel):
+    type: str = Field("sales", pattern="^(sales|inventory)$")
+    range: str = "today"
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    deliver_to: Optional[str] = Field(None, description="The seller's registered WhatsApp number, to send the finished PDF to")
+    language: str = "en"
+
+
+async def open_job_report(job: Dict[str, Any], db: Session):
+    """Open a job's report PDF, rendering it if the report cache does not have it
+
+    Returns:
+        (open binary file, filename, cache_key)
+    """
+    seller_info = job["seller_info"]
+    if job["report_type"] == "inventory":
+        cache_key = await load_inventory_report_key(db, seller_info.get("sub"))
+        pdf_file, _ = await open_inventory_report(db, seller_info, cache_key, wait_for_slot=True)
+        return pdf_file, inventory_report_filename(), cache_key
+
+    start_day = date.fromisoformat(job["params"]["start_day"])
+    end_day = date.fromisoformat(job["params"]["end_day"])
+    summary, cache_key = await load_sales_report_key(db, job["seller_id"], start_day, end_day)
+    pdf_file, _ = await open_sales_report(db, seller_info, start_day, end_day, summary, cache_key,
+                                          wait_for_slot=True)
+    return pdf_file, sales_report_filename(start_day, end_day), cache_key
+
+
+async def run_report_job(job: Dict[str, Any], db: Session) -> Dict[str, Any]:
+    """Build a job's report and, if it has a recipient, send it as a WhatsApp document
+
+    Raises on failure so the workers retry the job; a retry finds an
+    already rendered PDF in the report cache.
+    """
+    pdf_file, filename, cache_key = await open_job_report(job, db)
+    try:
+        content = await run_in_threadpool(pdf_file.read)
+    finally:
+        pdf_file.close()
+
+    if not job["deliver_to"]:
+        return {"cache_key": cache_key}
+
+    messages = DELIVERY_MESSAGES.get(job["language"], DELIVERY_MESSAGES["en"])
+    caption = messages[job["report_type"]].format(start=job["params"].get("start_day"),
+                                                  end=job["params"].get("end_day"))
+    media_id = await whatsapp_sender.upload_media(content, filename, "application/pdf")
+    if media_id is None:
+        raise RuntimeError("WhatsApp media upload failed")
+    if not await whatsapp_sender.send_document(job["deliver_to"], media_id, filename, caption):
+        raise RuntimeError("WhatsApp document message failed")
+    return {"cache_key": cache_key, "delivery_status": "sent"}
+
+
+async def notify_report_job_failed(job: Dict[str, Any], error: str) -> None:
+    """Tell the recipient their report is not coming after the last attempt failed"""
+    if job["deliver_to"]:
+        messages = DELIVERY_MESSAGES.get(job["language"], DELIVERY_MESSAGES["en"])
+        await whatsapp_sender.send_text(job["deliver_to"], messages["failed"].format(report=job["report_type"]))
+
+
+# Create the process-wide report job workers; started with the app or by backend/report_worker.py
+report_job_workers = ReportJobWorkers(run_report_job, SessionLocal, on_failed=notify_report_job_failed)
+
+
+def job_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    response = {
+        "job_id": job["id"],
+        "type": job["report_type"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "error": job["error"],
+        "delivery_status": job["delivery_status"],
+        "created_at": job["created_at"].isoformat() if job["created_at"] else None,
+        "started_at": job["started_at"].isoformat() if job["started_at"] else None,
+        "finished_at": job["finished_at"].isoformat() if job["finished_at"] else None,
+        "status_url": f"/jobs/{job['id']}"
+    }
+    if job["status"] == "done":
+        response["download_url"] = f"/jobs/{job['id']}/download"
+    return response
+
+
+def whatsapp_digits(number: str) -> str:
+    """Reduce a WhatsApp number to its digits, so +91 98765 43210 matches 919876543210"""
+    return "".join(ch for ch in number if ch.isdigit())
+
+
+def check_deliver_to(db: Session, seller_id, deliver_to: Optional[str]) -> Optional[str]:
+    """Only let a seller have reports sent to their own registered WhatsApp number
+
+    Raises:
+        HTTPException: 403 when deliver_to is not the seller's registered number
+    """
+    if deliver_to is None:
+        return None
+    seller = db.get(Seller, seller_id)
+    registered = whatsapp_digits(seller.whatsapp_number or "") if seller else ""
+    if not registered or whatsapp_digits(deliver_to) != registered:
+        raise HTTPException(status_code=403, detail="Reports can only be sent to your registered WhatsApp number")
+    return registered
+
+
+def get_seller_job(db: Session, job_id: int, seller_id) -> Dict[str, Any]:
+    """Load a job of this seller, raising 404 for unknown jobs and other sellers' jobs"""
+    job = db.get(ReportJob, job_id)
+    if job is None or job.seller_id != seller_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_data(job)
+
+
+@router.post("/report", status_code=202)
+def create_report_job(
+    request: ReportJobRequest,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Queue a sales or inventory PDF report and return its job id straight away
+
+    Poll GET /jobs/{job_id} for the status. With deliver_to set, the finished
+    PDF is also sent to that WhatsApp number as a document; it must be the
+    seller's registered number, anything else is refused with 403.
+    """
+    seller_id = current_user.get("id")
+    if not seller_id:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+    deliver_to = check_deliver_to(db, seller_id, request.deliver_to)
+    params = {}
+    if request.type == "sales":
+        # Resolve the range now, so "today" means the day the report was asked for
+        start_day, end_day = get_report_days(request.range, request.start_date, request.end_date)
+        params = {"range": request.range, "start_day": start_day.isoformat(), "end_day": end_day.isoformat()}
+
+    job = enqueue_report_job(
+        db,
+        seller_id,
+        request.type,
+        params,
+        {field: current_user.get(field) for field in SELLER_INFO_FIELDS if current_user.get(field) is not None},
+        deliver_to=deliver_to,
+        language=request.language
+    )
+    report_job_workers.notify()
+    return job_response(job_data(job))
+
+
+@router.get("/{job_id}")
+def get_report_job(job_id: int, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Get the status of a report job"""
+    return job_response(get_seller_job(db, job_id, current_user.get("id")))
+
+
+@router.get("/{job_id}/download")
+async def download_report_job(job_id: int, current_user: dict = Depends(get_current_user),
+                              db: Session = Depends(get_db)):
+    """Download a finished job's PDF from the report cache"""
+    job = await run_in_threadpool(get_seller_job, db, job_id, current_user.get("id"))
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+
+    cached = await run_in_threadpool(report_cache.open, job["cache_key"])
+    if cached is None:
+        raise HTTPException(status_code=410, detail="Report was evicted from the cache; request a new one")
+
+    if job["report_type"] == "inventory":
+        filename = inventory_report_filename()
+    else:
+        filename = sales_report_filename(date.fromisoformat(job["params"]["start_day"]),
+                                         date.fromisoformat(job["params"]["end_day"]))
+    pdf_file, last_modified = cached
+    return pdf_response(pdf_file, filename, etag_for(job["cache_key"]), last_modified)
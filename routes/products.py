@@ -1,10 +1,18 @@
 from backend.database import get_db
 # Revert to absolute import for get_db from backend.database
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import heapq
+import os
 from models.base import Product
 from auth.dependencies import get_current_user, require_role
+from routes.reports import get_report_days, sales_data_version
+from utils.order_rollup import get_product_totals
+from utils.stock_mutations import set_stock_by_name, set_stocks_by_name
+from utils.product_import import import_products, iter_import_rows, import_format, IMPORT_FORMATS
+from utils.pagination import keyset_page, set_next_page, PAGE_MAX_LIMIT
+from utils.ttl_cache import TTLCache
 
 router = APIRouter(
     prefix="/seller/products",
@@ -12,14 +20,67 @@ router = APIRouter(
     dependencies=[Depends(require_role("seller"))]
 )
 
+# Top-products results per (seller, range, limit, ranking, data version); the TTL only bounds memory
+top_products_cache = TTLCache(ttl_seconds=float(os.getenv("TOP_PRODUCTS_CACHE_TTL_SECONDS", 60)))
+
+# Most products one batch stock update may change
+STOCK_BATCH_MAX_ITEMS = int(os.getenv("STOCK_BATCH_MAX_ITEMS", 100))
+
+# Columns returned by product listings; nothing else is loaded
+PRODUCT_LIST_COLUMNS = (Product.id, Product.name, Product.price, Product.stock)
+
 @router.get("/", response_model=List[dict])
-async def list_products(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def list_products(
+    request: Request,
+    response: Response,
+    cursor: Optional[int] = Query(None, ge=0, description="X-Next-Cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT, description="Rows per page; unpaged without cursor or limit"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """List the seller's products by id, one page at a time"""
     user_id = current_user.get("id")
-    products = db.query(Product).filter(Product.seller_id == user_id).all()
-    return [{"id": p.id, "name": p.name, "price": p.price, "stock": p.stock} for p in products]
+    products, next_cursor = keyset_page(db, PRODUCT_LIST_COLUMNS, [Product.seller_id == user_id], Product.id,
+                                        cursor, limit)
+    set_next_page(request, response, next_cursor)
+    return products
+
+@router.get("/top")
+def get_top_products(
+    range: str = Query("this-week", description="Date range (today, yesterday, week, this-week, this-month, all) or 'YYYY-MM-DD,YYYY-MM-DD'"),
+    limit: int = Query(5, ge=1, le=100),
+    by: str = Query("units", pattern="^(units|revenue)$", description="Rank by units sold or revenue"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Rank the seller's products by units sold or revenue over a date range"""
+    seller_id = current_user.get("id")
+    start_day, end_day = get_report_days(range)
+    # Product writes and new orders change the version, so cached rankings are never stale
+    cache_key = (seller_id, range, start_day, end_day, limit, by,
+                 sales_data_version(db, seller_id, start_day, end_day))
+    cached = top_products_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Per-product totals come from the daily rollup, so cost grows with days, not orders
+    totals = get_product_totals(db, seller_id, start_day, end_day)
+    other = "revenue" if by == "units" else "units"
+    ranked = heapq.nlargest(limit, totals.items(), key=lambda item: (item[1][by], item[1][other]))
+    
+    result = {
+        "products": [
+            {"name": name, "sales": entry["units"], "revenue": round(entry["revenue"], 2), "orders": entry["orders"]}
+            for name, entry in ranked
+        ],
+        "time_range": range,
+        "ranked_by": by
+    }
+    top_products_cache.set(cache_key, result)
+    return result
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_product(product: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def create_product(product: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     new_product = Product(
         seller_id=current_user.get("id"),
         name=product.get("name"),
@@ -31,8 +92,32 @@ async def create_product(product: dict, current_user: dict = Depends(get_current
     db.commit()
     return {"message": "Product created successfully"}
 
+@router.post("/bulk")
+def bulk_import_products(
+    file: UploadFile = File(..., description="Catalog as CSV (with a header line) or JSONL"),
+    format: Optional[str] = Query(None, pattern="^(csv|jsonl)$", description="csv or jsonl; taken from the file name if omitted"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Import a product catalog from a CSV or JSONL upload
+    
+    Every row is validated with ProductSerializer (product_name or name,
+    price, stock, optional description). Valid rows are inserted in batches;
+    invalid rows are skipped and listed by line number in the report.
+    """
+    seller_id = current_user.get("id")
+    if not seller_id:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    
+    format = format or import_format(file.filename, file.content_type)
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Upload a .csv or .jsonl file, or pass format=csv|jsonl")
+    
+    report = import_products(db, seller_id, iter_import_rows(file.file, format))
+    return {"format": format, **report}
+
 @router.put("/{id}")
-async def update_product(id: int, product: dict, current_user: int = Depends(get_current_user), db: Session = Depends(get_db)):
+def update_product(id: int, product: dict, current_user: int = Depends(get_current_user), db: Session = Depends(get_db)):
     existing_product = db.query(Product).filter(Product.id == id, Product.seller_id == current_user).first()
     if not existing_product:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -41,7 +126,7 @@ async def update_product(id: int, product: dict, current_user: int = Depends(get
     db.commit()
 
 @router.delete("/products/{product_id}")
-async def delete_product(product_id: int, current_user: int = Depends(get_current_user), db: Session = Depends(get_db)):
+def delete_product(product_id: int, current_user: int = Depends(get_current_user), db: Session = Depends(get_db)):
     product = db.query(Product).filter(Product.id == product_id, Product.seller_id == current_user).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -52,7 +137,7 @@ async def delete_product(product_id: int, current_user: int = Depends(get_curren
     return {"id": existing_product.id, "name": existing_product.name, "price": existing_product.price, "stock": existing_product.stock}
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_product(id: int, current_user: int = Depends(get_current_user), db: Session = Depends(get_db)):
+def delete_product(id: int, current_user: int = Depends(get_current_user), db: Session = Depends(get_db)):
     existing_product = db.query(Product).filter(Product.id == id, Product.seller_id == current_user).first()
     if not existing_product:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -61,7 +146,7 @@ async def delete_product(id: int, current_user: int = Depends(get_current_user),
     return
 
 @router.post("/update-stock", status_code=status.HTTP_200_OK)
-async def update_stock_by_name(product_data: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def update_stock_by_name(product_data: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     """Update product stock by product name"""
     name = product_data.get("name")
     stock = product_data.get("stock")
@@ -73,45 +158,95 @@ async def update_stock_by_name(product_data: dict, current_user: dict = Depends(
     if stock < 0:
         return {"error": "Quantity cannot be negative."}
     
-    # Find product by name for the current seller
-    product = db.query(Product).filter(
-        Product.name == name,
-        Product.seller_id == current_user.get("id")
-    ).first()
-    
+    # Set the stock of the seller's product with this name in one statement
+    product = set_stock_by_name(db, current_user.get("id"), name, stock, product_data.get("expected_version"))
     if not product:
+        if product_data.get("expected_version") is not None:
+            raise HTTPException(status_code=409, detail=f"Product '{name}' was changed by another update or not found")
         raise HTTPException(status_code=404, detail=f"Product '{name}' not found")
-    
-    # Update stock with proper handling for zero/blank quantity
-    stock_value = stock if stock is not None else 0
-    product.stock = stock_value
     db.commit()
     
-    return {"message": f"Stock updated for {name} to {stock_value} units.", "product": {"id": product.id, "name": product.name, "stock": product.stock}}
+    return {"message": f"Stock updated for {name} to {product['stock']} units.", "product": product}
+
+@router.post("/update-stock/batch", status_code=status.HTTP_200_OK)
+def update_stock_batch(data: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Update the stock of several products by name in one transaction
+
+    Expects {"items": [{"name": ..., "stock": ...}, ...]}. The products are
+    looked up with one SELECT and all of them are changed by a single UPDATE,
+    so a WhatsApp message listing many products costs one commit. Names that
+    match no product are returned in not_found; the others are still updated.
+    """
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="A non-empty list of items is required")
+    if len(items) > STOCK_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {STOCK_BATCH_MAX_ITEMS} items can be updated at once")
+
+    # The last mention of a product wins, as if the updates were applied in order
+    stock_by_name = {}
+    for item in items:
+        name = item.get("name") if isinstance(item, dict) else None
+        stock = item.get("stock") if isinstance(item, dict) else None
+        if not isinstance(name, str) or not name.strip() or isinstance(stock, bool) or not isinstance(stock, int):
+            raise HTTPException(status_code=400, detail="Each item needs a product name and an integer stock")
+        stock_by_name.pop(name.strip(), None)
+        stock_by_name[name.strip()] = stock
+
+    negative = [name for name, stock in stock_by_name.items() if stock < 0]
+    if negative:
+        return {"error": f"Quantity cannot be negative for: {', '.join(negative)}."}
+
+    updated, not_found = set_stocks_by_name(db, current_user.get("id"), stock_by_name)
+    if updated:
+        db.commit()
+
+    return {
+        "message": f"Stock updated for {len(updated)} products.",
+        "updated": updated,
+        "not_found": not_found
+    }
 
 @router.get("/low-stock", response_model=List[dict])
-async def get_low_stock_products(threshold: int = 5, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_low_stock_products(
+    request: Request,
+    response: Response,
+    threshold: int = 5,
+    cursor: Optional[int] = Query(None, ge=0, description="X-Next-Cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT, description="Rows per page; unpaged without cursor or limit"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """Get products with stock below the specified threshold"""
-    products = db.query(Product).filter(
-        Product.seller_id == current_user.get("id"),
-        Product.stock < threshold
-    ).all()
-    
-    return [{"id": p.id, "name": p.name, "price": p.price, "stock": p.stock} for p in products]
+    products, next_cursor = keyset_page(
+        db, PRODUCT_LIST_COLUMNS, [Product.seller_id == current_user.get("id"), Product.stock < threshold],
+        Product.id, cursor, limit
+    )
+    set_next_page(request, response, next_cursor)
+    return products
 
 @router.post("/low-stock", response_model=List[dict])
-async def post_low_stock_products(data: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Get products with stock below the specified threshold (POST method for NLP integration)"""
-    threshold = data.get("threshold", 5)
-    products = db.query(Product).filter(
-        Product.seller_id == current_user.get("id"),
-        Product.stock < threshold
-    ).all()
+def post_low_stock_products(data: dict, request: Request, response: Response,
+                            current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Get products with stock below the specified threshold (POST method for NLP integration)
     
-    return [{"id": p.id, "name": p.name, "price": p.price, "stock": p.stock} for p in products]
+    Takes optional "cursor" and "limit" keys for paging like the GET endpoint.
+    """
+    threshold = data.get("threshold", 5)
+    try:
+        cursor = int(data["cursor"]) if data.get("cursor") is not None else None
+        limit = min(max(int(data["limit"]), 1), PAGE_MAX_LIMIT) if data.get("limit") is not None else None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="cursor and limit must be integers")
+    products, next_cursor = keyset_page(
+        db, PRODUCT_LIST_COLUMNS, [Product.seller_id == current_user.get("id"), Product.stock < threshold],
+        Product.id, cursor, limit
+    )
+    set_next_page(request, response, next_cursor)
+    return products
 
 @router.post("/check-stock", status_code=status.HTTP_200_OK)
-async def check_product_stock(data: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def check_product_stock(data: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     """Check if a specific product is available in inventory"""
     product_name = data.get("name")
     
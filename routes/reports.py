@@ -1,22 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Optional
+from datetime import date, datetime, timedelta
 import pytz
-from models.base import Order, Product
+from models.base import Order, Product, SessionLocal
 from auth.dependencies import get_current_user, require_role
 from backend.database import get_db
+from utils.inventory_feed import latest_change_seq
+from utils.order_rollup import ist_day, ist_day_bounds, get_orders_version, get_sales_summary
+from utils.pdf_render_pool import pdf_render_pool
+from utils.report_cache import report_cache, etag_for, etag_matches, not_modified_response, pdf_response
+from utils.report_streaming import StreamedFlowables, table_chunks, iter_csv
+from utils.report_template import ORDER_TABLE, NORMAL_STYLE, SUMMARY_STYLE, report_header
 import os
 import io
+import itertools
 from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.units import inch
 
 # Define IST timezone for reuse
 IST_TZ = pytz.timezone('Asia/Kolkata')
 
+# Range names used by the NLP parser that get_date_range spells differently
+RANGE_ALIASES = {"week": "this-week", "month": "this-month"}
+
+# Order rows fetched per round trip when streaming report details
+REPORT_PAGE_SIZE = int(os.getenv("REPORT_PAGE_SIZE", 1000))
+
+# Columns of the order table in PDF reports and CSV exports
+ORDER_TABLE_HEADER = ORDER_TABLE.header
+
 router = APIRouter(
     prefix="/seller/orders",
     tags=["reports"],
@@ -86,182 +103,314 @@ def get_date_range(range_type: str):
     return start_date_utc, end_date_utc
 
 
-def generate_pdf_report(orders: List[dict], seller_info: dict, date_range: str):
-    """Generate PDF report using ReportLab"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    elements = []
+def seller_prices(seller_id: int):
+    """Subquery of the seller's product prices, one row per product name
     
-    # Add title
-    title_style = styles["Title"]
-    title = Paragraph(f"Sales Report", title_style)
-    elements.append(title)
-    elements.append(Spacer(1, 0.25*inch))
+    Orders reference products by name, so this is what orders join against.
+    """
+    return (
+        select(Product.name.label("name"), func.max(Product.price).label("price"))
+        .where(Product.seller_id == seller_id)
+        .group_by(Product.name)
+        .subquery()
+    )
+
+
+def get_report_days(range_type: str, start_date: Optional[str] = None, end_date: Optional[str] = None):
+    """Resolve report query parameters to a range of IST days
     
-    # Add seller info
-    seller_style = ParagraphStyle(
-        'SellerInfo',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=12
+    Args:
+        range_type: A range understood by get_date_range, 'week', 'month' or 'all'
+        start_date: Optional custom start date (YYYY-MM-DD); used with end_date
+        end_date: Optional custom end date (YYYY-MM-DD)
+        
+    Returns:
+        (start_day, end_day) as IST dates, end inclusive
+    """
+    explicit = bool(start_date and end_date)
+    if explicit:
+        range_type = f"{start_date},{end_date}"
+    
+    # Custom ranges name IST calendar days directly
+    if ',' in range_type:
+        try:
+            start_str, end_str = range_type.split(',')
+            return (datetime.strptime(start_str.strip(), '%Y-%m-%d').date(),
+                    datetime.strptime(end_str.strip(), '%Y-%m-%d').date())
+        except ValueError as e:
+            if explicit:
+                raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
+    
+    if range_type == "all":
+        return date(1970, 1, 1), ist_day(datetime.now(pytz.UTC))
+    
+    start_date_obj, end_date_obj = get_date_range(RANGE_ALIASES.get(range_type, range_type))
+    return ist_day(start_date_obj), ist_day(end_date_obj)
+
+
+def iter_order_rows(db: Session, seller_id: int, start_date: datetime, end_date: datetime,
+                    page_size: int = REPORT_PAGE_SIZE) -> Iterator[dict]:
+    """Stream a seller's orders in the range, page_size rows per fetch
+    
+    Yields:
+        dicts with id, product, quantity, price and date
+    """
+    prices = seller_prices(seller_id)
+    statement = (
+        select(Order.id, Order.product, Order.quantity, prices.c.price, Order.date)
+        .select_from(Order)
+        .join(prices, prices.c.name == Order.product)
+        .where(Order.date >= start_date, Order.date <= end_date)
+        .order_by(Order.date, Order.id)
+        .execution_options(yield_per=page_size)
     )
-    seller_text = f"Seller: {seller_info.get('email', 'Unknown')}<br/>"
-    seller_text += f"Date Range: {date_range} [IST]<br/>"
+    for row in db.execute(statement):
+        yield {"id": row.id, "product": row.product, "quantity": row.quantity, "price": row.price, "date": row.date}
+
+
+def order_table_row(order: dict) -> list:
+    """Format an order row for report tables and CSV exports, with the date in IST"""
+    price = order.get('price', 0)
+    quantity = order.get('quantity', 0)
     
-    # Get current time in IST for the report
-    ist_now = datetime.now(pytz.UTC).astimezone(IST_TZ)
-    seller_text += f"Generated on: {ist_now.strftime('%Y-%m-%d %H:%M:%S')} [IST]"
+    # Convert order date from UTC to IST for display
+    order_date = order.get('date') or datetime.now(pytz.UTC)
+    if order_date.tzinfo is None:
+        # If date has no timezone info, assume it's UTC
+        order_date = order_date.replace(tzinfo=pytz.UTC)
     
-    elements.append(Paragraph(seller_text, seller_style))
-    elements.append(Spacer(1, 0.25*inch))
+    return [
+        order.get('id', 'N/A'),
+        order.get('product', 'N/A'),
+        quantity,
+        f"${price:.2f}",
+        f"${price * quantity:.2f}",
+        order_date.astimezone(IST_TZ).strftime('%Y-%m-%d')
+    ]
+
+
+def generate_pdf_report(orders: Iterable[dict], seller_info: dict, date_range: str, summary: Optional[dict] = None,
+                        output=None):
+    """Generate PDF report using ReportLab
+    
+    The order table is laid out in LongTable chunks pulled lazily from
+    orders, so only the chunk being placed is held as flowables.
+    
+    Args:
+        orders: Order rows; may be a generator when summary is given
+        seller_info: The authenticated seller
+        date_range: Date range text for the header
+        summary: Precomputed totals from get_sales_summary; computed from orders if omitted
+        output: File path or binary file to write to; the PDF bytes are returned if omitted
+    """
+    buffer = io.BytesIO() if output is None else output
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    
+    # Add title and seller info, with the current time in IST
+    ist_now = datetime.now(pytz.UTC).astimezone(IST_TZ)
+    elements = report_header("Sales Report", [
+        f"Seller: {seller_info.get('email') or seller_info.get('name') or 'Unknown'}",
+        f"Date Range: {date_range} [IST]",
+        f"Generated on: {ist_now.strftime('%Y-%m-%d %H:%M:%S')} [IST]"
+    ])
     
     # Summary statistics
-    total_sales = sum(order.get('price', 0) * order.get('quantity', 0) for order in orders)
-    total_orders = len(orders)
-    
-    summary_style = ParagraphStyle(
-        'Summary',
-        parent=styles['Normal'],
-        fontSize=12,
-        leading=14,
-        spaceAfter=12
-    )
+    if summary is None:
+        orders = list(orders)
+        summary = {
+            "total_orders": len(orders),
+            "total_units": sum(order.get('quantity', 0) for order in orders),
+            "total_sales": sum(order.get('price', 0) * order.get('quantity', 0) for order in orders)
+        }
+    total_sales = summary["total_sales"]
+    total_orders = summary["total_orders"]
+    
     summary_text = f"<b>Total Sales:</b> ${total_sales:.2f}<br/>"
-    summary_text += f"<b>Total Orders:</b> {total_orders}"
-    elements.append(Paragraph(summary_text, summary_style))
+    summary_text += f"<b>Total Orders:</b> {total_orders}<br/>"
+    summary_text += f"<b>Total Units:</b> {summary['total_units']}"
+    elements.append(Paragraph(summary_text, SUMMARY_STYLE))
     elements.append(Spacer(1, 0.25*inch))
     
     # Create table for orders
-    if orders:
-        data = [["Order ID", "Product", "Quantity", "Price", "Total", "Date"]]
-        for order in orders:
-            price = order.get('price', 0)
-            quantity = order.get('quantity', 0)
-            total = price * quantity
-            
-            # Convert order date from UTC to IST for display
-            order_date = order.get('date', datetime.now(pytz.UTC))
-            if order_date.tzinfo is None:
-                # If date has no timezone info, assume it's UTC
-                order_date = order_date.replace(tzinfo=pytz.UTC)
-            
-            # Convert to IST
-            order_date_ist = order_date.astimezone(IST_TZ)
-            date_str = order_date_ist.strftime('%Y-%m-%d')
-            
-            data.append([
-                order.get('id', 'N/A'),
-                order.get('product', 'N/A'),
-                quantity,
-                f"${price:.2f}",
-                f"${total:.2f}",
-                date_str
-            ])
-        
-        # Create the table
-        table = Table(data, colWidths=[0.8*inch, 2*inch, 0.8*inch, 0.8*inch, 0.8*inch, 1*inch])
-        
-        # Add style to the table
-        table_style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ])
-        
-        # Add zebra striping
-        for i in range(1, len(data)):
-            if i % 2 == 0:
-                table_style.add('BACKGROUND', (0, i), (-1, i), colors.white)
-        
-        table.setStyle(table_style)
-        elements.append(table)
+    if total_orders:
+        tables = table_chunks(ORDER_TABLE, (order_table_row(order) for order in orders))
     else:
-        elements.append(Paragraph("No orders found for the selected period.", styles["Normal"]))
+        tables = [Paragraph("No orders found for the selected period.", NORMAL_STYLE)]
     
     # Build the PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer.getvalue()
+    doc.build(StreamedFlowables(itertools.chain(elements, tables)))
+    if output is None:
+        return buffer.getvalue()
+
+
+def sales_data_version(db: Session, seller_id: int, start_day: date, end_day: date) -> str:
+    """Get a version of what a seller's sales figures over a range of IST days are computed from
+    
+    Any write to the seller's products (renames and price edits included) is
+    a new entry in the inventory change feed, and any new order in the range
+    changes the orders version. Both are cheap: a cache hit costs O(days) plus
+    the orders the rollup job has not folded in yet.
+    """
+    return f"feed:{latest_change_seq(db, seller_id)}:orders:{get_orders_version(db, seller_id, start_day, end_day)}"
+
+
+def load_sales_report_version(db: Session, seller_id: int, start_day: date, end_day: date):
+    """Load the sales summary and a data version for the report cache key
+    
+    The version only stays the same while the rendered report would; see
+    sales_data_version.
+    
+    Returns:
+        (summary, version string)
+    """
+    summary = get_sales_summary(db, seller_id, start_day, end_day)
+    version = (f"{summary['total_orders']}:{summary['total_units']}:{summary['total_sales']!r}:"
+               f"{sales_data_version(db, seller_id, start_day, end_day)}")
+    return summary, version
+
+
+def render_sales_report(seller_id: int, start_day: date, end_day: date, seller_info: dict, summary: dict, output):
+    """Render a sales report PDF in a render pool worker
+    
+    The worker streams the orders through its own session, so only the
+    seller and the day range cross the process boundary and its memory is
+    bounded by REPORT_PAGE_SIZE and the table chunk size, not the range.
+    """
+    start_date, end_date = ist_day_bounds(start_day, end_day)
+    with SessionLocal() as db:
+        generate_pdf_report(
+            iter_order_rows(db, seller_id, start_date, end_date),
+            seller_info,
+            f"{start_day.strftime('%Y-%m-%d')} to {end_day.strftime('%Y-%m-%d')}",
+            summary=summary,
+            output=output
+        )
+
+
+def sales_report_filename(start_day: date, end_day: date, type: str = "pdf") -> str:
+    return f"sales_report_{start_day.strftime('%Y%m%d')}_to_{end_day.strftime('%Y%m%d')}_IST.{type}"
+
+
+async def load_sales_report_key(db: Session, seller_id: int, start_day: date, end_day: date):
+    """Get a sales report's totals and its report cache key
+    
+    Returns:
+        (summary, cache_key)
+    """
+    summary, version = await run_in_threadpool(load_sales_report_version, db, seller_id, start_day, end_day)
+    return summary, report_cache.key("sales", seller_id, start_day, end_day, version)
+
+
+async def open_sales_report(db: Session, seller_info: dict, start_day: date, end_day: date, summary: dict,
+                            cache_key: str, wait_for_slot: bool = False):
+    """Open a sales report PDF from the report cache, rendering it on a miss
+    
+    Args:
+        wait_for_slot: Wait for the render pool instead of raising 503 when it is full
+    
+    Returns:
+        (open binary file, mtime)
+    """
+    cached = await run_in_threadpool(report_cache.open, cache_key)
+    if cached is not None:
+        return cached
+    
+    # Render in the PDF process pool straight into a cache temp file, so
+    # neither the orders nor the PDF are ever buffered in this process
+    render = pdf_render_pool.render_when_free if wait_for_slot else pdf_render_pool.render
+    tmp_path = report_cache.temp_path()
+    try:
+        await render(
+            "sales",
+            render_sales_report,
+            seller_id=seller_info.get("id"),
+            start_day=start_day,
+            end_day=end_day,
+            seller_info=dict(seller_info),
+            summary=summary,
+            output=tmp_path
+        )
+    except BaseException:
+        report_cache.discard(tmp_path)
+        raise
+    return await run_in_threadpool(report_cache.commit, cache_key, tmp_path)
 
 
 @router.get("/report")
 async def get_order_report(
-    type: str = Query("pdf", description="Report type (pdf only for now)"),
+    type: str = Query("pdf", description="Report type: pdf or csv"),
     range: str = Query("today", description="Date range (today, yesterday, this-week, this-month) or custom range in format 'YYYY-MM-DD,YYYY-MM-DD'"),
     start_date: Optional[str] = Query(None, description="Start date in YYYY-MM-DD format (for custom range)"),
     end_date: Optional[str] = Query(None, description="End date in YYYY-MM-DD format (for custom range)"),
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Generate a sales report for the seller"""
-    if type != "pdf":
-        raise HTTPException(status_code=400, detail="Only PDF reports are supported at this time")
+    """Generate a sales report for the seller
+    
+    Rendered PDFs are cached on disk per seller, IST day range and data
+    version; a matching If-None-Match gets 304 without touching the cache.
+    CSV exports stream straight from the database.
+    """
+    if type not in ("pdf", "csv"):
+        raise HTTPException(status_code=400, detail="Only PDF and CSV reports are supported")
     
     # Get seller ID from authenticated user
     seller_id = current_user.get("id")
     if not seller_id:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     
-    # Handle custom date range from explicit parameters
-    if start_date and end_date:
-        try:
-            # Create a custom range string in the format expected by get_date_range
-            custom_range = f"{start_date},{end_date}"
-            start_date_obj, end_date_obj = get_date_range(custom_range)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
-    else:
-        # Use the range parameter
-        start_date_obj, end_date_obj = get_date_range(range)
-    
-    # Query orders for this seller within date range
-    # Note: This assumes Order model has seller_id field. Adjust as needed.
-    orders_query = db.query(Order).filter(
-        Order.date >= start_date_obj,
-        Order.date <= end_date_obj
-    ).all()
-    
-    # Convert orders to dict for the PDF generator
-    orders_data = []
-    for order in orders_query:
-        # Get product details
-        product_name = order.product
-        
-        # You might need to join with products table to get price
-        # This is a simplified example
-        orders_data.append({
-            "id": order.id,
-            "product": product_name,
-            "quantity": order.quantity,
-            "price": 0.00,  # Replace with actual price from your data model
-            "date": order.date
-        })
-    
-    # Generate PDF - Convert UTC dates back to IST for display
-    
-    # Convert UTC dates to IST for display
-    start_date_ist = start_date_obj.astimezone(IST_TZ)
-    end_date_ist = end_date_obj.astimezone(IST_TZ)
-    
-    pdf_data = generate_pdf_report(
-        orders=orders_data,
-        seller_info=current_user,
-        date_range=f"{start_date_ist.strftime('%Y-%m-%d')} to {end_date_ist.strftime('%Y-%m-%d')}"
-    )
+    # Reports cover whole IST days
+    start_day, end_day = get_report_days(range, start_date, end_date)
+    start_date_obj, end_date_obj = ist_day_bounds(start_day, end_day)
     
-    # Create filename with date range using IST dates
-    filename = f"sales_report_{start_date_ist.strftime('%Y%m%d')}_to_{end_date_ist.strftime('%Y%m%d')}_IST.pdf"
+    # Create filename with the IST date range
+    filename = sales_report_filename(start_day, end_day, type)
     
-    # Return PDF as downloadable file
-    return Response(
-        content=pdf_data,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
\ No newline at end of file
+    if type == "csv":
+        # Rows go from the server-side cursor to the client a chunk at a time
+        rows = (order_table_row(order) for order in iter_order_rows(db, seller_id, start_date_obj, end_date_obj))
+        return StreamingResponse(
+            iter_csv(ORDER_TABLE_HEADER, rows),
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+    
+    # Totals come from the daily rollup and double as the cache's data version
+    summary, cache_key = await load_sales_report_key(db, seller_id, start_day, end_day)
+    etag = etag_for(cache_key)
+    if etag_matches(etag, if_none_match):
+        return not_modified_response(etag)
+    
+    # Stream the PDF file as a download
+    pdf_file, last_modified = await open_sales_report(db, current_user, start_day, end_day, summary, cache_key)
+    return pdf_response(pdf_file, filename, etag, last_modified)
+
+
+@router.get("/summary")
+def get_order_summary(
+    range: str = Query("today", description="Date range (today, yesterday, this-week, this-month) or custom range in format 'YYYY-MM-DD,YYYY-MM-DD'"),
+    start_date: Optional[str] = Query(None, description="Start date in YYYY-MM-DD format (for custom range)"),
+    end_date: Optional[str] = Query(None, description="End date in YYYY-MM-DD format (for custom range)"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the seller's sales totals and top product for a date range (used by the NLP get_report intent)"""
+    seller_id = current_user.get("id")
+    if not seller_id:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    
+    start_day, end_day = get_report_days(range, start_date, end_date)
+    summary = get_sales_summary(db, seller_id, start_day, end_day)
+    
+    response = {
+        "sales": round(summary["total_sales"], 2),
+        "orders": summary["total_orders"],
+        "units": summary["total_units"],
+        "top_product": summary["top_product"] or "N/A"
+    }
+    # Custom ranges echo their dates so the reply can show them
+    if "," in range or (start_date and end_date):
+        response["start_date"] = start_day.isoformat()
+        response["end_date"] = end_day.isoformat()
+    return response
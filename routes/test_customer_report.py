@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.base import Base, Order, Product
+from routes.customers import get_customer_report
+
+
+class TestCustomerReport(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                                    poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add_all([
+            Product(seller_id=1, name="Rice", price=50.0, stock=10),
+            Product(seller_id=1, name="Dal", price=120.0, stock=10),
+            Product(seller_id=2, name="Soap", price=30.0, stock=10),
+            Order(product="Rice", buyer="Ramesh", quantity=2, date=datetime(2025, 6, 1, 5, 0)),
+            Order(product="Dal", buyer="Ramesh", quantity=1, date=datetime(2025, 6, 2, 6, 0)),
+            Order(product="Rice", buyer="Sita", quantity=3, date=datetime(2025, 6, 2, 5, 0)),
+            Order(product="Dal", buyer="Anil", quantity=1, date=datetime(2025, 6, 1, 9, 0)),
+            Order(product="Soap", buyer="Zoya", quantity=9, date=datetime(2025, 6, 1, 7, 0)),
+            Order(product="Rice", buyer="Old", quantity=9, date=datetime(2025, 5, 1, 5, 0)),
+        ])
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def report(self, **params):
+        params.setdefault("range", "2025-06-01,2025-06-02")
+        params.setdefault("start_date", None)
+        params.setdefault("end_date", None)
+        params.setdefault("limit", 10)
+        params.setdefault("sort", "spend")
+        params.setdefault("cursor", None)
+        return get_customer_report(current_user={"id": 1}, db=self.db, **params)
+
+    def test_totals_per_buyer_ranked_by_spend(self):
+        response = self.report()
+        self.assertEqual(response["customers"], [
+            {"name": "Ramesh", "order_count": 2, "units": 3, "total_spent": 220.0,
+             "last_order_date": "2025-06-02T06:00:00"},
+            {"name": "Sita", "order_count": 1, "units": 3, "total_spent": 150.0,
+             "last_order_date": "2025-06-02T05:00:00"},
+            {"name": "Anil", "order_count": 1, "units": 1, "total_spent": 120.0,
+             "last_order_date": "2025-06-01T09:00:00"},
+        ])
+        self.assertIsNone(response["next_cursor"])
+
+    def test_keyset_pages_cover_every_buyer_once(self):
+        for sort in ("spend", "buyer"):
+            names, cursor = [], None
+            while True:
+                page = self.report(limit=1, sort=sort, cursor=cursor)
+                names += [customer["name"] for customer in page["customers"]]
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            expected = ["Ramesh", "Sita", "Anil"] if sort == "spend" else ["Anil", "Ramesh", "Sita"]
+            self.assertEqual(names, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(HTTPException) as ctx:
+            self.report(cursor="not-a-cursor")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
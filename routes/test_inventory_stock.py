@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth.dependencies import get_current_user
+from backend.database import get_db
+from models.base import Base, Product
+from routes import inventory, products
+
+
+class TestInventoryStockUpdates(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                                    poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        Session = sessionmaker(bind=self.engine)
+        with Session() as db:
+            db.add_all([Product(id=1, seller_id=1, name="Rice", price=50.0, stock=10),
+                        Product(id=2, seller_id=2, name="Dal", price=90.0, stock=10)])
+            db.commit()
+
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+
+        def override_get_db():
+            with Session() as db:
+                yield db
+
+        app = FastAPI()
+        app.include_router(products.router)
+        app.include_router(inventory.router)
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: {"id": 1, "sub": 1, "role": "seller"}
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_update_is_a_single_statement(self):
+        response = self.client.post("/inventory/update", json={"product_id": 1, "stock": 4})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["product"], {"id": 1, "name": "Rice", "stock": 4, "version": 2})
+        queries = [statement for statement in self.statements if not statement.startswith(("BEGIN", "COMMIT"))]
+        # One UPDATE ... RETURNING, and the change feed entry written in the same transaction
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(queries[0].startswith("UPDATE products"))
+        self.assertIn("RETURNING", queries[0])
+        self.assertTrue(queries[1].startswith("INSERT INTO inventory_changes"))
+
+    def test_update_conflicts(self):
+        self.assertEqual(self.client.post("/inventory/update", json={"product_id": 2, "stock": 4}).status_code, 404)
+        response = self.client.post("/inventory/update", json={"product_id": 1, "stock": 4, "expected_version": 5})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.post("/inventory/update", json={"product_id": 1, "stock": -1}).json(),
+                         {"error": "Quantity cannot be negative."})
+
+    def test_adjust_and_reserve(self):
+        self.assertEqual(self.client.post("/inventory/adjust", json={"product_id": 1, "delta": 5})
+                         .json()["product"]["stock"], 15)
+        self.assertEqual(self.client.post("/inventory/reserve", json={"product_id": 1, "quantity": 15})
+                         .json()["product"]["stock"], 0)
+        self.assertEqual(self.client.post("/inventory/reserve", json={"product_id": 1, "quantity": 1})
+                         .status_code, 409)
+        self.assertEqual(self.client.post("/inventory/adjust", json={"product_id": 1, "delta": -1})
+                         .status_code, 409)
+        self.assertEqual(self.client.post("/inventory/reserve", json={"product_id": 2, "quantity": 1})
+                         .status_code, 404)
+        self.assertEqual(self.client.post("/inventory/reserve", json={"product_id": 1, "quantity": 0})
+                         .status_code, 422)
+
+    def test_update_by_name(self):
+        response = self.client.post("/seller/products/update-stock", json={"name": "Rice", "stock": 7})
+        self.assertEqual(response.json()["product"], {"id": 1, "name": "Rice", "stock": 7, "version": 2})
+        self.assertEqual(self.client.post("/seller/products/update-stock", json={"name": "Dal", "stock": 7})
+                         .status_code, 404)
+        response = self.client.post("/seller/products/update-stock",
+                                    json={"name": "Rice", "stock": 8, "expected_version": 1})
+        self.assertEqual(response.status_code, 409)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import asyncio
+import io
+import unittest
+import sys
+import os
+import zipfile
+from datetime import datetime
+from unittest.mock import patch
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.base import Base, Order, Product
+from routes import invoices
+from routes.invoices import InvoiceBatchRequest, create_invoice_batch, get_invoice_batch_progress
+from utils.pdf_render_pool import PDFRenderPool
+
+
+class TestInvoiceBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = PDFRenderPool(max_workers=2, max_pending=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                                    poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add_all([
+            Product(seller_id=1, name="Rice", price=50.0, stock=10),
+            Product(seller_id=1, name="Dal", price=120.0, stock=10),
+            Product(seller_id=2, name="Soap", price=30.0, stock=10),
+            Order(id=1, product="Rice", buyer="Ramesh", quantity=2, date=datetime(2025, 6, 1, 5, 0)),
+            Order(id=2, product="Dal", buyer="Sita", quantity=1, date=datetime(2025, 6, 2, 6, 0)),
+            Order(id=3, product="Soap", buyer="Zoya", quantity=9, date=datetime(2025, 6, 1, 7, 0)),
+            Order(id=4, product="Rice", buyer="Old", quantity=9, date=datetime(2025, 5, 1, 5, 0)),
+        ])
+        self.db.commit()
+        patcher = patch.object(invoices, "pdf_render_pool", self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        invoices.invoice_batch_progress.clear()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def download(self, **fields):
+        async def run():
+            response = await create_invoice_batch(InvoiceBatchRequest(**fields), current_user={"id": 1, "name": "Shop"},
+                                                  db=self.db)
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            return response, body
+        response, body = asyncio.run(run())
+        return response.headers["X-Batch-Id"], zipfile.ZipFile(io.BytesIO(body))
+
+    def test_zip_holds_one_invoice_per_seller_order(self):
+        batch_id, archive = self.download(order_ids=[2, 1, 3])
+        # Order 3 belongs to another seller's product and is left out
+        self.assertEqual(archive.namelist(), ["invoice_1.pdf", "invoice_2.pdf"])
+        for name in archive.namelist():
+            self.assertTrue(archive.read(name).startswith(b"%PDF"))
+
+        progress = get_invoice_batch_progress(batch_id, current_user={"id": 1})
+        self.assertEqual((progress["status"], progress["total"], progress["rendered"], progress["failed"]),
+                         ("done", 2, 2, 0))
+        with self.assertRaises(HTTPException) as ctx:
+            get_invoice_batch_progress(batch_id, current_user={"id": 2})
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    def test_date_range_selects_orders(self):
+        _, archive = self.download(range="2025-06-01,2025-06-02")
+        self.assertEqual(archive.namelist(), ["invoice_1.pdf", "invoice_2.pdf"])
+
+    def test_batch_needs_orders_or_a_range(self):
+        with self.assertRaises(HTTPException) as ctx:
+            self.download()
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_oversized_batch_is_rejected(self):
+        with patch.object(invoices, "INVOICE_BATCH_MAX_ORDERS", 1):
+            with self.assertRaises(HTTPException) as ctx:
+                self.download(range="2025-06-01,2025-06-02")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
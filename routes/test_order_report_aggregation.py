@@ -0,0 +1,160 @@
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+import sys
+import os
+from datetime import date, datetime
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytz
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.base import Base, Order, Product
+from routes.reports import get_order_summary, iter_order_rows, get_order_report, get_report_days
+from routes.products import get_top_products, top_products_cache
+from utils.order_rollup import get_sales_summary, refresh_order_rollup
+from utils.pdf_render_pool import PDFRenderPool
+from utils.report_cache import ReportCache
+
+
+class TestOrderReportAggregation(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Render workers stream rows through their own sessions on DATABASE_URL,
+        # so the data lives in a file they can open too
+        cls.db_dir = tempfile.TemporaryDirectory()
+        cls.database_url = f"sqlite:///{os.path.join(cls.db_dir.name, 'reports.db')}"
+        cls.environ = mock.patch.dict(os.environ, {"DATABASE_URL": cls.database_url})
+        cls.environ.start()
+        cls.pool = PDFRenderPool(max_workers=1, max_pending=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        cls.environ.stop()
+        cls.db_dir.cleanup()
+
+    def setUp(self):
+        self.engine = create_engine(self.database_url, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add_all([
+            Product(seller_id=1, name="Rice", price=50.0, stock=10),
+            Product(seller_id=1, name="Dal", price=120.0, stock=10),
+            Product(seller_id=2, name="Soap", price=30.0, stock=10),
+            Order(product="Rice", buyer="Ramesh", quantity=2, date=datetime(2025, 6, 1, 5, 0)),
+            Order(product="Dal", buyer="Ramesh", quantity=1, date=datetime(2025, 6, 1, 6, 0)),
+            Order(product="Rice", buyer="Sita", quantity=3, date=datetime(2025, 6, 2, 5, 0)),
+            Order(product="Soap", buyer="Sita", quantity=4, date=datetime(2025, 6, 1, 7, 0)),
+            Order(product="Rice", buyer="Old", quantity=9, date=datetime(2025, 5, 1, 5, 0)),
+        ])
+        self.db.commit()
+        top_products_cache.clear()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        cache_patch = mock.patch("routes.reports.report_cache", ReportCache(self.cache_dir.name))
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+        pool_patch = mock.patch("routes.reports.pdf_render_pool", self.pool)
+        pool_patch.start()
+        self.addCleanup(pool_patch.stop)
+        self.addCleanup(self.cache_dir.cleanup)
+        self.start = datetime(2025, 6, 1)
+        self.end = datetime(2025, 6, 2, 23, 59, 59)
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+        self.engine.dispose()
+
+    def test_summary_joins_product_prices(self):
+        """Totals use product prices and only the seller's products"""
+        summary = get_sales_summary(self.db, 1, date(2025, 6, 1), date(2025, 6, 2))
+        self.assertEqual(summary, {"total_orders": 3, "total_units": 6, "total_sales": 370.0, "top_product": "Rice"})
+
+    def test_summary_is_the_same_after_rollup(self):
+        before = get_sales_summary(self.db, 1, date(2025, 6, 1), date(2025, 6, 2))
+        refresh_order_rollup(self.db)
+        self.assertEqual(get_sales_summary(self.db, 1, date(2025, 6, 1), date(2025, 6, 2)), before)
+
+    def test_summary_for_empty_range(self):
+        summary = get_sales_summary(self.db, 1, date(2024, 1, 1), date(2024, 1, 2))
+        self.assertEqual(summary, {"total_orders": 0, "total_units": 0, "total_sales": 0.0, "top_product": None})
+
+    def test_custom_range_names_ist_days(self):
+        self.assertEqual(get_report_days("today", "2025-06-01", "2025-06-02"), (date(2025, 6, 1), date(2025, 6, 2)))
+        self.assertEqual(get_report_days("2025-06-01,2025-06-30"), (date(2025, 6, 1), date(2025, 6, 30)))
+
+    def test_summary_endpoint_for_nlp(self):
+        response = get_order_summary(range="2025-06-01,2025-06-02", start_date=None, end_date=None,
+                                     current_user={"id": 1}, db=self.db)
+        self.assertEqual(response, {"sales": 370.0, "orders": 3, "units": 6, "top_product": "Rice",
+                                    "start_date": "2025-06-01", "end_date": "2025-06-02"})
+
+    def test_rows_stream_in_pages_with_prices(self):
+        rows = list(iter_order_rows(self.db, 1, self.start, self.end, page_size=1))
+        self.assertEqual([(row["product"], row["quantity"], row["price"]) for row in rows],
+                         [("Rice", 2, 50.0), ("Dal", 1, 120.0), ("Rice", 3, 50.0)])
+
+    def report(self, if_none_match=None, type="pdf"):
+        async def fetch():
+            response = await get_order_report(type=type, range="today", start_date="2025-06-01",
+                                              end_date="2025-06-02", if_none_match=if_none_match,
+                                              current_user={"id": 1, "email": "seller@example.com"}, db=self.db)
+            if hasattr(response, "body_iterator"):
+                response.body = b"".join([chunk async for chunk in response.body_iterator])
+            return response
+        return asyncio.run(fetch())
+
+    def test_report_endpoint_returns_pdf(self):
+        response = self.report()
+        self.assertEqual(response.media_type, "application/pdf")
+        self.assertTrue(response.body.startswith(b"%PDF"))
+        self.assertEqual(int(response.headers["Content-Length"]), len(response.body))
+        self.assertIn("Last-Modified", response.headers)
+
+    def test_report_endpoint_streams_csv(self):
+        response = self.report(type="csv")
+        self.assertEqual(response.media_type, "text/csv")
+        self.assertEqual(response.body.decode().splitlines(), [
+            "Order ID,Product,Quantity,Price,Total,Date",
+            "1,Rice,2,$50.00,$100.00,2025-06-01",
+            "2,Dal,1,$120.00,$120.00,2025-06-01",
+            "3,Rice,3,$50.00,$150.00,2025-06-02",
+        ])
+
+    def test_repeat_report_is_served_from_cache_or_304(self):
+        first = self.report()
+        etag = first.headers["ETag"]
+        second = self.report()
+        self.assertEqual(second.body, first.body)
+        self.assertEqual(second.headers["ETag"], etag)
+        self.assertEqual(self.report(if_none_match=etag).status_code, 304)
+
+        # A new order in the range changes the data version and so the ETag
+        self.db.add(Order(product="Dal", buyer="Sita", quantity=1, date=datetime(2025, 6, 2, 8, 0)))
+        self.db.commit()
+        changed = self.report(if_none_match=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+
+    def test_top_products_cache_follows_product_writes(self):
+        def top():
+            return [product["name"] for product in get_top_products(
+                range="2025-06-01,2025-06-02", limit=5, by="revenue", current_user={"id": 1}, db=self.db
+            )["products"]]
+
+        self.assertEqual(top(), ["Rice", "Dal"])
+        # A price edit is seen at once, not after the cache TTL
+        self.db.query(Product).filter(Product.name == "Dal").one().price = 300.0
+        self.db.commit()
+        self.assertEqual(top(), ["Dal", "Rice"])
+        self.db.add(Order(product="Rice", buyer="Ali", quantity=10, date=datetime(2025, 6, 2, 6, 0)))
+        self.db.commit()
+        self.assertEqual(top(), ["Rice", "Dal"])
+
+if __name__ == "__main__":
+    unittest.main()
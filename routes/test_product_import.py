@@ -0,0 +1,109 @@
+import json
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth.dependencies import get_current_user
+from backend.database import get_db
+from models.base import Base, Product
+from routes import products
+from utils import product_import
+
+
+class TestBulkProductImport(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                                    poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+        self.inserts = []
+        event.listen(self.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statement.startswith("INSERT INTO products")
+                     and self.inserts.append(statement))
+
+        def override_get_db():
+            with self.Session() as db:
+                yield db
+
+        app = FastAPI()
+        app.include_router(products.router)
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: {"id": 7, "role": "seller"}
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def upload(self, filename, content, **params):
+        response = self.client.post("/seller/products/bulk", params=params,
+                                    files={"file": (filename, content.encode() if isinstance(content, str) else content)})
+        return response
+
+    def stored(self):
+        with self.Session() as db:
+            return db.execute(select(Product.seller_id, Product.name, Product.price, Product.stock, Product.description)
+                              .order_by(Product.id)).all()
+
+    def test_csv_rows_are_validated_and_imported(self):
+        content = ("name,price,stock,description\n"
+                   "Chawal,50,20,Basmati\n"
+                   "Dal,0,5,\n"
+                   ",30,1,\n"
+                   "Aloo,25,-1,\n"
+                   "Atta,40,10,\n")
+        report = self.upload("catalog.csv", content).json()
+        self.assertEqual((report["format"], report["total_rows"], report["imported"], report["failed"]),
+                         ("csv", 5, 2, 3))
+        self.assertEqual([error["line"] for error in report["errors"]], [3, 4, 5])
+        self.assertIn("price: Value error, price must be greater than 0", report["errors"][0]["errors"])
+        self.assertEqual(self.stored(), [(7, "Chawal", 50.0, 20, "Basmati"), (7, "Atta", 40.0, 10, None)])
+
+    def test_jsonl_reports_bad_lines(self):
+        content = "\n".join([
+            json.dumps({"product_name": "Sugar", "price": 45.5, "stock": 3}),
+            "",
+            "{not json",
+            json.dumps(["Salt", 20, 1]),
+            json.dumps({"product_name": "Tea", "price": "x", "stock": 1}),
+        ])
+        report = self.upload("catalog.jsonl", content).json()
+        self.assertEqual((report["total_rows"], report["imported"], report["failed"]), (4, 1, 3))
+        self.assertEqual([error["line"] for error in report["errors"]], [3, 4, 5])
+        self.assertTrue(report["errors"][0]["errors"][0].startswith("Invalid JSON"))
+        self.assertEqual(self.stored(), [(7, "Sugar", 45.5, 3, None)])
+
+    def test_rows_are_inserted_in_batches(self):
+        lines = ["product_name,price,stock"] + [f"Item {i},{i % 90 + 1},{i % 40}" for i in range(2500)]
+        report = self.upload("catalog.csv", "\n".join(lines)).json()
+        self.assertEqual((report["imported"], report["failed"]), (2500, 0))
+        with self.Session() as db:
+            self.assertEqual(db.scalar(select(func.count(Product.id)).where(Product.seller_id == 7)), 2500)
+        # One executemany per chunk of BULK_IMPORT_CHUNK_ROWS, not one INSERT per product
+        self.assertLessEqual(len(self.inserts), 2500 // product_import.BULK_IMPORT_CHUNK_ROWS + 1)
+
+    def test_format_comes_from_name_or_parameter(self):
+        self.assertEqual(self.upload("catalog.txt", "name,price,stock\nA,1,1\n").status_code, 400)
+        report = self.upload("catalog.txt", "name,price,stock\nA,1,1\n", format="csv").json()
+        self.assertEqual(report["imported"], 1)
+
+    def test_undecodable_file_keeps_earlier_rows(self):
+        # The file is decoded in blocks, so the good rows must span more than one
+        good = "".join(f"Item {i},1,1\n" for i in range(3000)).encode()
+        report = self.upload("catalog.csv", b"name,price,stock\n" + good + b"\xff\xfe" * 10).json()
+        self.assertGreater(report["imported"], 0)
+        self.assertEqual(report["imported"], report["total_rows"])
+        self.assertIn("Could not read the file after line", report["read_error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth.dependencies import get_current_user
+from backend.database import get_db
+from models.base import Base, Product
+from routes import inventory, products
+
+
+class TestProductPagination(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                                    poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        Session = sessionmaker(bind=self.engine)
+        with Session() as db:
+            db.add_all([Product(id=i, seller_id=1 if i % 3 else 2, name=f"Item {i}", description="x" * 500,
+                                price=10.0 + i, stock=i % 7) for i in range(1, 31)])
+            db.commit()
+
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+
+        def override_get_db():
+            with Session() as db:
+                yield db
+
+        app = FastAPI()
+        app.include_router(products.router)
+        app.include_router(inventory.router)
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: {"id": 1, "sub": 1, "role": "seller"}
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def collect(self, path, **params):
+        """Follow X-Next-Cursor through every page, returning the pages"""
+        pages = []
+        while True:
+            response = self.client.get(path, params=params)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json())
+            if "X-Next-Cursor" not in response.headers:
+                return pages
+            self.assertIn(f"cursor={response.headers['X-Next-Cursor']}", response.headers["Link"])
+            params["cursor"] = response.headers["X-Next-Cursor"]
+
+    def test_products_page_by_id(self):
+        pages = self.collect("/seller/products/", limit=8)
+        self.assertEqual([len(page) for page in pages], [8, 8, 4])
+        ids = [product["id"] for page in pages for product in page]
+        self.assertEqual(ids, [i for i in range(1, 31) if i % 3])
+        self.assertEqual(pages[0][0], {"id": 1, "name": "Item 1", "price": 11.0, "stock": 1})
+
+    def test_listing_selects_only_returned_columns(self):
+        self.client.get("/seller/products/", params={"limit": 5})
+        query = next(s for s in self.statements if "FROM products" in s)
+        self.assertNotIn("description", query)
+        self.assertNotIn("created_at", query)
+
+        self.statements.clear()
+        self.client.get("/seller/products/", params={"cursor": 5})
+        query = next(s for s in self.statements if "FROM products" in s)
+        self.assertIn("products.id >", query)
+        self.assertIn("ORDER BY products.id", query)
+
+    def test_exact_last_page_has_no_cursor(self):
+        pages = self.collect("/seller/products/", limit=20)
+        self.assertEqual([len(page) for page in pages], [20])
+
+    def test_inventory_and_low_stock_page(self):
+        pages = self.collect("/inventory/", limit=15)
+        self.assertEqual([len(page) for page in pages], [15, 5])
+        self.assertEqual(set(pages[0][0]), {"id", "name", "stock"})
+
+        low = [p for page in self.collect("/seller/products/low-stock", threshold=3, limit=2) for p in page]
+        self.assertEqual([p["id"] for p in low], [i for i in range(1, 31) if i % 3 and i % 7 < 3])
+
+        response = self.client.post("/seller/products/low-stock", json={"threshold": 3, "limit": 2})
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(response.headers["X-Next-Cursor"], str(response.json()[-1]["id"]))
+        self.assertNotIn("Link", response.headers)
+
+    def test_listings_without_cursor_or_limit_are_not_truncated(self):
+        with patch("utils.pagination.PAGE_DEFAULT_LIMIT", 5):
+            response = self.client.get("/seller/products/")
+            self.assertEqual(len(response.json()), 20)
+            self.assertNotIn("X-Next-Cursor", response.headers)
+            self.assertEqual(len(self.client.get("/inventory/").json()), 20)
+            self.assertEqual(len(self.client.post("/seller/products/low-stock", json={"threshold": 3}).json()),
+                             len([i for i in range(1, 31) if i % 3 and i % 7 < 3]))
+            # A cursor alone pages with the default limit
+            self.assertEqual(len(self.client.get("/seller/products/", params={"cursor": 0}).json()), 5)
+
+    def test_limit_is_capped(self):
+        self.assertEqual(self.client.get("/seller/products/", params={"limit": 100000}).status_code, 422)
+        self.assertEqual(self.client.post("/seller/products/low-stock", json={"cursor": "x"}).status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
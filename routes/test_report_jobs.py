@@ -0,0 +1,173 @@
+import asyncio
+import tempfile
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.stub_whatsapp_api import StubWhatsAppAPI
+from models.base import Base, Product, Seller
+from routes import inventory, jobs, reports
+from routes.jobs import ReportJobRequest, create_report_job, get_report_job, download_report_job
+from utils.pdf_render_pool import PDFRenderPool
+from utils.report_cache import ReportCache
+from utils.report_jobs import ReportJobWorkers
+from utils.whatsapp_sender import WhatsAppSender
+
+SELLER = {"id": 1, "sub": 1, "email": "shop@example.com", "role": "seller"}
+
+
+class TestReportJobDelivery(unittest.TestCase):
+    """Report jobs run end to end against the local WhatsApp API stub"""
+
+    @classmethod
+    def setUpClass(cls):
+        # Render workers stream rows through their own sessions on DATABASE_URL,
+        # so the data lives in a file they can open too
+        cls.db_dir = tempfile.TemporaryDirectory()
+        cls.database_url = f"sqlite:///{os.path.join(cls.db_dir.name, 'reports.db')}"
+        cls.environ = patch.dict(os.environ, {"DATABASE_URL": cls.database_url})
+        cls.environ.start()
+        cls.pool = PDFRenderPool(max_workers=1, max_pending=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        cls.environ.stop()
+        cls.db_dir.cleanup()
+
+    def setUp(self):
+        self.engine = create_engine(self.database_url, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+        self.db.add_all([
+            Seller(id=1, name="Sharma Kirana", whatsapp_number="919876543210"),
+            Product(seller_id=1, name="Rice", price=50.0, stock=10),
+            Product(seller_id=1, name="Dal", price=120.0, stock=0),
+        ])
+        self.db.commit()
+
+        self.stub = StubWhatsAppAPI().start()
+        self.addCleanup(self.stub.stop)
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        cache = ReportCache(cache_dir.name)
+        for target, name, value in [(inventory, "report_cache", cache), (reports, "report_cache", cache),
+                                    (jobs, "report_cache", cache), (inventory, "pdf_render_pool", self.pool),
+                                    (reports, "pdf_render_pool", self.pool)]:
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+        self.engine.dispose()
+
+    def run_jobs(self, max_attempts=3):
+        """Run queued jobs to completion with a sender pointed at the stub"""
+        async def run():
+            sender = WhatsAppSender(access_token="test-token", phone_number_id="123", base_url=self.stub.url,
+                                    max_retries=0)
+            try:
+                with patch.object(jobs, "whatsapp_sender", sender):
+                    workers = ReportJobWorkers(jobs.run_report_job, self.Session, max_attempts=max_attempts,
+                                               on_failed=jobs.notify_report_job_failed)
+                    while await workers.run_once():
+                        pass
+            finally:
+                await sender.aclose()
+        asyncio.run(run())
+
+    def test_inventory_report_is_delivered_as_document(self):
+        queued = create_report_job(ReportJobRequest(type="inventory", deliver_to="919876543210"),
+                                   current_user=SELLER, db=self.db)
+        self.assertEqual(queued["status"], "queued")
+
+        self.run_jobs()
+
+        job = get_report_job(queued["job_id"], current_user=SELLER, db=self.db)
+        self.assertEqual((job["status"], job["delivery_status"]), ("done", "sent"))
+        self.assertEqual(job["download_url"], f"/jobs/{queued['job_id']}/download")
+
+        media = list(self.stub.media.values())
+        self.assertEqual(len(media), 1)
+        self.assertEqual(media[0]["mime_type"], "application/pdf")
+        self.assertTrue(media[0]["content"].startswith(b"%PDF"))
+        [message] = self.stub.messages
+        self.assertEqual((message["to"], message["type"]), ("919876543210", "document"))
+        self.assertEqual(message["document"]["id"], next(iter(self.stub.media)))
+        self.assertEqual(message["document"]["caption"], "Your inventory report")
+
+        async def download():
+            response = await download_report_job(queued["job_id"], current_user=SELLER, db=self.db)
+            return b"".join([chunk async for chunk in response.body_iterator])
+        self.assertEqual(asyncio.run(download()), media[0]["content"])
+
+    def test_sales_report_without_recipient_is_only_cached(self):
+        queued = create_report_job(ReportJobRequest(type="sales", range="custom", start_date="2025-06-01",
+                                                    end_date="2025-06-07"), current_user=SELLER, db=self.db)
+        self.run_jobs()
+        job = get_report_job(queued["job_id"], current_user=SELLER, db=self.db)
+        self.assertEqual((job["status"], job["delivery_status"]), ("done", None))
+        self.assertEqual(self.stub.messages, [])
+
+    def test_failed_delivery_is_retried_then_reported(self):
+        queued = create_report_job(ReportJobRequest(type="inventory", deliver_to="919876543210", language="hi"),
+                                   current_user=SELLER, db=self.db)
+
+        async def reject_upload(*args, **kwargs):
+            return None
+
+        with patch.object(WhatsAppSender, "upload_media", reject_upload):
+            self.run_jobs(max_attempts=2)
+
+        job = get_report_job(queued["job_id"], current_user=SELLER, db=self.db)
+        self.assertEqual((job["status"], job["attempts"]), ("failed", 2))
+        self.assertIn("media upload failed", job["error"])
+        [message] = self.stub.messages
+        self.assertEqual(message["to"], "919876543210")
+        self.assertIn("रिपोर्ट तैयार नहीं हो सकी", message["text"]["body"])
+
+    def test_reports_are_only_sent_to_the_registered_number(self):
+        for number in ("911234567890", "+91 98765 4321"):
+            with self.assertRaises(HTTPException) as ctx:
+                create_report_job(ReportJobRequest(type="inventory", deliver_to=number), current_user=SELLER,
+                                  db=self.db)
+            self.assertEqual(ctx.exception.status_code, 403)
+        # Sellers without a registered number cannot have reports sent anywhere
+        with self.assertRaises(HTTPException) as ctx:
+            create_report_job(ReportJobRequest(type="inventory", deliver_to="919876543210"),
+                              current_user={"id": 2, "sub": 2}, db=self.db)
+        self.assertEqual(ctx.exception.status_code, 403)
+
+        queued = create_report_job(ReportJobRequest(type="inventory", deliver_to="+91 98765 43210"),
+                                   current_user=SELLER, db=self.db)
+        self.run_jobs()
+        [message] = self.stub.messages
+        self.assertEqual(message["to"], "919876543210")
+        self.assertEqual(get_report_job(queued["job_id"], current_user=SELLER, db=self.db)["delivery_status"], "sent")
+
+    def test_jobs_are_scoped_to_their_seller(self):
+        queued = create_report_job(ReportJobRequest(type="inventory"), current_user=SELLER, db=self.db)
+        with self.assertRaises(HTTPException) as ctx:
+            get_report_job(queued["job_id"], current_user={"id": 2}, db=self.db)
+        self.assertEqual(ctx.exception.status_code, 404)
+
+        async def download():
+            await download_report_job(queued["job_id"], current_user=SELLER, db=self.db)
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(download())
+        self.assertEqual(ctx.exception.status_code, 409)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth.dependencies import get_current_user
+from backend.database import get_db
+from models.base import Base, Product
+from routes import products
+
+
+class TestStockBatchUpdate(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                                    poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        with self.Session() as db:
+            db.add_all([
+                Product(id=1, seller_id=1, name="चावल", price=50.0, stock=5),
+                Product(id=2, seller_id=1, name="दाल", price=90.0, stock=5),
+                Product(id=3, seller_id=1, name="आलू", price=30.0, stock=5),
+                Product(id=4, seller_id=2, name="चीनी", price=45.0, stock=5),
+                Product(id=5, seller_id=1, name="चावल", price=55.0, stock=5),
+            ])
+            db.commit()
+
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+
+        def override_get_db():
+            with self.Session() as db:
+                yield db
+
+        app = FastAPI()
+        app.include_router(products.router)
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_user] = lambda: {"id": 1, "sub": 1, "role": "seller"}
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def stocks(self):
+        with self.Session() as db:
+            return dict(db.execute(select(Product.id, Product.stock).order_by(Product.id)).all())
+
+    def test_updates_every_item_with_one_statement(self):
+        response = self.client.post("/seller/products/update-stock/batch", json={"items": [
+            {"name": "चावल", "stock": 20}, {"name": "दाल", "stock": 15}, {"name": "आलू", "stock": 0},
+            {"name": "दाल", "stock": 12}
+        ]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], [{"id": 1, "name": "चावल", "stock": 20, "version": 2},
+                                                      {"id": 3, "name": "आलू", "stock": 0, "version": 2},
+                                                      {"id": 2, "name": "दाल", "stock": 12, "version": 2}])
+        self.assertEqual(response.json()["not_found"], [])
+        self.assertEqual(self.stocks(), {1: 20, 2: 12, 3: 0, 4: 5, 5: 5})
+
+        updates = [statement for statement in self.statements if statement.lstrip().upper().startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn("CASE", updates[0])
+
+    def test_unknown_and_other_sellers_products_are_not_found(self):
+        response = self.client.post("/seller/products/update-stock/batch", json={"items": [
+            {"name": "चावल", "stock": 20}, {"name": "चीनी", "stock": 9}, {"name": "maggi", "stock": 3}
+        ]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["not_found"], ["चीनी", "maggi"])
+        self.assertEqual(self.stocks(), {1: 20, 2: 5, 3: 5, 4: 5, 5: 5})
+
+    def test_negative_quantity_rejects_the_whole_batch(self):
+        response = self.client.post("/seller/products/update-stock/batch", json={"items": [
+            {"name": "दाल", "stock": 0}, {"name": "आलू", "stock": -3}
+        ]})
+
+        self.assertEqual(response.json(), {"error": "Quantity cannot be negative for: आलू."})
+        self.assertEqual(self.stocks(), {1: 5, 2: 5, 3: 5, 4: 5, 5: 5})
+
+    def test_invalid_items(self):
+        for body in ({}, {"items": []}, {"items": [{"name": "दाल"}]}, {"items": [{"name": "", "stock": 1}]},
+                     {"items": [{"name": "दाल", "stock": "5"}]}, {"items": ["दाल 5"]},
+                     {"items": [{"name": "दाल", "stock": 1}] * (products.STOCK_BATCH_MAX_ITEMS + 1)}):
+            response = self.client.post("/seller/products/update-stock/batch", json=body)
+            self.assertEqual(response.status_code, 400, body)
+
+
+if __name__ == "__main__":
+    unittest.main()
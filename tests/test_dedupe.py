@@ -0,0 +1,115 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from utils.dedupe import MemoryDedupeStore, SQLiteDedupeStore
+from nlp.message_router import MessageRouter
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_payload(message_id, text="Show my inventory", phone="919876543210"):
+    return {
+        "entry": [{
+            "changes": [{
+                "value": {
+                    "messages": [{"id": message_id, "from": phone, "text": {"body": text}}]
+                }
+            }]
+        }]
+    }
+
+
+class TestMemoryDedupeStore(unittest.TestCase):
+    def test_second_delivery_is_duplicate(self):
+        store = MemoryDedupeStore()
+        self.assertFalse(store.check_and_mark("wamid.1"))
+        self.assertTrue(store.check_and_mark("wamid.1"))
+        self.assertFalse(store.check_and_mark("wamid.2"))
+
+    def test_ids_expire_after_ttl(self):
+        clock = FakeClock()
+        store = MemoryDedupeStore(ttl_seconds=60, time_func=clock)
+        store.check_and_mark("wamid.1")
+        clock.now += 61
+        self.assertFalse(store.check_and_mark("wamid.1"))
+        # Only the re-claimed id is left after eviction
+        self.assertEqual(len(store), 1)
+
+    def test_max_entries_bounds_memory(self):
+        store = MemoryDedupeStore(max_entries=3)
+        for i in range(10):
+            store.check_and_mark(f"wamid.{i}")
+        self.assertEqual(len(store), 3)
+        self.assertTrue(store.check_and_mark("wamid.9"))
+
+    def test_forget_allows_reprocessing(self):
+        store = MemoryDedupeStore()
+        store.check_and_mark("wamid.1")
+        store.forget("wamid.1")
+        self.assertFalse(store.check_and_mark("wamid.1"))
+
+
+class TestSQLiteDedupeStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "dedupe.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_duplicates_are_shared_between_workers(self):
+        worker_a = SQLiteDedupeStore(self.db_path)
+        worker_b = SQLiteDedupeStore(self.db_path)
+        self.assertFalse(worker_a.check_and_mark("wamid.1"))
+        self.assertTrue(worker_b.check_and_mark("wamid.1"))
+
+    def test_expired_ids_are_reclaimed_and_purged(self):
+        clock = FakeClock()
+        store = SQLiteDedupeStore(self.db_path, ttl_seconds=60, time_func=clock)
+        store.check_and_mark("wamid.1")
+        store.check_and_mark("wamid.2")
+        clock.now += 61
+        self.assertFalse(store.check_and_mark("wamid.1"))
+        self.assertEqual(store.purge_expired(), 1)
+        self.assertEqual(len(store), 1)
+
+
+class TestMessageRouterDedupe(unittest.TestCase):
+    @patch.object(MessageRouter, "process_message", return_value="ok")
+    def test_redelivered_webhook_is_not_processed_twice(self, mock_process_message):
+        router = MessageRouter(dedupe_store=MemoryDedupeStore())
+
+        first = router.handle_webhook_payload(make_payload("wamid.1"))
+        second = router.handle_webhook_payload(make_payload("wamid.1"))
+
+        self.assertEqual(len(first["responses"]), 1)
+        self.assertEqual(second["responses"], [])
+        self.assertEqual(second["duplicates"], 1)
+        mock_process_message.assert_called_once()
+
+    @patch.object(MessageRouter, "process_message", side_effect=[RuntimeError("database is locked"), "ok"])
+    def test_failed_message_is_processed_on_redelivery(self, mock_process_message):
+        router = MessageRouter(dedupe_store=MemoryDedupeStore())
+
+        first = router.handle_webhook_payload(make_payload("wamid.1"))
+        second = router.handle_webhook_payload(make_payload("wamid.1"))
+
+        self.assertEqual(first["status"], "error")
+        self.assertEqual(second["responses"], [{"to": "919876543210", "response": "ok"}])
+        self.assertEqual(second["duplicates"], 0)
+        self.assertEqual(mock_process_message.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import asyncio
+import io
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.base import Base, FeedCheckpoint, InventoryChange, Product
+from routes.inventory import load_inventory_version
+from utils.inventory_feed import (
+    InventoryFeedConsumer, advance_checkpoint, get_checkpoint, prune_inventory_changes, read_changes
+)
+from utils.product_import import import_products, iter_import_rows
+from utils.stock_mutations import adjust_stock, set_stocks_by_name
+
+
+class TestInventoryFeed(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                                    poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def changes(self):
+        return [(change["product_id"], change["operation"], change["stock"], change["previous_stock"])
+                for change in read_changes(self.db, 0, settle_seconds=0)]
+
+    def add_products(self):
+        self.db.add_all([Product(id=1, seller_id=1, name="Rice", price=50.0, stock=10),
+                         Product(id=2, seller_id=2, name="Dal", price=90.0, stock=4)])
+        self.db.commit()
+
+    def consumer(self, handler, **options):
+        options.setdefault("settle_seconds", 0)
+        return InventoryFeedConsumer("test", handler, self.Session, **options)
+
+    def test_orm_writes_are_recorded_in_their_transaction(self):
+        self.add_products()
+        product = self.db.get(Product, 1)
+        product.stock = 3
+        self.db.commit()
+        self.db.delete(self.db.get(Product, 2))
+        self.db.commit()
+
+        product.stock = 0
+        self.db.flush()
+        self.db.rollback()
+
+        self.assertEqual(self.changes(), [(1, "insert", 10, None), (2, "insert", 4, None),
+                                          (1, "update", 3, 10), (2, "delete", 4, None)])
+
+    def test_core_writes_are_recorded(self):
+        self.add_products()
+        adjust_stock(self.db, 1, 1, -4)
+        set_stocks_by_name(self.db, 2, {"Dal": 9})
+        self.db.commit()
+        import_products(self.db, 1, iter_import_rows(io.BytesIO(b"name,price,stock\nTea,5,2\n"), "csv"))
+
+        self.assertEqual(self.changes()[2:], [(1, "update", 6, 10), (2, "update", 9, None), (3, "insert", 2, None)])
+
+    def test_inventory_report_version_follows_the_feed(self):
+        self.add_products()
+        version = load_inventory_version(self.db, 1)
+        self.assertEqual(load_inventory_version(self.db, 1), version)
+
+        adjust_stock(self.db, 2, 2, 1)
+        self.db.commit()
+        self.assertEqual(load_inventory_version(self.db, 1), version)
+
+        self.db.delete(self.db.get(Product, 1))
+        self.db.commit()
+        self.assertNotEqual(load_inventory_version(self.db, 1), version)
+
+    def test_consumer_handles_batches_and_checkpoints(self):
+        self.add_products()
+        for stock in range(5):
+            adjust_stock(self.db, 1, 1, 1)
+        self.db.commit()
+
+        batches = []
+
+        async def handler(changes):
+            batches.append([change["seq"] for change in changes])
+
+        self.assertEqual(asyncio.run(self.consumer(handler, batch_size=3).drain()), 7)
+        self.assertEqual(batches, [[1, 2, 3], [4, 5, 6], [7]])
+
+        # A new consumer with the same name resumes after the checkpoint
+        adjust_stock(self.db, 1, 1, 1)
+        self.db.commit()
+        batches.clear()
+        self.assertEqual(asyncio.run(self.consumer(handler).drain()), 1)
+        self.assertEqual(batches, [[8]])
+
+    def test_failed_batches_are_handled_again(self):
+        self.add_products()
+        calls = []
+
+        async def failing(changes):
+            calls.append(len(changes))
+            raise RuntimeError("cache unavailable")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(self.consumer(failing).run_once())
+        self.assertEqual(get_checkpoint(self.db, "test"), 0)
+
+        async def handler(changes):
+            calls.append(len(changes))
+
+        self.assertEqual(asyncio.run(self.consumer(handler).run_once()), 2)
+        self.assertEqual(calls, [2, 2])
+
+    def test_checkpoint_moves_once(self):
+        get_checkpoint(self.db, "test")
+        self.assertTrue(advance_checkpoint(self.db, "test", 0, 5))
+        self.assertFalse(advance_checkpoint(self.db, "test", 0, 3))
+        self.assertEqual(get_checkpoint(self.db, "test"), 5)
+
+    def test_new_consumer_can_start_from_latest(self):
+        self.add_products()
+        seen = []
+
+        async def handler(changes):
+            seen.extend(change["seq"] for change in changes)
+
+        consumer = self.consumer(handler, from_latest=True)
+        self.assertEqual(asyncio.run(consumer.drain()), 0)
+        adjust_stock(self.db, 1, 1, 1)
+        self.db.commit()
+        asyncio.run(consumer.drain())
+        self.assertEqual(seen, [3])
+
+    def test_recent_changes_settle_before_they_are_read(self):
+        self.add_products()
+        self.assertEqual(read_changes(self.db, 0, settle_seconds=60), [])
+        self.assertEqual(len(read_changes(self.db, 0, settle_seconds=0)), 2)
+
+    def test_prune_keeps_unconsumed_and_newest_changes(self):
+        self.add_products()
+        for stock in range(3):
+            adjust_stock(self.db, 1, 1, 1)
+        self.db.commit()
+        get_checkpoint(self.db, "test")
+        advance_checkpoint(self.db, "test", 0, 4)
+
+        self.assertEqual(prune_inventory_changes(self.db), 3)
+        seqs = self.db.execute(select(InventoryChange.seq).order_by(InventoryChange.seq)).scalars().all()
+        # Change 2 is seller 2's newest, 5 is not consumed yet
+        self.assertEqual(seqs, [2, 5])
+        self.assertEqual(self.db.get(FeedCheckpoint, "test").last_seq, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import logging
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from utils.logger import WhatsAppLogger, DailySizeRotatingFileHandler, JsonLinesFormatter, SamplingFilter
+
+
+def make_record(msg, level=logging.INFO, created=None):
+    record = logging.LogRecord("whatsapp_routing", level, __file__, 0, msg, None, None)
+    if created is not None:
+        record.created = created
+    return record
+
+
+class TestWhatsAppLogger(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmp_dir.name, "routing.log")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_lines(self):
+        with open(self.log_file, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_events_are_written_as_json_lines(self):
+        whatsapp_logger = WhatsAppLogger(log_file=self.log_file, sample_rates={})
+        whatsapp_logger.log_incoming_message("919876543210", "चावल 20", "user-1")
+        whatsapp_logger.log_error("boom", "ValueError", "user-1")
+        whatsapp_logger.flush()
+
+        lines = self.read_lines()
+        self.assertEqual([line["event_type"] for line in lines], ["incoming_message", "error"])
+        self.assertEqual(lines[0]["message_text"], "चावल 20")
+        self.assertEqual(lines[1]["level"], "ERROR")
+        self.assertIn("timestamp", lines[0])
+
+    def test_sampled_event_types_are_dropped_before_queueing(self):
+        whatsapp_logger = WhatsAppLogger(log_file=self.log_file, sample_rates={"route_command": 0.0})
+        parsed = {"intent": "get_inventory", "entities": {}, "language": "en"}
+        whatsapp_logger.log_parsed_result(parsed, "user-1")
+        whatsapp_logger.log_route_command(parsed, "user-1")
+        whatsapp_logger.flush()
+
+        self.assertEqual([line["event_type"] for line in self.read_lines()], ["parsed_result"])
+
+
+class TestSamplingFilter(unittest.TestCase):
+    def test_warnings_and_unsampled_events_always_pass(self):
+        sampling_filter = SamplingFilter({"api_call": 0.0})
+        self.assertFalse(sampling_filter.filter(make_record({"event_type": "api_call"})))
+        self.assertTrue(sampling_filter.filter(make_record({"event_type": "api_call"}, level=logging.ERROR)))
+        self.assertTrue(sampling_filter.filter(make_record({"event_type": "incoming_message"})))
+
+    def test_partial_rate(self):
+        values = iter([0.05, 0.5])
+        sampling_filter = SamplingFilter({"api_call": 0.1}, random_func=lambda: next(values))
+        self.assertTrue(sampling_filter.filter(make_record({"event_type": "api_call"})))
+        self.assertFalse(sampling_filter.filter(make_record({"event_type": "api_call"})))
+
+
+class TestDailySizeRotatingFileHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_switches_file_when_the_day_changes(self):
+        handler = DailySizeRotatingFileHandler(self.tmp_dir.name, "whatsapp_routing")
+        handler.setFormatter(JsonLinesFormatter())
+        today = datetime.now()
+        tomorrow = today + timedelta(days=1)
+        handler.handle(make_record({"event_type": "a"}, created=today.timestamp()))
+        handler.handle(make_record({"event_type": "b"}, created=tomorrow.timestamp()))
+        handler.close()
+
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), [
+            f"whatsapp_routing_{today.strftime('%Y-%m-%d')}.log",
+            f"whatsapp_routing_{tomorrow.strftime('%Y-%m-%d')}.log",
+        ])
+
+    def test_rotates_by_size_within_a_day(self):
+        handler = DailySizeRotatingFileHandler(self.tmp_dir.name, "whatsapp_routing", max_bytes=200, backup_count=2)
+        handler.setFormatter(JsonLinesFormatter())
+        for i in range(20):
+            handler.handle(make_record({"event_type": "incoming_message", "n": i}))
+        handler.close()
+
+        base = f"whatsapp_routing_{datetime.now().strftime('%Y-%m-%d')}.log"
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), [base, base + ".1", base + ".2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
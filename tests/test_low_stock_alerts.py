@@ -0,0 +1,169 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.base import Base, Inventory, LowStockAlert, Product, Seller
+from utils.low_stock_alerts import LowStockAlertEngine, format_digest
+from utils.stock_mutations import adjust_stock, set_stock
+
+
+START = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+
+
+class FakeSender:
+    def __init__(self, result=True):
+        self.result = result
+        self.sent = []
+
+    async def send_batch(self, messages):
+        messages = list(messages)
+        self.sent.extend(messages)
+        return [self.result] * len(messages)
+
+
+class TestLowStockAlerts(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                                    poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+        self.db.add_all([
+            Seller(id=1, name="Sharma Kirana", whatsapp_number="919876543210"),
+            Seller(id=2, name="No Phone Stores"),
+            Product(id=1, seller_id=1, name="Rice", price=50.0, stock=10),
+            Product(id=2, seller_id=1, name="Dal", price=90.0, stock=10),
+            Product(id=3, seller_id=1, name="Tea", price=5.0, stock=30),
+            Product(id=4, seller_id=2, name="Salt", price=20.0, stock=10),
+            # Tea is low below 20
+            Inventory(item_id=3, stock_count=30, threshold=20),
+        ])
+        self.db.commit()
+
+        self.now = START
+        self.sender = FakeSender()
+        self.alerts = self.engine_with(self.sender)
+        # Start the feed checkpoint after the setup writes
+        self.wait(self.alerts.consumer.drain())
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def engine_with(self, sender):
+        return LowStockAlertEngine(self.Session, sender=sender, window_seconds=60, default_threshold=5,
+                                   time_func=lambda: self.now, settle_seconds=0)
+
+    def at(self, seconds):
+        self.now = START + timedelta(seconds=seconds)
+
+    def wait(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def write(self, *mutations):
+        for mutation, *args in mutations:
+            mutation(self.db, *args)
+        self.db.commit()
+        self.wait(self.alerts.consumer.drain())
+
+    def test_crossings_are_coalesced_into_one_digest(self):
+        self.write((adjust_stock, 1, 1, -7), (set_stock, 1, 3, 12))
+        self.at(30)
+        self.write((adjust_stock, 1, 2, -6), (adjust_stock, 1, 1, -1))
+
+        self.assertEqual(self.wait(self.alerts.flush_due()), 0)
+        self.at(60)
+        self.assertEqual(self.wait(self.alerts.flush_due()), 1)
+
+        self.assertEqual(self.sender.sent, [("919876543210", "⚠️ Low stock: 3 products need restocking\n"
+                                                             "- Rice: 2 left\n- Dal: 4 left\n- Tea: 12 left")])
+        self.assertEqual(self.wait(self.alerts.flush_due(force=True)), 0)
+
+    def test_thresholds_are_looked_up_by_product_id(self):
+        # Dal's row is keyed by its product id; a row naming no product changes nothing
+        self.db.add_all([Inventory(item_id=2, stock_count=0, threshold=50),
+                         Inventory(item_id=99, stock_count=0, threshold=50)])
+        self.db.commit()
+        self.write((set_stock, 1, 1, 40), (set_stock, 1, 2, 40))
+        self.at(60)
+        self.assertEqual(self.wait(self.alerts.flush_due()), 1)
+        self.assertEqual(self.sender.sent[0][1], "⚠️ Low stock: 1 products need restocking\n- Dal: 40 left")
+        self.assertEqual(self.alerts._load_thresholds([1, 2, 3, 99]), {2: 50, 3: 20})
+
+    def test_restocked_products_drop_out(self):
+        self.write((adjust_stock, 1, 1, -7), (adjust_stock, 1, 2, -7))
+        self.write((set_stock, 1, 1, 40))
+        self.at(60)
+        self.wait(self.alerts.flush_due())
+        self.assertEqual(self.sender.sent[0][1], "⚠️ Low stock: 1 products need restocking\n- Dal: 3 left")
+
+        self.write((adjust_stock, 1, 2, 20))
+        self.write((set_stock, 1, 2, 1), (set_stock, 1, 2, 30))
+        self.at(200)
+        self.assertEqual(self.wait(self.alerts.flush_due()), 0)
+
+    def test_products_already_low_do_not_alert_again(self):
+        self.write((set_stock, 1, 1, 3))
+        self.at(60)
+        self.wait(self.alerts.flush_due())
+        # A decrement from 3 and an absolute set after the engine saw 2 are not crossings
+        self.write((adjust_stock, 1, 1, -1), (set_stock, 1, 1, 1))
+        self.at(200)
+        self.assertEqual(self.wait(self.alerts.flush_due()), 0)
+        self.assertEqual(len(self.sender.sent), 1)
+
+    def test_sellers_without_a_number_are_skipped(self):
+        self.write((adjust_stock, 2, 4, -9))
+        self.at(60)
+        self.assertEqual(self.wait(self.alerts.flush_due()), 0)
+        self.assertEqual(self.sender.sent, [])
+        # Nothing is left queued for them
+        self.assertEqual(self.db.query(LowStockAlert).count(), 0)
+
+    def test_deleted_products_drop_out(self):
+        self.write((adjust_stock, 1, 1, -9))
+        self.db.delete(self.db.get(Product, 1))
+        self.db.commit()
+        self.wait(self.alerts.consumer.drain())
+        self.assertEqual(self.wait(self.alerts.flush_due(force=True)), 0)
+
+    def test_failed_digests_are_sent_after_another_window(self):
+        self.sender.result = False
+        self.write((adjust_stock, 1, 1, -7))
+        self.at(60)
+        self.assertEqual(self.wait(self.alerts.flush_due()), 0)
+        self.assertEqual(len(self.sender.sent), 1)
+
+        self.sender.result = True
+        self.at(90)
+        self.assertEqual(self.wait(self.alerts.flush_due()), 0)
+        self.at(120)
+        self.assertEqual(self.wait(self.alerts.flush_due()), 1)
+        self.assertEqual(self.sender.sent[1], self.sender.sent[0])
+        self.assertEqual(self.db.query(LowStockAlert).count(), 0)
+
+    def test_queued_alerts_survive_a_restart(self):
+        self.write((adjust_stock, 1, 1, -7))
+        # A new engine, as after a crash inside the window
+        sender = FakeSender()
+        restarted = self.engine_with(sender)
+        self.at(60)
+        self.assertEqual(self.wait(restarted.flush_due()), 1)
+        self.assertEqual(sender.sent, [("919876543210", "⚠️ Low stock: 1 products need restocking\n- Rice: 3 left")])
+
+    def test_digest_in_hindi(self):
+        self.assertEqual(format_digest([{"name": "चावल", "stock": 2}], "hi"),
+                         "⚠️ कम स्टॉक: 1 प्रोडक्ट्स को फिर से भरने की ज़रूरत है\n- चावल: 2 बचे")
+
+
+if __name__ == "__main__":
+    unittest.main()
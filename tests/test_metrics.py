@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils.metrics import Histogram, MetricsRegistry, StageTimer, nlp_stage_seconds, nlp_message_seconds
+from utils.session_store import MemorySessionStore
+from utils.dedupe import MemoryDedupeStore
+from nlp.message_router import MessageRouter
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram("latency_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, stage="parse")
+
+        lines = histogram.collect()
+        self.assertIn('latency_seconds_bucket{stage="parse",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{stage="parse",le="1.0"} 3', lines)
+        self.assertIn('latency_seconds_bucket{stage="parse",le="+Inf"} 4', lines)
+        self.assertIn('latency_seconds_count{stage="parse"} 4', lines)
+        self.assertEqual(histogram.snapshot(stage="parse")["sum"], 6.05)
+
+    def test_registry_renders_help_and_type(self):
+        registry = MetricsRegistry()
+        registry.counter("messages_total", "Messages handled", ["intent"]).inc(intent="get_inventory")
+        text = registry.render()
+        self.assertIn("# TYPE messages_total counter", text)
+        self.assertIn('messages_total{intent="get_inventory"} 1', text)
+
+    def test_stage_timer_overhead_is_microseconds(self):
+        histogram = Histogram("overhead_seconds", "Overhead", ["stage", "intent", "language"])
+        iterations = 10000
+        started = time.perf_counter()
+        for _ in range(iterations):
+            timer = StageTimer()
+            for stage in ("negation", "normalization", "intent_matching", "entity_extraction"):
+                timer.lap(stage)
+            timer.observe(histogram, intent="get_inventory", language="hi")
+        per_message = (time.perf_counter() - started) / iterations
+        self.assertLess(per_message, 0.0005)
+
+
+class TestPipelineInstrumentation(unittest.TestCase):
+    @patch("nlp.message_router.route_command", return_value="ok")
+    @patch("nlp.message_router.parse_multilingual_command",
+           return_value={"intent": "get_report", "entities": {}, "language": "hi"})
+    def test_process_message_records_stage_timings(self, mock_parse, mock_route):
+        before = (nlp_message_seconds.snapshot(intent="get_report", language="hi") or {"count": 0})["count"]
+        router = MessageRouter(dedupe_store=MemoryDedupeStore(), session_store=MemorySessionStore())
+        router.process_message("919876543210", "आज की रिपोर्ट भेजो")
+
+        self.assertEqual(nlp_message_seconds.snapshot(intent="get_report", language="hi")["count"], before + 1)
+        for stage in ("parse", "session", "route", "logging"):
+            self.assertIsNotNone(nlp_stage_seconds.snapshot(stage=stage, intent="get_report", language="hi"))
+
+    def test_metrics_endpoint_is_mounted_with_process(self):
+        from nlp.command_router import router
+
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+        client.post("/process", json={"text": "show my products"})
+        response = client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn("# TYPE nlp_stage_seconds histogram", response.text)
+        self.assertIn('stage="intent_matching"', response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
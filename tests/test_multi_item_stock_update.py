@@ -0,0 +1,120 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from unittest.mock import patch
+
+from nlp.mixed_entity_extraction import extract_mixed_edit_stock_items
+from nlp.multilingual_handler import parse_multilingual_command
+from nlp import enhanced_multilingual_parser
+from nlp import command_router
+
+
+def pairs(items):
+    return [(item["name"], item["stock"]) for item in items]
+
+
+class TestExtractStockItems(unittest.TestCase):
+    """Test cases for reading several stock updates from one message."""
+
+    def test_comma_separated_list(self):
+        self.assertEqual(pairs(extract_mixed_edit_stock_items("chawal 20, dal 15, aloo 40")),
+                         [("चावल", 20), ("दाल", 15), ("आलू", 40)])
+
+    def test_multi_line_list_with_header(self):
+        items = extract_mixed_edit_stock_items("stock update\nchawal 20\ndal 15\naloo 40")
+        self.assertEqual(pairs(items), [("चावल", 20), ("दाल", 15), ("आलू", 40)])
+
+    def test_units_and_separators(self):
+        items = extract_mixed_edit_stock_items("maggi 12 packet, Parle-G: 30, tel - 5 litre")
+        self.assertEqual(pairs(items), [("maggi", 12), ("Parle-G", 30), ("तेल", 5)])
+        self.assertEqual(pairs(extract_mixed_edit_stock_items("update stock: rice 10kg; sugar 5 kg")),
+                         [("चावल", 10), ("चीनी", 5)])
+
+    def test_hindi_list(self):
+        self.assertEqual(pairs(extract_mixed_edit_stock_items("चावल 20 किलो और दाल 15")),
+                         [("चावल", 20), ("दाल", 15)])
+        self.assertEqual(pairs(extract_mixed_edit_stock_items("स्टॉक अपडेट करो चावल 20, दाल 15")),
+                         [("चावल", 20), ("दाल", 15)])
+
+    def test_negative_quantity_is_kept(self):
+        self.assertEqual(pairs(extract_mixed_edit_stock_items("dal 0, aloo -3")), [("दाल", 0), ("आलू", -3)])
+
+    def test_single_update_is_not_a_list(self):
+        self.assertEqual(extract_mixed_edit_stock_items("chawal ka stock 20 karo"), [])
+        self.assertEqual(extract_mixed_edit_stock_items(""), [])
+
+    def test_quantity_without_product_is_not_a_list(self):
+        self.assertEqual(extract_mixed_edit_stock_items("chawal 20, 15"), [])
+
+    def test_names_are_standardized_by_whole_words_only(self):
+        self.assertEqual(pairs(extract_mixed_edit_stock_items("ricebag 5, tea 3, rice dal 2, refined flour 4")),
+                         [("ricebag", 5), ("tea", 3), ("rice dal", 2), ("मैदा", 4)])
+
+    def test_prices_orders_and_dates_are_not_stock(self):
+        for message in ["update stock rice 20, price 50", "dal 15 price 30, aloo 40", "Mera order 1234 and order 5678",
+                        "March 12, April 15", "chawal 20, dal ₹90", "चावल 20, दाम 50"]:
+            self.assertEqual(extract_mixed_edit_stock_items(message), [], message)
+
+    def test_items_with_several_numbers_are_not_guessed(self):
+        self.assertEqual(extract_mixed_edit_stock_items("chawal 20 30, dal 15"), [])
+        self.assertEqual(extract_mixed_edit_stock_items("stock: 2kg sugar to 7kg, dal 15"), [])
+
+    def test_parser_returns_items(self):
+        for message in ["stock: chawal 20, dal 15, aloo 40", "chawal 20\ndal 15\naloo 40"]:
+            result = parse_multilingual_command(message)
+            self.assertEqual(result["intent"], "edit_stock")
+            self.assertEqual(pairs(result["entities"]["items"]), [("चावल", 20), ("दाल", 15), ("आलू", 40)])
+
+        # A bare list qualifies when every item is a known product
+        for parse in (parse_multilingual_command, enhanced_multilingual_parser.parse_multilingual_command):
+            result = parse("chawal 20, dal 15, aloo 40")
+            self.assertEqual(result["intent"], "edit_stock")
+            self.assertEqual(pairs(result["entities"]["items"]), [("चावल", 20), ("दाल", 15), ("आलू", 40)])
+
+        # Other unrecognized messages that neither name stock nor list lines are left alone
+        for message in ["chawal 20, widget 15", "Mera order 1234 and order 5678", "March 12, April 15"]:
+            self.assertNotIn("items", parse_multilingual_command(message)["entities"], message)
+            self.assertNotIn("items", enhanced_multilingual_parser.parse_multilingual_command(message)
+                             .get("entities", {}), message)
+        result = enhanced_multilingual_parser.parse_multilingual_command("stock update\nchawal 20\ndal 15")
+        self.assertEqual(pairs(result["entities"]["items"]), [("चावल", 20), ("दाल", 15)])
+
+        # Single updates keep their entities
+        result = parse_multilingual_command("चावल का स्टॉक 100 करो")
+        self.assertEqual(result["entities"], {"name": "चावल", "stock": 100})
+
+
+class TestRouteStockItems(unittest.TestCase):
+    """Test cases for the consolidated reply to a multi-item stock update."""
+
+    def test_one_request_and_one_reply(self):
+        response = {"updated": [{"id": 1, "name": "चावल", "stock": 20}, {"id": 2, "name": "दाल", "stock": 15}],
+                    "not_found": ["आलू"]}
+        parsed = {"intent": "edit_stock", "language": "en",
+                  "entities": {"items": [{"name": "चावल", "stock": 20, "confidence": 0.9},
+                                         {"name": "दाल", "stock": 15, "confidence": 1.0},
+                                         {"name": "आलू", "stock": 40, "confidence": 0.9}]}}
+        with patch.object(command_router, "make_api_request", return_value=response) as request:
+            reply = command_router.route_command(parsed, user_id="919999999999")
+
+        request.assert_called_once()
+        self.assertEqual(request.call_args.args[:2], ("/seller/products/update-stock/batch", "POST"))
+        self.assertEqual(request.call_args.kwargs["data"],
+                         {"items": [{"name": "चावल", "stock": 20}, {"name": "दाल", "stock": 15},
+                                    {"name": "आलू", "stock": 40}]})
+        self.assertEqual(reply, "Stock updated:\n- चावल: 20 units\n- दाल: 15 units\nNot found: आलू")
+
+    def test_error_reply_in_hindi(self):
+        parsed = {"intent": "edit_stock", "language": "hi",
+                  "entities": {"items": [{"name": "दाल", "stock": 0}, {"name": "आलू", "stock": -3}]}}
+        with patch.object(command_router, "make_api_request",
+                          return_value={"error": "Quantity cannot be negative for: आलू."}):
+            reply = command_router.route_command(parsed)
+
+        self.assertEqual(reply, "स्टॉक अपडेट करने में विफल। त्रुटि: Quantity cannot be negative for: आलू.")
+
+
+if __name__ == "__main__":
+    unittest.main()
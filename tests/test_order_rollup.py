@@ -0,0 +1,162 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from unittest.mock import patch
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.base import Base, Order, Product, OrderDailyRollup
+from utils.order_rollup import (
+    ist_day, ist_day_bounds, refresh_order_rollup, backfill_order_rollup, get_high_water_mark, get_product_totals,
+    get_orders_version
+)
+
+
+class TestOrderRollup(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                                    poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.db.add_all([
+            Product(seller_id=1, name="Rice", price=50.0, stock=10),
+            Product(seller_id=2, name="Rice", price=55.0, stock=10),
+            # 20:00 UTC on June 1st is already June 2nd in IST
+            Order(product="Rice", buyer="Ramesh", quantity=2, date=datetime(2025, 6, 1, 20, 0)),
+            Order(product="Rice", buyer="Sita", quantity=1, date=datetime(2025, 6, 1, 10, 0)),
+            Order(product="Unknown", buyer="Sita", quantity=1, date=datetime(2025, 6, 1, 10, 0)),
+        ])
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def rollup_rows(self):
+        rows = self.db.execute(select(OrderDailyRollup).order_by(OrderDailyRollup.seller_id, OrderDailyRollup.day))
+        return [(r.seller_id, r.product, r.day, r.order_count, r.units, r.revenue) for r in rows.scalars()]
+
+    def test_ist_day_boundaries(self):
+        self.assertEqual(ist_day(datetime(2025, 6, 1, 18, 29)), date(2025, 6, 1))
+        self.assertEqual(ist_day(datetime(2025, 6, 1, 18, 30)), date(2025, 6, 2))
+        start, end = ist_day_bounds(date(2025, 6, 2), date(2025, 6, 2))
+        self.assertEqual(ist_day(start), date(2025, 6, 2))
+        self.assertEqual(ist_day(end), date(2025, 6, 2))
+
+    def test_refresh_groups_by_seller_product_and_ist_day(self):
+        self.assertEqual(refresh_order_rollup(self.db, batch_size=2), 3)
+        self.assertEqual(self.rollup_rows(), [
+            (1, "Rice", date(2025, 6, 1), 1, 1, 50.0),
+            (1, "Rice", date(2025, 6, 2), 1, 2, 100.0),
+            (2, "Rice", date(2025, 6, 1), 1, 1, 55.0),
+            (2, "Rice", date(2025, 6, 2), 1, 2, 110.0),
+        ])
+        self.assertEqual(get_high_water_mark(self.db), 3)
+
+    def test_refresh_is_incremental(self):
+        refresh_order_rollup(self.db)
+        self.db.add(Order(product="Rice", buyer="Ali", quantity=5, date=datetime(2025, 6, 1, 11, 0)))
+        self.db.commit()
+
+        self.assertEqual(refresh_order_rollup(self.db), 1)
+        self.assertEqual(refresh_order_rollup(self.db), 0)
+        self.assertEqual(self.rollup_rows()[0], (1, "Rice", date(2025, 6, 1), 2, 6, 300.0))
+
+    def test_orders_committed_out_of_order_are_not_skipped(self):
+        refresh_order_rollup(self.db)
+        # Order 5 is visible while order 4, which took its id first, has not committed yet
+        self.db.add(Order(id=5, product="Rice", buyer="Ali", quantity=5))
+        self.db.commit()
+        self.assertEqual(refresh_order_rollup(self.db, settle_seconds=60), 0)
+        self.assertEqual(get_high_water_mark(self.db), 3)
+
+        self.db.add(Order(id=4, product="Rice", buyer="Gita", quantity=7))
+        self.db.commit()
+        self.assertEqual(refresh_order_rollup(self.db, settle_seconds=0), 2)
+        self.assertEqual(get_high_water_mark(self.db), 5)
+        today = ist_day(datetime.utcnow())
+        self.assertEqual(get_product_totals(self.db, 1, today, today)["Rice"]["units"], 12)
+
+    def test_job_commit_during_a_read_is_not_counted_twice(self):
+        real_high_water_mark = get_high_water_mark
+
+        def job_commits_right_after(db):
+            high_water_mark = real_high_water_mark(db)
+            refresh_order_rollup(db)
+            return high_water_mark
+
+        with patch("utils.order_rollup.get_high_water_mark", job_commits_right_after):
+            totals = get_product_totals(self.db, 1, date(2025, 6, 1), date(2025, 6, 2))
+        self.assertEqual(totals, {"Rice": {"orders": 2, "units": 3, "revenue": 150.0}})
+
+    def test_backfill_rebuilds_without_double_counting(self):
+        refresh_order_rollup(self.db)
+        before = self.rollup_rows()
+        self.assertEqual(backfill_order_rollup(self.db), 3)
+        self.assertEqual(self.rollup_rows(), before)
+
+    def test_totals_include_orders_past_the_high_water_mark(self):
+        refresh_order_rollup(self.db)
+        self.db.add(Order(product="Rice", buyer="Ali", quantity=5, date=datetime(2025, 6, 1, 11, 0)))
+        self.db.commit()
+
+        totals = get_product_totals(self.db, 1, date(2025, 6, 1), date(2025, 6, 1))
+        self.assertEqual(totals, {"Rice": {"orders": 2, "units": 6, "revenue": 300.0}})
+
+    def test_totals_price_units_at_the_current_price(self):
+        refresh_order_rollup(self.db)
+        self.db.execute(update(Product).where(Product.seller_id == 1).values(price=60.0))
+        self.db.commit()
+
+        totals = get_product_totals(self.db, 1, date(2025, 6, 1), date(2025, 6, 2))
+        self.assertEqual(totals, {"Rice": {"orders": 2, "units": 3, "revenue": 180.0}})
+        # Products the seller no longer lists drop out, as they do from the report rows
+        self.db.execute(update(Product).where(Product.seller_id == 1).values(name="Basmati Rice"))
+        self.db.commit()
+        self.assertEqual(get_product_totals(self.db, 1, date(2025, 6, 1), date(2025, 6, 2)), {})
+
+    def test_orders_past_the_high_water_mark_are_read_by_date(self):
+        statements = []
+        event.listen(self.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        totals = get_product_totals(self.db, 1, date(2025, 6, 2), date(2025, 6, 2))
+        self.assertEqual(totals, {"Rice": {"orders": 1, "units": 2, "revenue": 100.0}})
+        tail = [statement for statement in statements if "FROM orders" in statement]
+        self.assertEqual(len(tail), 1)
+        self.assertIn("orders.date >=", tail[0])
+        self.assertIn("orders.date <=", tail[0])
+
+    def test_orders_version_reads_only_the_unfolded_tail(self):
+        june = (date(2025, 6, 1), date(2025, 6, 2))
+        before = get_orders_version(self.db, 1, *june)
+        refresh_order_rollup(self.db)
+        folded = get_orders_version(self.db, 1, *june)
+        self.assertNotEqual(folded, before)
+
+        statements = []
+        event.listen(self.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        self.assertEqual(get_orders_version(self.db, 1, *june), folded)
+        self.assertEqual(len(statements), 1)
+        self.assertIn("orders.id >", statements[0])
+
+        self.db.add(Order(product="Rice", buyer="Ali", quantity=5, date=datetime(2025, 6, 1, 11, 0)))
+        self.db.commit()
+        placed = get_orders_version(self.db, 1, *june)
+        self.assertNotEqual(placed, folded)
+        # Orders for products the seller does not list leave it alone
+        self.db.add(Order(product="Unknown", buyer="Ali", quantity=5, date=datetime(2025, 6, 1, 11, 0)))
+        self.db.commit()
+        self.assertEqual(get_orders_version(self.db, 1, *june), placed)
+        refresh_order_rollup(self.db)
+        self.assertNotIn(get_orders_version(self.db, 1, *june), (placed, folded))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+import sys
+import os
+import zlib
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+
+from utils.metrics import pdf_render_seconds, pdf_render_queue_wait_seconds, pdf_render_rejected_total
+from utils.pdf_render_pool import PDFRenderPool
+
+
+class TestPDFRenderPool(unittest.TestCase):
+    def test_renders_in_a_worker_process_and_records_timings(self):
+        pool = PDFRenderPool(max_workers=1, max_pending=2)
+        try:
+            result = asyncio.run(pool.render("test-render", zlib.compress, b"report" * 100))
+        finally:
+            pool.shutdown()
+        self.assertEqual(zlib.decompress(result), b"report" * 100)
+        self.assertEqual(pool.pending, 0)
+        self.assertEqual(pdf_render_seconds.snapshot(report="test-render")["count"], 1)
+        self.assertEqual(pdf_render_queue_wait_seconds.snapshot(report="test-render")["count"], 1)
+
+    def test_full_queue_is_rejected_with_503(self):
+        pool = PDFRenderPool(max_workers=1, max_pending=0)
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(pool.render("test-overload", zlib.compress, b"x"))
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertIn("Retry-After", ctx.exception.headers)
+        self.assertEqual(pdf_render_rejected_total.value(report="test-overload"), 1)
+        # Nothing was submitted, so no worker processes were started
+        self.assertIsNone(pool._executor)
+
+    def test_render_when_free_waits_for_a_slot(self):
+        pool = PDFRenderPool(max_workers=1, max_pending=1)
+
+        async def render_many():
+            return await asyncio.gather(*[
+                pool.render_when_free("test-wait", zlib.compress, bytes([i]) * 10) for i in range(3)
+            ])
+
+        try:
+            results = asyncio.run(render_many())
+        finally:
+            pool.shutdown()
+        self.assertEqual([zlib.decompress(result) for result in results], [bytes([i]) * 10 for i in range(3)])
+        self.assertEqual(pool.pending, 0)
+
+    def test_cancelled_waiter_passes_its_slot_on(self):
+        pool = PDFRenderPool(max_workers=1, max_pending=1)
+
+        async def render_with_a_cancelled_waiter():
+            first = asyncio.ensure_future(pool.render_when_free("test-cancel", zlib.compress, b"a"))
+            await asyncio.sleep(0)
+            cancelled = asyncio.ensure_future(pool.render_when_free("test-cancel", zlib.compress, b"b"))
+            last = asyncio.ensure_future(pool.render_when_free("test-cancel", zlib.compress, b"c"))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            return await asyncio.wait_for(asyncio.gather(first, last), timeout=30)
+
+        try:
+            results = asyncio.run(render_with_a_cancelled_waiter())
+        finally:
+            pool.shutdown()
+        self.assertEqual([zlib.decompress(result) for result in results], [b"a", b"c"])
+        self.assertEqual(pool.pending, 0)
+        self.assertEqual(len(pool._waiters), 0)
+
+    def test_broken_pool_is_shut_down_and_replaced(self):
+        pool = PDFRenderPool(max_workers=1, max_pending=1)
+        broken = MagicMock()
+        broken.submit.side_effect = BrokenProcessPool("worker died")
+        pool._executor = broken
+        try:
+            result = asyncio.run(pool.render("test-broken", zlib.compress, b"x"))
+        finally:
+            pool.shutdown()
+        self.assertEqual(zlib.decompress(result), b"x")
+        broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
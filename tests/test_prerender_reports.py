@@ -0,0 +1,142 @@
+import asyncio
+import tempfile
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import prerender_reports
+from backend.prerender_reports import load_active_sellers
+from models.base import Base, OrderDailyRollup, Product, Seller
+from routes import inventory, reports
+from routes.inventory import load_inventory_report_key
+from routes.reports import get_report_days, load_sales_report_key
+from utils.pdf_render_pool import PDFRenderPool
+from utils.report_cache import ReportCache
+
+
+class TestPrerenderReports(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Render workers stream rows through their own sessions on DATABASE_URL,
+        # so the data lives in a file they can open too
+        cls.db_dir = tempfile.TemporaryDirectory()
+        cls.database_url = f"sqlite:///{os.path.join(cls.db_dir.name, 'reports.db')}"
+        cls.environ = patch.dict(os.environ, {"DATABASE_URL": cls.database_url})
+        cls.environ.start()
+        cls.pool = PDFRenderPool(max_workers=2, max_pending=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        cls.environ.stop()
+        cls.db_dir.cleanup()
+
+    def setUp(self):
+        self.engine = create_engine(self.database_url, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+        self.yesterday = get_report_days("yesterday")[0]
+        self.db.add_all([
+            Seller(id=1, name="Active Shop"),
+            Seller(id=2, name="Quiet Shop"),
+            Seller(id=3, name="Empty Shop"),
+            Product(id=1, seller_id=1, name="Rice", price=50.0, stock=10),
+            Product(id=2, seller_id=2, name="Soap", price=30.0, stock=10),
+            OrderDailyRollup(seller_id=1, product="Rice", day=self.yesterday, order_count=2, units=3, revenue=150.0),
+        ])
+        self.db.commit()
+
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache = ReportCache(cache_dir.name)
+        for target, name, value in [(inventory, "report_cache", self.cache), (reports, "report_cache", self.cache),
+                                    (prerender_reports, "report_cache", self.cache),
+                                    (inventory, "pdf_render_pool", self.pool), (reports, "pdf_render_pool", self.pool)]:
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=self.engine)
+        self.engine.dispose()
+
+    def prerender(self, **kwargs):
+        return asyncio.run(prerender_reports.prerender_reports(self.Session, concurrency=2, **kwargs))
+
+    def test_active_sellers(self):
+        self.assertEqual([seller["id"] for seller in load_active_sellers(self.db, active_days=7)], [1])
+        # Without the activity filter every seller with products qualifies
+        sellers = load_active_sellers(self.db, active_days=0)
+        self.assertEqual([seller["id"] for seller in sellers], [1, 2])
+        self.assertEqual(sellers[0], {"id": 1, "sub": 1, "name": "Active Shop", "role": "seller"})
+
+    def test_reports_land_on_the_keys_live_requests_use(self):
+        totals = self.prerender(active_days=7)
+        self.assertEqual((totals["sellers"], totals["rendered"], totals["skipped"], totals["failed"]), (1, 2, 0, 0))
+
+        async def live_keys():
+            _, sales_key = await load_sales_report_key(self.db, 1, self.yesterday, self.yesterday)
+            return sales_key, await load_inventory_report_key(self.db, 1)
+        for key in asyncio.run(live_keys()):
+            self.assertTrue(self.cache.contains(key))
+
+    def test_unchanged_sellers_are_skipped(self):
+        self.prerender(active_days=0)
+        totals = self.prerender(active_days=0)
+        self.assertEqual((totals["rendered"], totals["skipped"]), (0, 4))
+
+        self.db.get(Product, 1).stock = 4
+        self.db.commit()
+        totals = self.prerender(active_days=0, ranges=["yesterday", "week"])
+        # Seller 1's product write versions both their reports and the week reports are new;
+        # seller 2's yesterday and inventory reports are unchanged
+        self.assertEqual((totals["rendered"], totals["skipped"]), (4, 2))
+
+    def test_sales_key_follows_product_edits(self):
+        self.db.add(Product(id=3, seller_id=1, name="Dal", price=90.0, stock=10))
+        self.db.commit()
+
+        def sales_key():
+            return asyncio.run(load_sales_report_key(self.db, 1, self.yesterday, self.yesterday))[1]
+
+        key = sales_key()
+        self.assertEqual(sales_key(), key)
+        # Price edits that cancel out and renames leave counts and price sums unchanged
+        self.db.get(Product, 1).price = 60.0
+        self.db.get(Product, 3).price = 80.0
+        self.db.commit()
+        self.assertNotEqual(sales_key(), key)
+        key = sales_key()
+        self.db.get(Product, 3).name = "Moong Dal"
+        self.db.commit()
+        self.assertNotEqual(sales_key(), key)
+        key = sales_key()
+        # Another seller's writes do not touch this seller's key
+        self.db.get(Product, 2).price = 35.0
+        self.db.commit()
+        self.assertEqual(sales_key(), key)
+
+    def test_failing_seller_does_not_stop_the_run(self):
+        original = prerender_reports.prerender_seller_reports
+
+        async def flaky(db, seller_info, ranges):
+            if seller_info["id"] == 1:
+                raise RuntimeError("render crashed")
+            return await original(db, seller_info, ranges)
+
+        with patch.object(prerender_reports, "prerender_seller_reports", flaky):
+            totals = self.prerender(active_days=0)
+        self.assertEqual((totals["sellers"], totals["rendered"], totals["failed"]), (2, 2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
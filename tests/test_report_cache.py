@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.report_cache import ReportCache, etag_for, etag_matches
+
+
+class TestReportCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ReportCache(self.tmp.name, max_bytes=250)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_depends_on_every_part(self):
+        key = ReportCache.key("sales", 1, "2025-06-01", "2025-06-02", "v1")
+        self.assertEqual(key, ReportCache.key("sales", 1, "2025-06-01", "2025-06-02", "v1"))
+        self.assertNotEqual(key, ReportCache.key("sales", 1, "2025-06-01", "2025-06-02", "v2"))
+        self.assertNotEqual(key, ReportCache.key("sales", 2, "2025-06-01", "2025-06-02", "v1"))
+        self.assertNotEqual(key, ReportCache.key("inventory", 1, "2025-06-01", "2025-06-02", "v1"))
+
+    def test_write_then_read(self):
+        mtime = self.cache.write("a", b"%PDF-a")
+        self.assertEqual(self.cache.read("a"), (b"%PDF-a", mtime))
+        self.assertIsNone(self.cache.read("missing"))
+
+    def test_least_recently_read_is_evicted(self):
+        self.cache.write("a", b"a" * 100)
+        self.cache.write("b", b"b" * 100)
+        # Make "a" older than "b", then read it so "b" becomes least recently used
+        os.utime(os.path.join(self.tmp.name, "a.pdf"), (1000, 1000))
+        os.utime(os.path.join(self.tmp.name, "b.pdf"), (2000, 2000))
+        self.cache.read("a")
+        self.cache.write("c", b"c" * 100)
+        self.assertIsNone(self.cache.read("b"))
+        self.assertIsNotNone(self.cache.read("a"))
+        self.assertIsNotNone(self.cache.read("c"))
+
+    def test_contains_marks_recently_used(self):
+        self.cache.write("a", b"a" * 100)
+        os.utime(os.path.join(self.tmp.name, "a.pdf"), (1000, 1000))
+        self.assertTrue(self.cache.contains("a"))
+        self.assertFalse(self.cache.contains("missing"))
+        self.assertGreater(os.stat(os.path.join(self.tmp.name, "a.pdf")).st_atime, 1000)
+
+    def test_etag_matching(self):
+        etag = etag_for("abc")
+        self.assertTrue(etag_matches(etag, '"abc"'))
+        self.assertTrue(etag_matches(etag, 'W/"abc", "other"'))
+        self.assertTrue(etag_matches(etag, "*"))
+        self.assertFalse(etag_matches(etag, '"other"'))
+        self.assertFalse(etag_matches(etag, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import asyncio
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.base import Base, ReportJob
+from utils.report_jobs import (
+    ReportJobWorkers, enqueue_report_job, claim_report_job, requeue_stale_jobs
+)
+
+
+class TestReportJobs(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                                    poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def enqueue(self, **params):
+        return enqueue_report_job(self.db, 1, "sales", params, {"id": 1, "email": "s@example.com"},
+                                  deliver_to="919876543210")
+
+    def test_jobs_are_claimed_once_in_order(self):
+        first, second = self.enqueue(n=1), self.enqueue(n=2)
+        other = self.Session()
+        try:
+            claimed = [claim_report_job(self.db), claim_report_job(other), claim_report_job(self.db)]
+        finally:
+            other.close()
+        self.assertEqual([job["id"] if job else None for job in claimed], [first.id, second.id, None])
+        self.assertEqual(claimed[0]["params"], {"n": 1})
+        self.assertEqual(claimed[0]["seller_info"]["email"], "s@example.com")
+        self.assertEqual((claimed[0]["status"], claimed[0]["attempts"]), ("running", 1))
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        job = self.enqueue()
+        calls, failures = [], []
+
+        async def handler(claimed, db):
+            calls.append(claimed["attempts"])
+            raise RuntimeError("render crashed")
+
+        async def on_failed(claimed, error):
+            failures.append(error)
+
+        workers = ReportJobWorkers(handler, self.Session, max_attempts=2, on_failed=on_failed)
+        self.assertTrue(asyncio.run(workers.run_once()))
+        self.db.expire_all()
+        self.assertEqual(self.db.get(ReportJob, job.id).status, "queued")
+        self.assertTrue(asyncio.run(workers.run_once()))
+        self.assertFalse(asyncio.run(workers.run_once()))
+
+        self.db.expire_all()
+        stored = self.db.get(ReportJob, job.id)
+        self.assertEqual((stored.status, stored.attempts), ("failed", 2))
+        self.assertEqual(stored.error, "RuntimeError: render crashed")
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(failures, ["RuntimeError: render crashed"])
+
+    def test_successful_job_stores_handler_result(self):
+        job = self.enqueue()
+
+        async def handler(claimed, db):
+            return {"cache_key": "abc", "delivery_status": "sent"}
+
+        asyncio.run(ReportJobWorkers(handler, self.Session).run_once())
+        self.db.expire_all()
+        stored = self.db.get(ReportJob, job.id)
+        self.assertEqual((stored.status, stored.cache_key, stored.delivery_status), ("done", "abc", "sent"))
+        self.assertIsNotNone(stored.finished_at)
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = self.enqueue()
+        claim_report_job(self.db)
+        self.assertEqual(requeue_stale_jobs(self.db, stale_seconds=60), 0)
+        stored = self.db.get(ReportJob, job.id)
+        stored.started_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+        self.db.commit()
+        self.assertEqual(requeue_stale_jobs(self.db, stale_seconds=60), 1)
+        self.assertEqual(claim_report_job(self.db)["id"], job.id)
+
+    def test_started_workers_pick_up_notified_jobs(self):
+        done = []
+
+        async def handler(claimed, db):
+            done.append(claimed["id"])
+
+        async def run():
+            workers = ReportJobWorkers(handler, self.Session, workers=2, poll_interval=30)
+            workers.start()
+            job = self.enqueue()
+            workers.notify()
+            for _ in range(100):
+                if done:
+                    break
+                await asyncio.sleep(0.01)
+            await workers.stop()
+            return job.id
+
+        job_id = asyncio.run(run())
+        self.assertEqual(done, [job_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
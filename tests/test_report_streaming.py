@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.platypus import LongTable
+
+from routes.inventory import generate_inventory_pdf_report
+from utils.report_streaming import StreamedFlowables, table_chunks, iter_csv
+from utils.report_template import TableLayout
+
+
+class TestReportStreaming(unittest.TestCase):
+    def test_table_chunks_repeat_header_and_style_each_chunk(self):
+        rows = ([i, "Low" if i % 3 == 0 else "Ok"] for i in range(5))
+        layout = TableLayout(["ID", "Status"], [50, 50])
+        styled = []
+        style = lambda chunk: styled.append([row[0] for row in chunk]) or []
+        tables = list(table_chunks(layout, rows, style, chunk_rows=2))
+        self.assertEqual(len(tables), 3)
+        self.assertTrue(all(isinstance(table, LongTable) for table in tables))
+        self.assertEqual([table._cellvalues[0] for table in tables], [["ID", "Status"]] * 3)
+        self.assertEqual([len(table._cellvalues) for table in tables], [3, 3, 2])
+        self.assertEqual(styled, [[0, 1], [2, 3], [4]])
+
+    def test_streamed_flowables_pull_lazily(self):
+        pulled = []
+
+        def source():
+            for i in range(10):
+                pulled.append(i)
+                yield i
+
+        flowables = StreamedFlowables(source(), lookahead=2)
+        self.assertEqual(pulled, [0, 1])
+        del flowables[0]
+        self.assertEqual(len(flowables), 2)
+        self.assertEqual(pulled, [0, 1, 2])
+
+    def test_csv_is_yielded_in_chunks(self):
+        chunks = list(iter_csv(["a", "b"], ([i, "x" * 10] for i in range(100)), chunk_bytes=100))
+        self.assertGreater(len(chunks), 1)
+        lines = b"".join(chunks).decode().splitlines()
+        self.assertEqual(lines[0], "a,b")
+        self.assertEqual(len(lines), 101)
+
+    def test_large_inventory_renders_to_a_file(self):
+        products = ({"id": i, "name": f"Product {i}", "stock": i % 12} for i in range(3000))
+        summary = {"total_products": 3000, "total_stock": 0, "low_stock": 0, "out_of_stock": 0}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "inventory.pdf")
+            self.assertIsNone(generate_inventory_pdf_report(products, {"email": "s@example.com"},
+                                                            output=path, summary=summary))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(4), b"%PDF")
+
+
+if __name__ == "__main__":
+    unittest.main()
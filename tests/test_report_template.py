@@ -0,0 +1,38 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib import colors
+
+from utils.report_template import TableLayout, column_value_styles, BODY_ROW_HEIGHT, HEADER_ROW_HEIGHT
+
+STATUS_STYLES = {"Low": [("TEXTCOLOR", colors.orange)], "Out": [("TEXTCOLOR", colors.red)]}
+
+
+class TestReportTemplate(unittest.TestCase):
+    def test_runs_of_equal_values_share_one_command(self):
+        rows = [[1, "Low"], [2, "Low"], [3, "Ok"], [4, "Out"], [5, "Out"], [6, "Out"], [7, "Low"]]
+        self.assertEqual(column_value_styles(rows, 1, STATUS_STYLES), [
+            ("TEXTCOLOR", (1, 1), (1, 2), colors.orange),
+            ("TEXTCOLOR", (1, 4), (1, 6), colors.red),
+            ("TEXTCOLOR", (1, 7), (1, 7), colors.orange),
+        ])
+
+    def test_no_rows_give_no_commands(self):
+        self.assertEqual(column_value_styles([], 1, STATUS_STYLES), [])
+        self.assertEqual(column_value_styles([[1, "Ok"]], 1, STATUS_STYLES), [])
+
+    def test_single_line_rows_get_fixed_heights(self):
+        layout = TableLayout(["ID", "Name"], [50, 100])
+        table = layout.table([[1, "Rice"], [2, "Dal\nLoose"]])
+        # The multi-line row is left for ReportLab to measure
+        self.assertEqual(table._argH, [HEADER_ROW_HEIGHT, BODY_ROW_HEIGHT, None])
+        table.wrap(150, 1000)
+        self.assertGreater(table._rowHeights[2], BODY_ROW_HEIGHT)
+
+
+if __name__ == "__main__":
+    unittest.main()
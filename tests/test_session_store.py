@@ -0,0 +1,123 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from utils.session_store import MemorySessionStore, SQLiteSessionStore, Session, SessionStore
+from nlp.message_router import MessageRouter
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class SlidingExpiryTests:
+    """Expiry behaviour every session store backend must share"""
+
+    def make_store(self, clock, ttl_seconds):
+        raise NotImplementedError
+
+    def test_sessions_expire_when_idle(self):
+        clock = FakeClock()
+        store = self.make_store(clock, ttl_seconds=60)
+        store.set("user-1", {"state": "awaiting pincode"})
+        clock.now += 59
+        self.assertIsNotNone(store.get("user-1"))
+        # The read above restarted the idle timer
+        clock.now += 59
+        self.assertIsNotNone(store.get("user-1"))
+        clock.now += 61
+        self.assertIsNone(store.get("user-1"))
+
+
+class TestMemorySessionStore(SlidingExpiryTests, unittest.TestCase):
+    def make_store(self, clock, ttl_seconds):
+        return MemorySessionStore(ttl_seconds=ttl_seconds, time_func=clock)
+
+    def test_set_get_update_delete(self):
+        store = MemorySessionStore()
+        store.set("user-1", {"language": "hi"})
+        store.update("user-1", last_intent="get_inventory")
+        self.assertEqual(store.get("user-1"), {"language": "hi", "last_intent": "get_inventory"})
+        store.delete("user-1")
+        self.assertIsNone(store.get("user-1"))
+        self.assertEqual(store.get("user-1", {}), {})
+
+    def test_returned_data_is_a_copy(self):
+        store = MemorySessionStore()
+        store.set("user-1", {"language": "en"})
+        store.get("user-1")["language"] = "hi"
+        self.assertEqual(store.get("user-1")["language"], "en")
+
+    def test_least_recently_used_session_is_evicted(self):
+        store = MemorySessionStore(max_entries=2)
+        store.set("user-1", {})
+        store.set("user-2", {})
+        store.get("user-1")
+        store.set("user-3", {})
+        self.assertEqual(len(store), 2)
+        self.assertIn("user-1", store)
+        self.assertNotIn("user-2", store)
+
+    def test_interface_cannot_be_instantiated(self):
+        with self.assertRaises(TypeError):
+            SessionStore()
+
+    def test_session_record_has_no_instance_dict(self):
+        self.assertFalse(hasattr(Session({}, 0.0), "__dict__"))
+
+
+class TestSQLiteSessionStore(SlidingExpiryTests, unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "sessions.db")
+
+    def make_store(self, clock, ttl_seconds):
+        return SQLiteSessionStore(self.db_path, ttl_seconds=ttl_seconds, time_func=clock)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_state_is_shared_between_workers(self):
+        worker_a = SQLiteSessionStore(self.db_path, namespace="registration")
+        worker_b = SQLiteSessionStore(self.db_path, namespace="registration")
+        worker_a.set("919876543210", {"state": "awaiting service", "shop_name": "Sharma Kirana"})
+        self.assertEqual(worker_b.get("919876543210")["shop_name"], "Sharma Kirana")
+
+    def test_namespaces_are_isolated(self):
+        registration = SQLiteSessionStore(self.db_path, namespace="registration")
+        nlp = SQLiteSessionStore(self.db_path, namespace="nlp")
+        registration.set("user-1", {"state": "awaiting hours"})
+        self.assertIsNone(nlp.get("user-1"))
+
+    def test_expired_sessions_are_swept(self):
+        clock = FakeClock()
+        store = SQLiteSessionStore(self.db_path, ttl_seconds=60, sweep_interval_seconds=30, time_func=clock)
+        store.set("user-1", {})
+        clock.now += 61
+        self.assertIsNone(store.get("user-1"))
+        self.assertEqual(store.sweep_expired(), 0)  # get() already triggered the periodic sweep
+        self.assertEqual(len(store), 0)
+
+
+class TestMessageRouterSessions(unittest.TestCase):
+    @patch("nlp.message_router.route_command", return_value="ok")
+    @patch("nlp.message_router.parse_multilingual_command",
+           return_value={"intent": "get_inventory", "entities": {}, "language": "hi"})
+    def test_language_is_kept_in_session_store(self, mock_parse, mock_route):
+        store = MemorySessionStore()
+        router = MessageRouter(session_store=store)
+        router.process_message("919876543210", "मेरे प्रोडक्ट दिखाओ")
+        self.assertEqual(router.get_user_language("whatsapp-919876543210"), "hi")
+        self.assertEqual(store.get("whatsapp-919876543210")["last_intent"], "get_inventory")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from models.base import Base, Product
+from utils.stock_mutations import (
+    set_stock, set_stock_by_name, adjust_stock, reserve_stock, set_stocks_by_name
+)
+
+
+class TestStockMutations(unittest.TestCase):
+    def setUp(self):
+        # A file database, so every thread below gets its own connection
+        self.tmpdir = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmpdir, 'stock.db')}",
+                                    connect_args={"check_same_thread": False, "timeout": 30})
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        with self.Session() as db:
+            db.add_all([
+                Product(id=1, seller_id=1, name="Rice", price=50.0, stock=20),
+                Product(id=2, seller_id=1, name="Dal", price=90.0, stock=5),
+                Product(id=3, seller_id=2, name="Rice", price=45.0, stock=7),
+                Product(id=4, seller_id=1, name="Rice", price=55.0, stock=1),
+            ])
+            db.commit()
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def stock(self, product_id):
+        with self.Session() as db:
+            return db.execute(select(Product.stock).where(Product.id == product_id)).scalar_one()
+
+    def run_concurrently(self, work, times, workers=16):
+        def attempt(_):
+            with self.Session() as db:
+                result = work(db)
+                db.commit()
+                return result
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(attempt, range(times)))
+
+    def test_set_stock_returns_the_changed_row(self):
+        with self.Session() as db:
+            self.assertEqual(set_stock(db, 1, 1, 12), {"id": 1, "name": "Rice", "stock": 12, "version": 2})
+            # Other sellers' products are not touched
+            self.assertIsNone(set_stock(db, 2, 1, 99))
+            db.commit()
+        self.assertEqual(self.stock(1), 12)
+
+    def test_expected_version(self):
+        with self.Session() as db:
+            self.assertEqual(set_stock(db, 1, 2, 8, expected_version=1)["version"], 2)
+            self.assertIsNone(set_stock(db, 1, 2, 3, expected_version=1))
+            self.assertEqual(adjust_stock(db, 1, 2, 1, expected_version=2)["stock"], 9)
+            db.commit()
+        self.assertEqual(self.stock(2), 9)
+
+    def test_set_stock_by_name_updates_the_oldest_match(self):
+        with self.Session() as db:
+            self.assertEqual(set_stock_by_name(db, 1, "Rice", 30)["id"], 1)
+            self.assertIsNone(set_stock_by_name(db, 1, "Sugar", 30))
+            db.commit()
+        self.assertEqual((self.stock(1), self.stock(3), self.stock(4)), (30, 7, 1))
+
+    def test_decrement_never_goes_below_zero(self):
+        with self.Session() as db:
+            self.assertEqual(adjust_stock(db, 1, 2, -5)["stock"], 0)
+            self.assertIsNone(adjust_stock(db, 1, 2, -1))
+            self.assertIsNone(reserve_stock(db, 1, 2, 1))
+            with self.assertRaises(ValueError):
+                reserve_stock(db, 1, 2, 0)
+            db.commit()
+        self.assertEqual(self.stock(2), 0)
+
+    def test_set_stocks_by_name(self):
+        with self.Session() as db:
+            updated, not_found = set_stocks_by_name(db, 1, {"Dal": 6, "Rice": 11, "Sugar": 2})
+            db.commit()
+        self.assertEqual([(product["id"], product["stock"]) for product in updated], [(2, 6), (1, 11)])
+        self.assertEqual(not_found, ["Sugar"])
+        self.assertEqual((self.stock(1), self.stock(4)), (11, 1))
+
+    def test_concurrent_increments_are_not_lost(self):
+        self.run_concurrently(lambda db: adjust_stock(db, 1, 1, 1), 200)
+        self.assertEqual(self.stock(1), 220)
+
+    def test_concurrent_reservations_never_oversell(self):
+        results = self.run_concurrently(lambda db: reserve_stock(db, 1, 1, 3), 50)
+
+        succeeded = [result for result in results if result is not None]
+        # 20 units cover six reservations of 3; the rest find too little stock
+        self.assertEqual(len(succeeded), 6)
+        self.assertEqual(sorted(result["stock"] for result in succeeded), [2, 5, 8, 11, 14, 17])
+        self.assertEqual(self.stock(1), 2)
+
+    def test_concurrent_versioned_writes_have_one_winner(self):
+        results = self.run_concurrently(lambda db: set_stock(db, 1, 2, 40, expected_version=1), 20)
+        self.assertEqual(len([result for result in results if result is not None]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
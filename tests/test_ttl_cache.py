@@ -0,0 +1,41 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ttl_cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = TTLCache(ttl_seconds=10, max_entries=2, time_func=lambda: self.now)
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set("a", 1)
+        self.now = 9.9
+        self.assertEqual(self.cache.get("a"), 1)
+        self.now = 10.0
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_reads_do_not_extend_lifetime(self):
+        self.cache.set("a", 1)
+        self.now = 5
+        self.cache.get("a")
+        self.now = 11
+        self.assertEqual(self.cache.get("a", "missing"), "missing")
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.whatsapp_sender import WhatsAppSender, TokenBucket
+
+
+class StubGraphAPI:
+    """Local stand-in for the Graph API messages endpoint
+
+    Responds with the queued status codes first, then 200 for every request.
+    """
+
+    def __init__(self, statuses=None, delay=0.0):
+        self.statuses = list(statuses or [])
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub.lock:
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    stub.requests.append({
+                        "path": self.path,
+                        "authorization": self.headers.get("Authorization"),
+                        "json": json.loads(body or b"{}")
+                    })
+                    status = stub.statuses.pop(0) if stub.statuses else 200
+                time.sleep(stub.delay)
+                with stub.lock:
+                    stub.in_flight -= 1
+                payload = json.dumps({"messages": [{"id": "wamid.stub"}]}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestWhatsAppSender(unittest.TestCase):
+    def make_sender(self, stub, **kwargs):
+        options = {"access_token": "test-token", "phone_number_id": "12345", "base_url": stub.url,
+                   "backoff_base": 0.01}
+        options.update(kwargs)
+        return WhatsAppSender(**options)
+
+    def test_send_text_posts_cloud_api_payload(self):
+        async def run(sender):
+            try:
+                return await sender.send_text("919876543210", "Stock updated")
+            finally:
+                await sender.aclose()
+
+        with StubGraphAPI() as stub:
+            self.assertTrue(asyncio.run(run(self.make_sender(stub))))
+
+        request = stub.requests[0]
+        self.assertEqual(request["path"], "/12345/messages")
+        self.assertEqual(request["authorization"], "Bearer test-token")
+        self.assertEqual(request["json"], {
+            "messaging_product": "whatsapp",
+            "to": "919876543210",
+            "text": {"body": "Stock updated"}
+        })
+
+    def test_retries_on_throttling_and_server_errors(self):
+        async def run(sender):
+            try:
+                return await sender.send_text("919876543210", "hello")
+            finally:
+                await sender.aclose()
+
+        with StubGraphAPI(statuses=[429, 503]) as stub:
+            sender = self.make_sender(stub)
+            self.assertTrue(asyncio.run(run(sender)))
+
+        self.assertEqual(len(stub.requests), 3)
+        metrics = sender.get_metrics()
+        self.assertEqual(metrics["sent"], 1)
+        self.assertEqual(metrics["retries"], 2)
+        self.assertEqual(metrics["throttled"], 1)
+
+    def test_gives_up_after_max_retries(self):
+        async def run(sender):
+            try:
+                return await sender.send_text("919876543210", "hello")
+            finally:
+                await sender.aclose()
+
+        with StubGraphAPI(statuses=[500] * 5) as stub:
+            sender = self.make_sender(stub, max_retries=2)
+            self.assertFalse(asyncio.run(run(sender)))
+
+        self.assertEqual(len(stub.requests), 3)
+        self.assertEqual(sender.get_metrics()["failed"], 1)
+
+    def test_batch_respects_concurrency_limit(self):
+        async def run(sender):
+            try:
+                return await sender.send_batch([(f"91987654{i:04d}", "Diwali offer") for i in range(12)])
+            finally:
+                await sender.aclose()
+
+        with StubGraphAPI(delay=0.05) as stub:
+            results = asyncio.run(run(self.make_sender(stub, max_concurrency=3)))
+
+        self.assertEqual(results, [True] * 12)
+        self.assertEqual(len(stub.requests), 12)
+        self.assertLessEqual(stub.max_in_flight, 3)
+
+    def test_batch_respects_rate_limit(self):
+        async def run(sender):
+            try:
+                return await sender.send_batch([(f"91987654{i:04d}", "hi") for i in range(6)])
+            finally:
+                await sender.aclose()
+
+        with StubGraphAPI() as stub:
+            started = time.monotonic()
+            asyncio.run(run(self.make_sender(stub, rate_per_second=20, burst=1)))
+            elapsed = time.monotonic() - started
+
+        # One token up front, then five more at 20/s
+        self.assertGreaterEqual(elapsed, 0.2)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_is_free_then_rate_applies(self):
+        async def run():
+            bucket = TokenBucket(rate_per_second=100, capacity=3)
+            waits = [await bucket.acquire() for _ in range(4)]
+            return waits
+
+        waits = asyncio.run(run())
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertGreater(waits[3], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
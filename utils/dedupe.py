@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Default location for the shared dedupe database
+data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# WhatsApp retries a webhook for up to a day, so remember message ids at least that long
+DEFAULT_TTL_SECONDS = int(os.getenv("WHATSAPP_DEDUPE_TTL_SECONDS", 24 * 60 * 60))
+DEFAULT_MAX_ENTRIES = int(os.getenv("WHATSAPP_DEDUPE_MAX_ENTRIES", 100000))
+
+
+class MemoryDedupeStore:
+    """Time-bounded in-memory store of processed inbound message ids
+
+    Entries are kept in insertion order, so expired ids are always at the front
+    and can be evicted in amortised O(1) on every call.
+    """
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 time_func: Callable[[], float] = time.monotonic):
+        """Initialize the store
+
+        Args:
+            ttl_seconds: How long a message id is remembered
+            max_entries: Upper bound on remembered ids; the oldest are dropped first
+            time_func: Clock used for expiry (injectable for tests)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._time = time_func
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check_and_mark(self, message_id: str) -> bool:
+        """Record a message id and report whether it was already processed
+
+        Args:
+            message_id: The inbound WhatsApp message id
+
+        Returns:
+            True if the id was seen within the TTL (a duplicate), False otherwise
+        """
+        now = self._time()
+        with self._lock:
+            self._evict(now)
+            if message_id in self._seen:
+                return True
+            self._seen[message_id] = now
+            if len(self._seen) > self.max_entries:
+                self._seen.popitem(last=False)
+            return False
+
+    def forget(self, message_id: str) -> None:
+        """Remove a message id so that a redelivery is processed again
+
+        Args:
+            message_id: The inbound WhatsApp message id
+        """
+        with self._lock:
+            self._seen.pop(message_id, None)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.ttl_seconds
+        while self._seen:
+            oldest_id, seen_at = next(iter(self._seen.items()))
+            if seen_at > cutoff:
+                break
+            self._seen.popitem(last=False)
+
+
+class SQLiteDedupeStore:
+    """SQLite-backed store of processed message ids shared by all workers on a host
+
+    The primary key lookup and the insert happen in a single statement, so two
+    workers receiving the same redelivery cannot both claim it.
+    """
+
+    # Expired rows are purged once every this many claims
+    PURGE_EVERY = 1000
+
+    def __init__(self, db_path: str, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 time_func: Callable[[], float] = time.time):
+        """Initialize the store
+
+        Args:
+            db_path: Path to the SQLite database file
+            ttl_seconds: How long a message id is remembered
+            time_func: Wall clock used for expiry (shared across processes)
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._time = time_func
+        self._local = threading.local()
+        self._claims = 0
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed_messages ("
+            "message_id TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_processed_messages_seen_at ON processed_messages (seen_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def check_and_mark(self, message_id: str) -> bool:
+        """Record a message id and report whether it was already processed
+
+        Args:
+            message_id: The inbound WhatsApp message id
+
+        Returns:
+            True if the id was seen within the TTL (a duplicate), False otherwise
+        """
+        now = self._time()
+        cutoff = now - self.ttl_seconds
+        conn = self._connection()
+        # Inserts a new id, or re-claims an expired one; leaves live ids untouched
+        cursor = conn.execute(
+            "INSERT INTO processed_messages (message_id, seen_at) VALUES (?, ?) "
+            "ON CONFLICT(message_id) DO UPDATE SET seen_at = excluded.seen_at "
+            "WHERE processed_messages.seen_at <= ?",
+            (message_id, now, cutoff)
+        )
+        claimed = cursor.rowcount == 1
+
+        self._claims += 1
+        if self._claims % self.PURGE_EVERY == 0:
+            self.purge_expired()
+
+        return not claimed
+
+    def forget(self, message_id: str) -> None:
+        """Remove a message id so that a redelivery is processed again
+
+        Args:
+            message_id: The inbound WhatsApp message id
+        """
+        self._connection().execute("DELETE FROM processed_messages WHERE message_id = ?", (message_id,))
+
+    def purge_expired(self) -> int:
+        """Delete expired message ids
+
+        Returns:
+            The number of rows removed
+        """
+        cutoff = self._time() - self.ttl_seconds
+        cursor = self._connection().execute("DELETE FROM processed_messages WHERE seen_at <= ?", (cutoff,))
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM processed_messages").fetchone()[0]
+
+
+def create_dedupe_store(backend: Optional[str] = None, db_path: Optional[str] = None):
+    """Create the dedupe store configured for this deployment
+
+    Args:
+        backend: 'memory' or 'sqlite'; defaults to the WHATSAPP_DEDUPE_BACKEND env variable
+        db_path: SQLite file path; defaults to the WHATSAPP_DEDUPE_DB env variable
+
+    Returns:
+        A dedupe store instance
+    """
+    backend = backend or os.getenv("WHATSAPP_DEDUPE_BACKEND", "memory")
+    if backend == "sqlite":
+        db_path = db_path or os.getenv("WHATSAPP_DEDUPE_DB", os.path.join(data_dir, "whatsapp_dedupe.db"))
+        return SQLiteDedupeStore(db_path)
+    return MemoryDedupeStore()
+
+
+# Create a default dedupe store instance
+message_dedupe = create_dedupe_store()
+
+# Export the dedupe store classes and instance
+__all__ = ["MemoryDedupeStore", "SQLiteDedupeStore", "create_dedupe_store", "message_dedupe"]
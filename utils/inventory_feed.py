@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, event, func, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.base import FeedCheckpoint, InventoryChange, Product
+
+logger = logging.getLogger("inventory_feed")
+
+# Changes handed to a consumer per batch
+INVENTORY_FEED_BATCH_SIZE = int(os.getenv("INVENTORY_FEED_BATCH_SIZE", 500))
+# Seconds an idle consumer waits before looking for new changes again
+INVENTORY_FEED_POLL_INTERVAL = float(os.getenv("INVENTORY_FEED_POLL_INTERVAL", 2.0))
+# Changes younger than this are left for a later poll, so a sequence number taken by a
+# transaction that commits after a newer one is not skipped. Age counts from the write, not
+# the commit: a change whose transaction stays open longer than this after writing can be
+# passed by the checkpoint and is never delivered, so keep it above the longest product
+# write transaction (writers here commit right after their statement)
+INVENTORY_FEED_SETTLE_SECONDS = float(os.getenv("INVENTORY_FEED_SETTLE_SECONDS", 2.0))
+
+# What a consumer handler gets: a batch of changes as plain data, in sequence order
+FeedHandler = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+CHANGE_FIELDS = ("seq", "seller_id", "product_id", "operation", "name", "stock", "previous_stock", "created_at")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def record_changes(db: Session, changes: Iterable[Dict[str, Any]]) -> None:
+    """Append product changes to the feed in the caller's transaction
+
+    Writers that change products with Core statements (bulk inserts,
+    UPDATE ... RETURNING) call this with the rows they changed; ORM flushes
+    of Product objects are recorded automatically. Each change is a dict of
+    seller_id, product_id, operation ('insert', 'update' or 'delete'), name,
+    stock and, when known, previous_stock.
+    """
+    rows = list(changes)
+    if rows:
+        db.connection().execute(InventoryChange.__table__.insert(), rows)
+
+
+def _product_change(product: Product, operation: str) -> Dict[str, Any]:
+    history = inspect(product).attrs.stock.history
+    previous_stock = history.deleted[0] if history.deleted else None
+    if operation == "update" and not history.has_changes():
+        previous_stock = product.stock
+    return {"seller_id": product.seller_id, "product_id": product.id, "operation": operation,
+            "name": product.name, "stock": product.stock, "previous_stock": previous_stock}
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_products(session: Session, flush_context) -> None:
+    """Record every Product the ORM just inserted, changed or deleted, in the same transaction"""
+    changes = [_product_change(obj, "insert") for obj in session.new if isinstance(obj, Product)]
+    changes += [_product_change(obj, "update") for obj in session.dirty
+                if isinstance(obj, Product) and session.is_modified(obj)]
+    changes += [_product_change(obj, "delete") for obj in session.deleted if isinstance(obj, Product)]
+    record_changes(session, changes)
+
+
+def latest_change_seq(db: Session, seller_id=None) -> int:
+    """Get the sequence number of the newest change, overall or of one seller; 0 if there is none"""
+    statement = select(func.max(InventoryChange.seq))
+    if seller_id is not None:
+        statement = statement.where(InventoryChange.seller_id == seller_id)
+    return db.execute(statement).scalar() or 0
+
+
+def read_changes(db: Session, after_seq: int, limit: int = INVENTORY_FEED_BATCH_SIZE,
+                 settle_seconds: float = INVENTORY_FEED_SETTLE_SECONDS) -> List[Dict[str, Any]]:
+    """Read up to `limit` changes after a sequence number, oldest first
+
+    Changes written less than settle_seconds ago are left out. created_at is
+    set when the change is written, not committed, so a transaction held open
+    past settle_seconds can commit a change behind a consumer's checkpoint.
+    """
+    statement = select(*(getattr(InventoryChange, field) for field in CHANGE_FIELDS)).where(
+        InventoryChange.seq > after_seq
+    )
+    if settle_seconds > 0:
+        statement = statement.where(InventoryChange.created_at <= _utcnow() - timedelta(seconds=settle_seconds))
+    rows = db.execute(statement.order_by(InventoryChange.seq).limit(limit))
+    return [dict(row._mapping) for row in rows]
+
+
+def get_checkpoint(db: Session, name: str, from_latest: bool = False) -> int:
+    """Get a consumer's checkpoint, creating it on first use
+
+    A new consumer starts from the beginning of the feed, or with
+    from_latest from the newest change so it only sees changes made from now on.
+    """
+    last_seq = db.execute(select(FeedCheckpoint.last_seq).where(FeedCheckpoint.name == name)).scalar()
+    if last_seq is not None:
+        return last_seq
+    last_seq = latest_change_seq(db) if from_latest else 0
+    db.add(FeedCheckpoint(name=name, last_seq=last_seq))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another process created it first
+        db.rollback()
+        return db.execute(select(FeedCheckpoint.last_seq).where(FeedCheckpoint.name == name)).scalar_one()
+    return last_seq
+
+
+def advance_checkpoint(db: Session, name: str, from_seq: int, to_seq: int) -> bool:
+    """Move a consumer's checkpoint forward if it is still where this consumer read from
+
+    Returns:
+        False if another process running the same consumer moved it first
+    """
+    result = db.execute(
+        update(FeedCheckpoint)
+        .where(FeedCheckpoint.name == name, FeedCheckpoint.last_seq == from_seq)
+        .values(last_seq=to_seq)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def prune_inventory_changes(db: Session, upto_seq: Optional[int] = None) -> int:
+    """Delete changes every consumer has processed
+
+    Each seller's newest change is kept, since it versions their inventory
+    report. Without upto_seq, changes up to the lowest consumer checkpoint go.
+
+    Returns:
+        The number of changes deleted
+    """
+    if upto_seq is None:
+        upto_seq = db.execute(select(func.min(FeedCheckpoint.last_seq))).scalar() or 0
+    newest_per_seller = select(func.max(InventoryChange.seq)).group_by(InventoryChange.seller_id)
+    result = db.execute(
+        delete(InventoryChange)
+        .where(InventoryChange.seq <= upto_seq, InventoryChange.seq.not_in(newest_per_seller))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+class InventoryFeedConsumer:
+    """Asyncio task that tails the inventory change feed and hands batches to a handler
+
+    The checkpoint moves past a batch only after the handler returns, so
+    every change is handled at least once: a handler that raises sees the
+    same batch again on the next poll, and a crash between handling and
+    checkpointing repeats that batch. Handlers should be idempotent.
+    """
+
+    def __init__(self, name: str, handler: FeedHandler, session_factory: Callable[[], Session],
+                 batch_size: int = INVENTORY_FEED_BATCH_SIZE, poll_interval: float = INVENTORY_FEED_POLL_INTERVAL,
+                 settle_seconds: float = INVENTORY_FEED_SETTLE_SECONDS, from_latest: bool = False):
+        """Initialize the consumer; nothing runs until start()
+
+        Args:
+            name: Checkpoint name; consumers sharing a name share their progress
+            handler: Async function called with each batch of changes
+            session_factory: Creates the sessions used to read changes and checkpoints
+            batch_size: Changes per handler call
+            poll_interval: Seconds an idle consumer waits before polling again
+            settle_seconds: Age a change must reach before it is read
+            from_latest: Start a new checkpoint at the newest change instead of the first
+        """
+        self.name = name
+        self.handler = handler
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.from_latest = from_latest
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _read(self):
+        with self.session_factory() as db:
+            after_seq = get_checkpoint(db, self.name, self.from_latest)
+            return after_seq, read_changes(db, after_seq, self.batch_size, self.settle_seconds)
+
+    def _advance(self, from_seq: int, to_seq: int) -> bool:
+        with self.session_factory() as db:
+            return advance_checkpoint(db, self.name, from_seq, to_seq)
+
+    async def run_once(self) -> int:
+        """Handle one batch of new changes and checkpoint it
+
+        Returns:
+            The number of changes handled, 0 if the consumer is caught up
+        """
+        after_seq, changes = await run_in_threadpool(self._read)
+        if not changes:
+            return 0
+        await self.handler(changes)
+        if not await run_in_threadpool(self._advance, after_seq, changes[-1]["seq"]):
+            logger.warning(f"Feed consumer {self.name}: checkpoint moved by another process; batch re-read")
+        return len(changes)
+
+    async def drain(self) -> int:
+        """Handle batches until the consumer is caught up; returns the number of changes handled"""
+        handled = 0
+        while True:
+            count = await self.run_once()
+            if not count:
+                return handled
+            handled += count
+
+    def notify(self) -> None:
+        """Wake the consumer, e.g. right after this process wrote changes"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                handled = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # e.g. the handler or the database failed; retry the batch after a pause
+                logger.error(f"Feed consumer {self.name} error: {e}")
+                handled = 0
+            if not handled:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    def start(self) -> None:
+        """Start tailing the feed in the running event loop"""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._work())
+
+    async def stop(self) -> None:
+        """Stop the consumer; a batch being handled is read again on the next start"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+# Export the change feed helpers and consumer
+__all__ = [
+    "InventoryFeedConsumer", "record_changes", "latest_change_seq", "read_changes", "get_checkpoint",
+    "advance_checkpoint", "prune_inventory_changes", "INVENTORY_FEED_BATCH_SIZE", "INVENTORY_FEED_SETTLE_SECONDS"
+]
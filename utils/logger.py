@@ -1,8 +1,12 @@
 import os
-import logging
 import json
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional
 
 # Create logs directory if it doesn't exist
 logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
@@ -17,34 +21,168 @@ logging.basicConfig(
     ]
 )
 
+# Rotation and sampling settings for the WhatsApp routing log
+LOG_MAX_BYTES = int(os.getenv("WHATSAPP_LOG_MAX_BYTES", 50 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv("WHATSAPP_LOG_BACKUP_COUNT", 10))
+LOG_QUEUE_SIZE = int(os.getenv("WHATSAPP_LOG_QUEUE_SIZE", 10000))
+
+# route_command repeats the parsed_result fields, so only a sample of it is kept
+DEFAULT_SAMPLE_RATES = {"route_command": 0.1}
+
+
+def parse_sample_rates(value: Optional[str]) -> Dict[str, float]:
+    """Parse sample rates from a string such as 'route_command=0.1,api_call=0.5'
+
+    Args:
+        value: Comma separated event_type=rate pairs
+
+    Returns:
+        A mapping of event type to the fraction of events kept
+    """
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    for pair in (value or "").split(","):
+        if "=" in pair:
+            event_type, rate = pair.split("=", 1)
+            rates[event_type.strip()] = float(rate)
+    return rates
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats one JSON object per line; runs on the listener thread"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_data = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        if isinstance(record.msg, dict):
+            log_data.update(record.msg)
+        else:
+            log_data["message"] = record.getMessage()
+        if record.exc_info:
+            log_data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(log_data, ensure_ascii=False, default=str)
+
+
+class DailySizeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Writes to <prefix>_<YYYY-MM-DD>.log, switching files at midnight and
+    rotating within a day once the file exceeds max_bytes"""
+
+    def __init__(self, directory: str, prefix: str, max_bytes: int = LOG_MAX_BYTES,
+                 backup_count: int = LOG_BACKUP_COUNT, encoding: str = "utf-8"):
+        self.directory = directory
+        self.prefix = prefix
+        self.current_date = datetime.now().strftime("%Y-%m-%d")
+        super().__init__(self._path_for(self.current_date), maxBytes=max_bytes,
+                         backupCount=backup_count, encoding=encoding, delay=True)
+
+    def _path_for(self, date: str) -> str:
+        return os.path.join(self.directory, f"{self.prefix}_{date}.log")
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        record_date = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d")
+        if record_date != self.current_date:
+            # A new day starts a new file rather than a numbered backup
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.current_date = record_date
+            self.baseFilename = os.path.abspath(self._path_for(record_date))
+        return super().shouldRollover(record)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a fraction of high-volume event types; runs on the caller's
+    thread so dropped events are never queued"""
+
+    def __init__(self, sample_rates: Dict[str, float], random_func=random.random):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self._random = random_func
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not isinstance(record.msg, dict):
+            return True
+        rate = self.sample_rates.get(record.msg.get("event_type"), 1.0)
+        return rate >= 1.0 or self._random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener and drops records
+    instead of blocking when the queue is full"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Log payloads are fresh dicts, so the record can be handed over as is
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def start_queue_logging(handlers: Iterable[logging.Handler], queue_size: int = LOG_QUEUE_SIZE) -> NonBlockingQueueHandler:
+    """Move the given handlers onto a background writer thread
+
+    Args:
+        handlers: Handlers that do the actual (blocking) I/O
+        queue_size: Maximum number of pending records
+
+    Returns:
+        A queue handler to attach to loggers in place of the given handlers
+    """
+    log_queue = queue.Queue(maxsize=queue_size)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.listener = listener
+    return queue_handler
+
+
 class WhatsAppLogger:
-    """Logger class for WhatsApp message routing"""
+    """Logger class for WhatsApp message routing
     
-    def __init__(self, log_file: Optional[str] = None):
+    Events are handed to a background thread through a queue and written as
+    JSON lines, so no serialization or file I/O happens on the request path.
+    """
+    
+    def __init__(self, log_file: Optional[str] = None, sample_rates: Optional[Dict[str, float]] = None):
         """Initialize the logger
         
         Args:
-            log_file: Optional path to the log file. If not provided, a default path will be used.
+            log_file: Optional path to the log file. If not provided, a dated file
+                in the logs directory is used and switched every day.
+            sample_rates: Optional fraction of events kept per event type.
+                Defaults to the WHATSAPP_LOG_SAMPLE_RATES env variable.
         """
         if log_file is None:
-            # Create a log file with the current date
-            current_date = datetime.now().strftime("%Y-%m-%d")
-            log_file = os.path.join(logs_dir, f"whatsapp_routing_{current_date}.log")
-        
-        # Create a logger
-        self.logger = logging.getLogger("whatsapp_routing")
-        self.logger.setLevel(logging.INFO)
-        
-        # Create a file handler
-        file_handler = logging.FileHandler(log_file)
+            file_handler = DailySizeRotatingFileHandler(logs_dir, "whatsapp_routing")
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True
+            )
         file_handler.setLevel(logging.INFO)
+        file_handler.setFormatter(JsonLinesFormatter())
         
-        # Create a formatter
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
+        # Create a logger of our own that only talks to the queue (no root handlers)
+        self.logger = logging.Logger("whatsapp_routing", logging.INFO)
         
-        # Add the file handler to the logger
-        self.logger.addHandler(file_handler)
+        self.queue_handler = start_queue_logging([file_handler])
+        self.queue_handler.addFilter(SamplingFilter(
+            sample_rates if sample_rates is not None else parse_sample_rates(os.getenv("WHATSAPP_LOG_SAMPLE_RATES"))
+        ))
+        self.logger.addHandler(self.queue_handler)
+    
+    def flush(self) -> None:
+        """Block until every queued event has been written"""
+        listener = self.queue_handler.listener
+        listener.stop()
+        listener.start()
     
     def log_incoming_message(self, phone_number: str, message_text: str, user_id: Optional[str] = None) -> None:
         """Log an incoming WhatsApp message
@@ -58,10 +196,9 @@ class WhatsAppLogger:
             "event_type": "incoming_message",
             "phone_number": phone_number,
             "message_text": message_text,
-            "user_id": user_id or f"whatsapp-{phone_number}",
-            "timestamp": datetime.now().isoformat()
+            "user_id": user_id or f"whatsapp-{phone_number}"
         }
-        self.logger.info(f"INCOMING: {json.dumps(log_data, ensure_ascii=False)}")
+        self.logger.info(log_data)
     
     def log_parsed_result(self, parsed_result: Dict[str, Any], user_id: Optional[str] = None) -> None:
         """Log a parsed command result
@@ -73,12 +210,11 @@ class WhatsAppLogger:
         log_data = {
             "event_type": "parsed_result",
             "intent": parsed_result.get("intent"),
-            "entities": parsed_result.get("entities"),
+            "entities": dict(parsed_result.get("entities") or {}),
             "language": parsed_result.get("language"),
-            "user_id": user_id,
-            "timestamp": datetime.now().isoformat()
+            "user_id": user_id
         }
-        self.logger.info(f"PARSED: {json.dumps(log_data, ensure_ascii=False)}")
+        self.logger.info(log_data)
     
     def log_route_command(self, parsed_result: Dict[str, Any], user_id: Optional[str] = None) -> None:
         """Log a route_command call
@@ -90,12 +226,11 @@ class WhatsAppLogger:
         log_data = {
             "event_type": "route_command",
             "intent": parsed_result.get("intent"),
-            "entities": parsed_result.get("entities"),
+            "entities": dict(parsed_result.get("entities") or {}),
             "language": parsed_result.get("language"),
-            "user_id": user_id,
-            "timestamp": datetime.now().isoformat()
+            "user_id": user_id
         }
-        self.logger.info(f"ROUTE: {json.dumps(log_data, ensure_ascii=False)}")
+        self.logger.info(log_data)
     
     def log_outgoing_message(self, phone_number: str, message_text: str, user_id: Optional[str] = None) -> None:
         """Log an outgoing WhatsApp message
@@ -109,10 +244,23 @@ class WhatsAppLogger:
             "event_type": "outgoing_message",
             "phone_number": phone_number,
             "message_text": message_text,
-            "user_id": user_id or f"whatsapp-{phone_number}",
-            "timestamp": datetime.now().isoformat()
+            "user_id": user_id or f"whatsapp-{phone_number}"
+        }
+        self.logger.info(log_data)
+    
+    def log_duplicate_message(self, message_id: str, phone_number: Optional[str] = None) -> None:
+        """Log a redelivered WhatsApp message that was skipped
+        
+        Args:
+            message_id: The inbound message id
+            phone_number: Optional phone number of the sender
+        """
+        log_data = {
+            "event_type": "duplicate_message",
+            "message_id": message_id,
+            "phone_number": phone_number
         }
-        self.logger.info(f"OUTGOING: {json.dumps(log_data, ensure_ascii=False)}")
+        self.logger.info(log_data)
     
     def log_error(self, error_message: str, error_type: str, user_id: Optional[str] = None) -> None:
         """Log an error
@@ -126,10 +274,9 @@ class WhatsAppLogger:
             "event_type": "error",
             "error_message": error_message,
             "error_type": error_type,
-            "user_id": user_id,
-            "timestamp": datetime.now().isoformat()
+            "user_id": user_id
         }
-        self.logger.error(f"ERROR: {json.dumps(log_data, ensure_ascii=False)}")
+        self.logger.error(log_data)
     
     def log_api_call(self, api_endpoint: str, request_data: Dict[str, Any], response_data: Dict[str, Any], user_id: Optional[str] = None) -> None:
         """Log an API call
@@ -143,15 +290,17 @@ class WhatsAppLogger:
         log_data = {
             "event_type": "api_call",
             "api_endpoint": api_endpoint,
-            "request_data": request_data,
-            "response_data": response_data,
-            "user_id": user_id,
-            "timestamp": datetime.now().isoformat()
+            "request_data": dict(request_data or {}),
+            "response_data": dict(response_data or {}),
+            "user_id": user_id
         }
-        self.logger.info(f"API: {json.dumps(log_data, ensure_ascii=False)}")
+        self.logger.info(log_data)
 
 # Create a default logger instance
 whatsapp_logger = WhatsAppLogger()
 
-# Export the logger instance
-__all__ = ["WhatsAppLogger", "whatsapp_logger"]
\ No newline at end of file
+# Export the logger classes and instance
+__all__ = [
+    "WhatsAppLogger", "whatsapp_logger", "JsonLinesFormatter", "DailySizeRotatingFileHandler",
+    "SamplingFilter", "start_queue_logging"
+]
\ No newline at end of file
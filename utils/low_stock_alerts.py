@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from models.base import Inventory, LowStockAlert, Product, Seller
+from utils.inventory_feed import InventoryFeedConsumer
+from utils.whatsapp_sender import WhatsAppSender, whatsapp_sender
+
+logger = logging.getLogger("low_stock_alerts")
+
+# Products with less stock than this are low, unless the inventory table sets their own threshold
+LOW_STOCK_ALERT_THRESHOLD = int(os.getenv("LOW_STOCK_ALERT_THRESHOLD", 5))
+# Seconds a seller's first alert waits for others, so they all go out in one digest
+LOW_STOCK_ALERT_WINDOW_SECONDS = float(os.getenv("LOW_STOCK_ALERT_WINDOW_SECONDS", 900))
+# Language of the digest, 'en' or 'hi'
+LOW_STOCK_ALERT_LANGUAGE = os.getenv("LOW_STOCK_ALERT_LANGUAGE", "en")
+
+# Feed checkpoint of the alert engine
+CONSUMER_NAME = "low_stock_alerts"
+
+DIGEST_MESSAGES = {
+    "en": {
+        "header": "⚠️ Low stock: {count} products need restocking",
+        "item": "- {name}: {stock} left"
+    },
+    "hi": {
+        "header": "⚠️ कम स्टॉक: {count} प्रोडक्ट्स को फिर से भरने की ज़रूरत है",
+        "item": "- {name}: {stock} बचे"
+    }
+}
+
+
+def format_digest(items: List[Dict[str, Any]], language: str = LOW_STOCK_ALERT_LANGUAGE) -> str:
+    """Format one seller's low stock products as a single message"""
+    messages = DIGEST_MESSAGES.get(language, DIGEST_MESSAGES["en"])
+    lines = [messages["header"].format(count=len(items))]
+    lines += [messages["item"].format(**item) for item in sorted(items, key=lambda item: item["stock"])]
+    return "\n".join(lines)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class LowStockAlertEngine:
+    """Turn inventory change feed entries into one WhatsApp low stock digest per seller
+
+    A product alerts when a write takes its stock from at or above its
+    threshold to below it. Crossings are queued per seller in the
+    low_stock_alerts table; the seller's digest is sent window_seconds after
+    their first queued crossing, listing every product still low at that
+    point. A product restocked before then drops out, and one crossing the
+    threshold several times alerts once.
+
+    The queue is written before the feed checkpoint moves past the changes,
+    so a crash inside the window does not lose alerts, and a digest that
+    fails to send stays queued for another window. Changes handled again
+    after a crash can repeat an alert that was already sent.
+
+    Writes that set stock absolutely do not record the stock before them,
+    so for those the engine compares with the last stock it saw in the feed;
+    after a restart such a write below the threshold alerts again.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], sender: WhatsAppSender = whatsapp_sender,
+                 window_seconds: float = LOW_STOCK_ALERT_WINDOW_SECONDS,
+                 default_threshold: int = LOW_STOCK_ALERT_THRESHOLD, language: str = LOW_STOCK_ALERT_LANGUAGE,
+                 time_func: Callable[[], datetime] = _utcnow, **consumer_options):
+        """Initialize the engine; nothing runs until start()
+
+        Args:
+            session_factory: Creates the sessions used to read the feed, thresholds and sellers
+            sender: Rate-limited WhatsApp sender the digests go through
+            window_seconds: Seconds a seller's first alert waits for others
+            default_threshold: Threshold of products without one in the inventory table
+            language: Language of the digests
+            time_func: UTC clock used for the windows (injectable for tests)
+            **consumer_options: Passed to the InventoryFeedConsumer, e.g. poll_interval
+        """
+        self.session_factory = session_factory
+        self.sender = sender
+        self.window_seconds = window_seconds
+        self.default_threshold = default_threshold
+        self.language = language
+        self._time = time_func
+        # Last known low state per product, from the feed
+        self._low: Dict[int, bool] = {}
+        consumer_options.setdefault("from_latest", True)
+        self.consumer = InventoryFeedConsumer(CONSUMER_NAME, self.handle_changes, session_factory,
+                                              **consumer_options)
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _load_thresholds(self, product_ids: List[int]) -> Dict[int, int]:
+        """Load the inventory table's thresholds of products, by product id
+
+        The inventory table has no foreign key; its item_id is taken to be the
+        products.id the threshold applies to, and rows naming no product are
+        ignored.
+        """
+        with self.session_factory() as db:
+            return dict(db.execute(
+                select(Product.id, Inventory.threshold)
+                .join(Inventory, Inventory.item_id == Product.id)
+                .where(Product.id.in_(product_ids))
+            ).all())
+
+    def _load_numbers(self, db: Session, seller_ids: List[int]) -> Dict[int, str]:
+        return dict(db.execute(
+            select(Seller.id, Seller.whatsapp_number)
+            .where(Seller.id.in_(seller_ids), Seller.whatsapp_number.is_not(None))
+        ).all())
+
+    def _queue(self, actions: List[tuple], now: datetime) -> None:
+        """Apply ('drop' | 'cross' | 'refresh', change, threshold) actions to the queue in one transaction"""
+        with self.session_factory() as db:
+            for action, change, threshold in actions:
+                key = (change["seller_id"], change["product_id"])
+                alert = db.get(LowStockAlert, key)
+                if action == "drop":
+                    if alert is not None:
+                        db.delete(alert)
+                elif alert is not None:
+                    alert.name, alert.stock, alert.threshold = change["name"], change["stock"], threshold
+                elif action == "cross":
+                    db.add(LowStockAlert(seller_id=key[0], product_id=key[1], name=change["name"],
+                                         stock=change["stock"], threshold=threshold, queued_at=now))
+                db.flush()
+            db.commit()
+
+    async def handle_changes(self, changes: List[Dict[str, Any]]) -> None:
+        """Feed handler: queue threshold crossings and drop restocked products from the queue"""
+        product_ids = list({change["product_id"] for change in changes})
+        thresholds = await run_in_threadpool(self._load_thresholds, product_ids)
+        actions = []
+        for change in changes:
+            product_id = change["product_id"]
+            if change["operation"] == "delete" or change["stock"] is None:
+                self._low.pop(product_id, None)
+                actions.append(("drop", change, None))
+                continue
+
+            threshold = thresholds.get(product_id, self.default_threshold)
+            if change["previous_stock"] is not None:
+                was_low = change["previous_stock"] < threshold
+            else:
+                was_low = self._low.get(product_id, False)
+            is_low = change["stock"] < threshold
+            self._low[product_id] = is_low
+
+            if not is_low:
+                actions.append(("drop", change, threshold))
+            else:
+                # A product already queued keeps its latest stock in the digest
+                actions.append(("refresh" if was_low else "cross", change, threshold))
+        await run_in_threadpool(self._queue, actions, self._time())
+
+    def _load_due(self, now: datetime, force: bool):
+        """Load the queued alerts of sellers whose window has passed, and their numbers"""
+        with self.session_factory() as db:
+            due_sellers = select(LowStockAlert.seller_id).group_by(LowStockAlert.seller_id)
+            if not force:
+                due_sellers = due_sellers.having(
+                    func.min(LowStockAlert.queued_at) <= now - timedelta(seconds=self.window_seconds)
+                )
+            alerts = db.execute(
+                select(LowStockAlert).where(LowStockAlert.seller_id.in_(due_sellers))
+                .order_by(LowStockAlert.seller_id, LowStockAlert.product_id)
+            ).scalars().all()
+            due: Dict[int, List[Dict[str, Any]]] = {}
+            for alert in alerts:
+                due.setdefault(alert.seller_id, []).append({
+                    "product_id": alert.product_id, "name": alert.name, "stock": alert.stock,
+                    "threshold": alert.threshold, "queued_at": alert.queued_at
+                })
+            numbers = self._load_numbers(db, list(due)) if due else {}
+            return due, numbers
+
+    def _finish(self, done: Dict[int, List[Dict[str, Any]]], failed: List[int], now: datetime) -> None:
+        """Dequeue the alerts that were sent (or had nowhere to go) and restart the window of failed sellers"""
+        with self.session_factory() as db:
+            for seller_id, items in done.items():
+                # Alerts queued again since they were loaded stay for the next digest
+                db.execute(delete(LowStockAlert).where(
+                    LowStockAlert.seller_id == seller_id,
+                    or_(*(and_(LowStockAlert.product_id == item["product_id"],
+                               LowStockAlert.queued_at == item["queued_at"]) for item in items))
+                ).execution_options(synchronize_session=False))
+            if failed:
+                db.execute(update(LowStockAlert).where(LowStockAlert.seller_id.in_(failed))
+                           .values(queued_at=now).execution_options(synchronize_session=False))
+            db.commit()
+
+    async def flush_due(self, force: bool = False) -> int:
+        """Send the digests whose window has passed (every queued one with force)
+
+        Returns:
+            The number of digests sent
+        """
+        now = self._time()
+        due, numbers = await run_in_threadpool(self._load_due, now, force)
+        if not due:
+            return 0
+
+        skipped = [seller_id for seller_id in due if seller_id not in numbers]
+        if skipped:
+            logger.info(f"Skipped low stock digests for {len(skipped)} sellers without a WhatsApp number")
+        messages = [(seller_id, numbers[seller_id], format_digest(items, self.language))
+                    for seller_id, items in due.items() if seller_id in numbers]
+        results = await self.sender.send_batch([(number, body) for _, number, body in messages]) if messages else []
+
+        failed = []
+        for (seller_id, _, _), sent in zip(messages, results):
+            if not sent:
+                logger.error(f"Low stock digest for seller {seller_id} could not be sent; retrying after the window")
+                failed.append(seller_id)
+        done = {seller_id: items for seller_id, items in due.items() if seller_id not in failed}
+        await run_in_threadpool(self._finish, done, failed, now)
+        return len(messages) - len(failed)
+
+    async def _flush_periodically(self) -> None:
+        interval = max(min(self.window_seconds, self.consumer.poll_interval), 0.1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush_due()
+            except Exception as e:
+                logger.error(f"Low stock digest flush failed: {e}")
+
+    def start(self) -> None:
+        """Start tailing the change feed and sending digests in the running event loop"""
+        if self._flusher is not None:
+            return
+        self.consumer.start()
+        self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        """Stop the engine, sending the digests still queued"""
+        flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            flusher.cancel()
+            await asyncio.gather(flusher, return_exceptions=True)
+        await self.consumer.stop()
+        await self.flush_due(force=True)
+
+
+# Export the alert engine
+__all__ = [
+    "LowStockAlertEngine", "format_digest", "LOW_STOCK_ALERT_THRESHOLD", "LOW_STOCK_ALERT_WINDOW_SECONDS"
+]
@@ -0,0 +1,250 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, Response
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from sub-millisecond regex work up to slow backend calls
+DEFAULT_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by label values"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation
+
+        Args:
+            value: The observed value (seconds for latency histograms)
+            **labels: One value per label name
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, **labels: str) -> Optional[Dict[str, float]]:
+        """Get the count and sum recorded for one label combination
+
+        Returns:
+            A dict with 'count' and 'sum', or None if nothing was recorded
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            return None if series is None else {"count": series[2], "sum": series[1]}
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+        for key, counts, total, count in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by label values"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        return self._values.get(key, 0)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+
+class StageTimer:
+    """Records consecutive stage durations with a single perf_counter call per stage
+
+    Call lap(stage) at the end of each stage; the time since the previous lap
+    (or since the timer was created) is attributed to that stage. Laps with the
+    same stage name are added together.
+    """
+
+    __slots__ = ("_started", "_last", "stages")
+
+    def __init__(self):
+        self._started = self._last = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def total(self) -> float:
+        """Seconds since the timer was created"""
+        return time.perf_counter() - self._started
+
+    def observe(self, histogram: Histogram, **labels: str) -> None:
+        """Record every stage in a histogram that has a 'stage' label
+
+        Args:
+            histogram: Target histogram
+            **labels: Remaining label values, e.g. intent and language
+        """
+        for stage, seconds in self.stages.items():
+            histogram.observe(seconds, stage=stage, **labels)
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Add a callable that returns extra exposition lines at scrape time
+
+        Args:
+            collector: Function returning Prometheus text lines
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+# Create the process-wide registry
+registry = MetricsRegistry()
+
+# NLP pipeline latency, split by stage and labelled by the recognised intent and language
+nlp_stage_seconds = registry.histogram(
+    "nlp_stage_seconds", "Time spent in each stage of the NLP pipeline",
+    ["stage", "intent", "language"]
+)
+nlp_message_seconds = registry.histogram(
+    "nlp_message_seconds", "End-to-end time to process one WhatsApp message",
+    ["intent", "language"]
+)
+
+# Time spent waiting for a pooled database connection, per request
+db_pool_checkout_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time to check a connection out of the database pool"
+)
+db_pool_timeouts_total = registry.counter(
+    "db_pool_timeouts_total", "Requests that gave up waiting for a database connection"
+)
+
+# PDF rendering in the process pool (utils.pdf_render_pool), labelled by report type
+PDF_RENDER_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+pdf_render_seconds = registry.histogram(
+    "pdf_render_seconds", "Time a worker process spent rendering one PDF", ["report"], PDF_RENDER_BUCKETS
+)
+pdf_render_queue_wait_seconds = registry.histogram(
+    "pdf_render_queue_wait_seconds", "Time a PDF render waited for a free worker process", ["report"],
+    PDF_RENDER_BUCKETS
+)
+pdf_render_rejected_total = registry.counter(
+    "pdf_render_rejected_total", "PDF renders refused with 503 because the render queue was full", ["report"]
+)
+
+
+def _whatsapp_sender_lines() -> List[str]:
+    from utils.whatsapp_sender import whatsapp_sender
+    lines = []
+    for key, value in whatsapp_sender.get_metrics().items():
+        name = f"whatsapp_sender_{key}_total"
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value}")
+    return lines
+
+
+registry.register_collector(_whatsapp_sender_lines)
+
+router = APIRouter()
+
+
+@router.get("/metrics", tags=["Monitoring"])
+async def metrics():
+    """Expose all metrics in Prometheus text format"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+
+# Export the metric types, registry and router
+__all__ = [
+    "Histogram", "Counter", "StageTimer", "MetricsRegistry", "registry", "router",
+    "nlp_stage_seconds", "nlp_message_seconds", "db_pool_checkout_wait_seconds",
+    "db_pool_timeouts_total", "pdf_render_seconds", "pdf_render_queue_wait_seconds",
+    "pdf_render_rejected_total", "CONTENT_TYPE"
+]
@@ -0,0 +1,300 @@
+import os
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+import pytz
+from sqlalchemy import select, func, delete
+from sqlalchemy.orm import Session
+
+from models.base import Order, Product, OrderDailyRollup, RollupCheckpoint
+
+logger = logging.getLogger("order_rollup")
+
+IST_TZ = pytz.timezone('Asia/Kolkata')
+
+# Checkpoint row holding the last order id folded into order_daily_rollup
+CHECKPOINT_NAME = "order_daily_rollup"
+
+# Orders folded into the rollup per transaction
+ROLLUP_BATCH_SIZE = int(os.getenv("ROLLUP_BATCH_SIZE", 5000))
+# Orders placed less than this long ago are left for a later run. Order ids are handed out
+# before commit, so an order with a lower id can become visible after a newer one; moving the
+# high-water mark past it would leave it out of the rollup and the readers' tail for good.
+# Like INVENTORY_FEED_SETTLE_SECONDS, this must exceed the longest open order transaction,
+# and orders must be written with their default (insert time) date to be protected by it.
+ROLLUP_SETTLE_SECONDS = float(os.getenv("ROLLUP_SETTLE_SECONDS", 5.0))
+
+# (seller_id, product, day) -> [order_count, units, revenue]
+Totals = Dict[Tuple[int, str, date], list]
+
+
+def ist_day(value: datetime) -> date:
+    """Get the IST calendar day of an order timestamp (naive timestamps are UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=pytz.UTC)
+    return value.astimezone(IST_TZ).date()
+
+
+def ist_day_bounds(start_day: date, end_day: date) -> Tuple[datetime, datetime]:
+    """Get the UTC instants spanning whole IST days, end inclusive"""
+    start = IST_TZ.localize(datetime.combine(start_day, time.min))
+    end = IST_TZ.localize(datetime.combine(end_day + timedelta(days=1), time.min)) - timedelta(microseconds=1)
+    return start.astimezone(pytz.UTC), end.astimezone(pytz.UTC)
+
+
+def priced_orders(after_order_id: int, upto_order_id: Optional[int] = None, seller_id: Optional[int] = None):
+    """Select orders past a given id together with the owning seller and unit price
+
+    Orders reference products by name; an order is attributed to every seller
+    that lists a product with that name, priced at that seller's price.
+    """
+    products = select(
+        Product.seller_id.label("seller_id"),
+        Product.name.label("name"),
+        func.max(Product.price).label("price")
+    )
+    if seller_id is not None:
+        products = products.where(Product.seller_id == seller_id)
+    products = products.group_by(Product.seller_id, Product.name).subquery()
+
+    statement = (
+        select(Order.id, Order.date, Order.quantity, products.c.seller_id, products.c.name, products.c.price)
+        .select_from(Order)
+        .join(products, products.c.name == Order.product)
+        .where(Order.id > after_order_id)
+    )
+    if upto_order_id is not None:
+        statement = statement.where(Order.id <= upto_order_id)
+    return statement
+
+
+def aggregate_orders(rows: Iterable) -> Totals:
+    """Fold priced order rows into per (seller, product, IST day) totals"""
+    totals: Totals = defaultdict(lambda: [0, 0, 0.0])
+    for row in rows:
+        if row.date is None:
+            continue
+        entry = totals[(row.seller_id, row.name, ist_day(row.date))]
+        entry[0] += 1
+        entry[1] += row.quantity
+        entry[2] += row.quantity * row.price
+    return totals
+
+
+def get_high_water_mark(db: Session) -> int:
+    """Get the id of the last order folded into the rollup"""
+    last_order_id = db.execute(
+        select(RollupCheckpoint.last_order_id).where(RollupCheckpoint.name == CHECKPOINT_NAME)
+    ).scalar()
+    return last_order_id or 0
+
+
+def _apply_totals(db: Session, totals: Totals) -> None:
+    for (seller_id, product, day), (order_count, units, revenue) in totals.items():
+        row = db.get(OrderDailyRollup, (seller_id, product, day))
+        if row is None:
+            db.add(OrderDailyRollup(seller_id=seller_id, product=product, day=day,
+                                    order_count=order_count, units=units, revenue=revenue))
+        else:
+            row.order_count += order_count
+            row.units += units
+            row.revenue += revenue
+
+
+def _is_settled(order_date: Optional[datetime], cutoff: datetime) -> bool:
+    if order_date is None:
+        return True
+    if order_date.tzinfo is None:
+        order_date = order_date.replace(tzinfo=pytz.UTC)
+    return order_date <= cutoff
+
+
+def refresh_order_rollup(db: Session, batch_size: int = ROLLUP_BATCH_SIZE,
+                         settle_seconds: float = ROLLUP_SETTLE_SECONDS) -> int:
+    """Fold orders newer than the high-water mark into order_daily_rollup
+
+    Each batch updates the rollup rows and advances the checkpoint in one
+    transaction, so a crash never double counts or skips orders. A batch
+    stops at the first order (by id) placed less than settle_seconds ago,
+    so the checkpoint never passes an id whose transaction may still commit.
+
+    Args:
+        db: Database session
+        batch_size: Orders processed per transaction
+        settle_seconds: Age an order must reach before it is folded in
+
+    Returns:
+        The number of orders processed
+    """
+    processed = 0
+    while True:
+        # Lock the checkpoint so concurrent jobs cannot fold the same batch twice
+        checkpoint = db.execute(
+            select(RollupCheckpoint).where(RollupCheckpoint.name == CHECKPOINT_NAME).with_for_update()
+        ).scalar_one_or_none()
+        if checkpoint is None:
+            checkpoint = RollupCheckpoint(name=CHECKPOINT_NAME, last_order_id=0)
+            db.add(checkpoint)
+
+        cutoff = datetime.now(pytz.UTC) - timedelta(seconds=settle_seconds)
+        order_ids = []
+        for order_id, order_date in db.execute(
+            select(Order.id, Order.date).where(Order.id > checkpoint.last_order_id).order_by(Order.id).limit(batch_size)
+        ):
+            if not _is_settled(order_date, cutoff):
+                break
+            order_ids.append(order_id)
+        if not order_ids:
+            db.commit()
+            return processed
+
+        upto_order_id = order_ids[-1]
+        _apply_totals(db, aggregate_orders(db.execute(priced_orders(checkpoint.last_order_id, upto_order_id))))
+        checkpoint.last_order_id = upto_order_id
+        db.commit()
+
+        processed += len(order_ids)
+        logger.info(f"Rolled up {processed} orders (through order id {upto_order_id})")
+
+
+def backfill_order_rollup(db: Session, batch_size: int = ROLLUP_BATCH_SIZE) -> int:
+    """Rebuild order_daily_rollup from the full order history
+
+    Readers stay correct while this runs because get_product_totals reads
+    orders past the (reset) high-water mark directly.
+
+    Returns:
+        The number of orders processed
+    """
+    db.execute(delete(OrderDailyRollup))
+    checkpoint = db.get(RollupCheckpoint, CHECKPOINT_NAME)
+    if checkpoint is not None:
+        checkpoint.last_order_id = 0
+    db.commit()
+    return refresh_order_rollup(db, batch_size)
+
+
+def get_product_totals(db: Session, seller_id: int, start_day: date, end_day: date) -> Dict[str, dict]:
+    """Get a seller's per-product totals over a range of IST days
+
+    Reads the rollup for orders already folded in and the raw orders past the
+    high-water mark, so results are current even when the job lags behind.
+    Revenue is units times the seller's current price, like the report's
+    order rows; the price stored in the rollup at fold time is not used, and
+    products the seller no longer lists are left out.
+
+    Args:
+        db: Database session
+        seller_id: Seller id
+        start_day: First IST day
+        end_day: Last IST day (inclusive)
+
+    Returns:
+        Mapping of product name to dict with orders, units and revenue
+    """
+    # The high-water mark is read in the same statement as the rollup rows, so both come from
+    # one snapshot and a job commit cannot land between them (which would count its batch twice)
+    checkpoint = (
+        select(func.coalesce(func.max(RollupCheckpoint.last_order_id), 0))
+        .where(RollupCheckpoint.name == CHECKPOINT_NAME)
+        .scalar_subquery()
+    )
+    # Without rollup rows in the range, an earlier mark is safe: orders folded since then had
+    # none for this seller and range, so the tail finds none of them either
+    high_water_mark = get_high_water_mark(db)
+    totals = defaultdict(lambda: {"orders": 0, "units": 0, "revenue": 0.0})
+    rollup_rows = db.execute(
+        select(
+            OrderDailyRollup.product,
+            func.sum(OrderDailyRollup.order_count),
+            func.sum(OrderDailyRollup.units),
+            checkpoint.label("high_water_mark")
+        )
+        .where(
+            OrderDailyRollup.seller_id == seller_id,
+            OrderDailyRollup.day >= start_day,
+            OrderDailyRollup.day <= end_day
+        )
+        .group_by(OrderDailyRollup.product)
+    )
+    for product, order_count, units, high_water_mark in rollup_rows:
+        totals[product]["orders"] += order_count
+        totals[product]["units"] += units
+
+    # Bounded by date as well, so a lagging (or never run) job does not load the whole history
+    start_date, end_date = ist_day_bounds(start_day, end_day)
+    tail = aggregate_orders(db.execute(
+        priced_orders(high_water_mark, seller_id=seller_id).where(Order.date >= start_date, Order.date <= end_date)
+    ))
+    for (_, product, _), (order_count, units, _) in tail.items():
+        totals[product]["orders"] += order_count
+        totals[product]["units"] += units
+
+    prices = dict(db.execute(
+        select(Product.name, func.max(Product.price)).where(Product.seller_id == seller_id).group_by(Product.name)
+    ).all())
+    result = {}
+    for product, entry in totals.items():
+        if product in prices:
+            entry["revenue"] = entry["units"] * prices[product]
+            result[product] = entry
+    return result
+
+
+def get_orders_version(db: Session, seller_id: int, start_day: date, end_day: date) -> str:
+    """Get a version of a seller's orders over a range of IST days
+
+    Made of the rollup's order count for the range and the count and newest id
+    of the orders past the high-water mark, read in one statement: O(days) plus
+    the unfolded tail, never the whole range. It changes when an order in the
+    range is placed; folding orders into the rollup changes it once more.
+    """
+    checkpoint = (
+        select(func.coalesce(func.max(RollupCheckpoint.last_order_id), 0))
+        .where(RollupCheckpoint.name == CHECKPOINT_NAME)
+        .scalar_subquery()
+    )
+    folded = (
+        select(func.coalesce(func.sum(OrderDailyRollup.order_count), 0))
+        .where(
+            OrderDailyRollup.seller_id == seller_id,
+            OrderDailyRollup.day >= start_day,
+            OrderDailyRollup.day <= end_day
+        )
+        .scalar_subquery()
+    )
+    start_date, end_date = ist_day_bounds(start_day, end_day)
+    tail = (
+        priced_orders(checkpoint, seller_id=seller_id)
+        .where(Order.date >= start_date, Order.date <= end_date)
+        .subquery()
+    )
+    folded_count, tail_count, tail_last_id = db.execute(
+        select(folded, func.count(tail.c.id), func.max(tail.c.id)).select_from(tail)
+    ).one()
+    return f"{folded_count}:{tail_count}:{tail_last_id or 0}"
+
+
+def get_sales_summary(db: Session, seller_id: int, start_day: date, end_day: date) -> dict:
+    """Get a seller's total orders, units, revenue and top product over a range of IST days
+
+    Returns:
+        dict with total_orders, total_units, total_sales and top_product
+    """
+    totals = get_product_totals(db, seller_id, start_day, end_day)
+    top_product = max(totals, key=lambda product: totals[product]["revenue"]) if totals else None
+    return {
+        "total_orders": sum(entry["orders"] for entry in totals.values()),
+        "total_units": sum(entry["units"] for entry in totals.values()),
+        "total_sales": float(sum(entry["revenue"] for entry in totals.values())),
+        "top_product": top_product
+    }
+
+
+# Export the rollup job and readers
+__all__ = [
+    "ist_day", "ist_day_bounds", "refresh_order_rollup", "backfill_order_rollup", "get_high_water_mark",
+    "get_product_totals", "get_orders_version", "get_sales_summary"
+]
@@ -0,0 +1,64 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+# Rows per page when a listing request passes a cursor but no limit, and the most a request may ask for
+PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", 500))
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", 1000))
+
+
+def keyset_page(db: Session, columns, criteria, key, cursor: Optional[int] = None,
+                limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Fetch one page of rows ordered by a unique key, starting after a cursor
+
+    Only the given columns are selected, and the page continues from the last
+    key seen (WHERE key > :cursor ORDER BY key LIMIT n), so every page is an
+    index range scan however deep into the listing it is.
+
+    Paging is opt-in: without a cursor or a limit every row is returned, as
+    the listings did before they were paged, so clients that do not follow
+    X-Next-Cursor never see a truncated list.
+
+    Args:
+        db: Database session
+        columns: Columns to select; each row becomes a dict keyed by column name
+        criteria: WHERE clauses, e.g. the seller filter
+        key: Unique column to order and page by, usually the primary key
+        cursor: Key of the last row of the previous page, or None for the first page
+        limit: Rows per page; PAGE_DEFAULT_LIMIT with a cursor, every row without one
+
+    Returns:
+        (rows, next cursor or None on the last page)
+    """
+    statement = select(*columns).where(*criteria)
+    if cursor is not None:
+        statement = statement.where(key > cursor)
+    if limit is None:
+        if cursor is None:
+            return [dict(row._mapping) for row in db.execute(statement.order_by(key))], None
+        limit = PAGE_DEFAULT_LIMIT
+    # One extra row tells whether there is a next page without a COUNT
+    rows = db.execute(statement.order_by(key).limit(limit + 1)).all()
+    next_cursor = rows[limit - 1]._mapping[key] if len(rows) > limit else None
+    return [dict(row._mapping) for row in rows[:limit]], next_cursor
+
+
+def set_next_page(request: Request, response: Response, next_cursor: Optional[int]) -> None:
+    """Point the client at the next page with X-Next-Cursor and, for GET, a Link rel="next" header
+
+    Listings keep returning a plain JSON array and are only paged when the
+    request passes a cursor or a limit, so there is only a next page for
+    clients that asked for pages.
+    """
+    if next_cursor is None:
+        return
+    response.headers["X-Next-Cursor"] = str(next_cursor)
+    if request.method == "GET":
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+
+
+# Export the keyset pagination helpers
+__all__ = ["keyset_page", "set_next_page", "PAGE_DEFAULT_LIMIT", "PAGE_MAX_LIMIT"]
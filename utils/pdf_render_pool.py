@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from utils.metrics import (
+    registry, pdf_render_seconds, pdf_render_queue_wait_seconds, pdf_render_rejected_total
+)
+
+logger = logging.getLogger("pdf_render_pool")
+
+# Worker processes rendering PDFs; keep below the CPU count so request handling keeps a core
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", max(1, min(4, (os.cpu_count() or 2) - 1))))
+# Renders queued or running before new requests get 503
+PDF_RENDER_MAX_PENDING = int(os.getenv("PDF_RENDER_MAX_PENDING", PDF_RENDER_WORKERS * 4))
+# Retry-After seconds sent with 503 responses
+PDF_RENDER_RETRY_AFTER = int(os.getenv("PDF_RENDER_RETRY_AFTER", 5))
+
+
+def _render_in_worker(render: Callable, args: tuple, kwargs: dict, submitted_at: float):
+    """Run a render function in a worker process, timing the queue wait and the render"""
+    started_at = time.time()
+    result = render(*args, **kwargs)
+    return result, started_at - submitted_at, time.time() - started_at
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class PDFRenderPool:
+    """Bounded process pool for CPU-bound ReportLab builds
+
+    Rendering in separate processes keeps large reports from holding the GIL
+    and stalling the event loop and threadpool that serve every other request.
+    Arguments and results are pickled, so pass plain values (ids, dates,
+    small dicts), never ORM objects or sessions; renders over a seller's
+    rows open their own session in the worker and stream them from there.
+    """
+
+    def __init__(self, max_workers: int = PDF_RENDER_WORKERS, max_pending: int = PDF_RENDER_MAX_PENDING,
+                 start_method: str = "spawn"):
+        """Initialize the pool; worker processes start on the first render
+
+        Args:
+            max_workers: Worker processes
+            max_pending: Renders queued or running before render() raises 503
+            start_method: multiprocessing start method; spawn avoids forking a threaded server
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        # render_when_free() calls waiting for a slot, woken in order as renders finish
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    @property
+    def pending(self) -> int:
+        """Renders currently queued or running"""
+        return self._pending
+
+    @property
+    def full(self) -> bool:
+        """Whether a render() call would be refused right now"""
+        return self._pending >= self.max_pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method)
+            )
+        return self._executor
+
+    def _release(self, _future=None) -> None:
+        # Runs in the executor's thread, so waiters are woken through their own loop
+        with self._lock:
+            self._pending -= 1
+            self._wake_next()
+
+    def _wake_next(self) -> None:
+        """Wake the oldest waiter still waiting; the caller holds the lock"""
+        while self._waiters:
+            loop, waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # The waiter's event loop is closed
+                continue
+            return
+
+    def _submit(self, render: Callable, args: tuple, kwargs: dict, waiter: Optional[asyncio.Future] = None):
+        """Submit a render if there is room; returns the future or None when full
+
+        When full and a waiter is given, it is queued under the same lock, so
+        a slot freed right after this check still wakes it.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                if waiter is not None:
+                    self._waiters.append((waiter.get_loop(), waiter))
+                return None
+            executor = self._get_executor()
+            try:
+                future = executor.submit(_render_in_worker, render, args, kwargs, time.time())
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM killed); replace the pool and retry once
+                logger.warning("PDF render pool was broken, restarting it")
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+                future = self._get_executor().submit(_render_in_worker, render, args, kwargs, time.time())
+            self._pending += 1
+        # Released when the render finishes, even if the request is cancelled first
+        future.add_done_callback(self._release)
+        return future
+
+    async def _result(self, report: str, future):
+        result, queue_wait, render_seconds = await asyncio.wrap_future(future)
+        pdf_render_queue_wait_seconds.observe(max(queue_wait, 0.0), report=report)
+        pdf_render_seconds.observe(render_seconds, report=report)
+        return result
+
+    async def render(self, report: str, render: Callable[..., bytes], *args: Any, **kwargs: Any) -> bytes:
+        """Render a PDF in a worker process without blocking the event loop
+
+        Args:
+            report: Report type, used as the metrics label
+            render: Module-level render function (must be importable by the worker)
+            *args: Positional arguments for render
+            **kwargs: Keyword arguments for render
+
+        Returns:
+            The rendered PDF bytes
+
+        Raises:
+            HTTPException: 503 when max_pending renders are already queued or running
+        """
+        future = self._submit(render, args, kwargs)
+        if future is None:
+            pdf_render_rejected_total.inc(report=report)
+            raise HTTPException(
+                status_code=503,
+                detail="Report rendering is busy, please try again shortly",
+                headers={"Retry-After": str(PDF_RENDER_RETRY_AFTER)}
+            )
+        return await self._result(report, future)
+
+    async def render_when_free(self, report: str, render: Callable[..., bytes], *args: Any, **kwargs: Any) -> bytes:
+        """Like render(), but wait for a free slot instead of raising 503
+
+        For work that has already started responding (e.g. a streamed batch),
+        where a mid-stream 503 is no longer possible.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            waiter = loop.create_future()
+            future = self._submit(render, args, kwargs, waiter)
+            if future is not None:
+                return await self._result(report, future)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    try:
+                        self._waiters.remove((loop, waiter))
+                    except ValueError:
+                        # Already chosen for a freed slot; hand that wakeup to the next waiter
+                        self._wake_next()
+                raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Create the process-wide render pool
+pdf_render_pool = PDFRenderPool()
+
+
+def _pdf_render_pool_lines() -> List[str]:
+    return [
+        "# TYPE pdf_render_pending gauge",
+        f"pdf_render_pending {pdf_render_pool.pending}",
+        "# TYPE pdf_render_workers gauge",
+        f"pdf_render_workers {pdf_render_pool.max_workers}",
+    ]
+
+
+registry.register_collector(_pdf_render_pool_lines)
+
+
+# Export the pool
+__all__ = [
+    "PDFRenderPool", "pdf_render_pool", "PDF_RENDER_WORKERS", "PDF_RENDER_MAX_PENDING", "PDF_RENDER_RETRY_AFTER"
+]
@@ -0,0 +1,150 @@
+import csv
+import io
+import json
+import os
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend.products.serializers import ProductSerializer
+from models.base import Product
+from utils.inventory_feed import record_changes
+
+# Rows inserted per statement and committed per transaction
+BULK_IMPORT_CHUNK_ROWS = int(os.getenv("BULK_IMPORT_CHUNK_ROWS", 1000))
+# Row errors listed in an import report; the counts always cover every row
+BULK_IMPORT_MAX_ERRORS = int(os.getenv("BULK_IMPORT_MAX_ERRORS", 1000))
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+def import_format(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    """Work out an upload's format from its file extension or content type"""
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if extension in IMPORT_FORMATS:
+        return extension
+    if extension == "ndjson" or (content_type or "").split(";")[0].strip() in ("application/x-ndjson",
+                                                                                "application/jsonl"):
+        return "jsonl"
+    if (content_type or "").startswith("text/csv"):
+        return "csv"
+    return None
+
+
+def iter_import_rows(stream: BinaryIO, format: str) -> Iterator[Tuple[int, Any]]:
+    """Stream an uploaded catalog as (line number, raw row)
+
+    CSV rows come out as dicts keyed by the header line; JSONL lines are
+    decoded one at a time and blank lines are skipped. A line that is not
+    valid JSON comes out as a ValueError in place of the row.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if format == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Empty cells mean "not given", so optional fields get their defaults
+            yield reader.line_num, {key.strip(): value for key, value in row.items()
+                                    if key is not None and value not in (None, "")}
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f"Invalid JSON: {e}")
+
+
+def validate_import_row(row: Any) -> ProductSerializer:
+    """Validate one raw row with ProductSerializer; 'name' is accepted for product_name"""
+    if isinstance(row, Exception):
+        raise row
+    if not isinstance(row, dict):
+        raise ValueError("Each row must be an object")
+    if "product_name" not in row and "name" in row:
+        row = {**row, "product_name": row["name"]}
+    return ProductSerializer.model_validate(row)
+
+
+def row_errors(error: Exception) -> List[str]:
+    if isinstance(error, ValidationError):
+        return [f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors()]
+    return [str(error)]
+
+
+def import_products(db: Session, seller_id: int, rows: Iterator[Tuple[int, Any]],
+                    chunk_rows: int = BULK_IMPORT_CHUNK_ROWS) -> Dict[str, Any]:
+    """Validate catalog rows and insert the valid ones in batches
+
+    Each chunk of valid rows is one multi-row INSERT committed in its own
+    transaction, together with its inventory change feed entries, so an
+    import of thousands of rows costs a few round trips instead of an
+    INSERT, commit and refresh per product. A chunk the
+    database rejects is rolled back and its rows are reported as failed;
+    earlier chunks stay imported.
+
+    A file that stops decoding part way (bad encoding, broken CSV quoting)
+    ends the import there; the rows before it are kept and read_error says
+    where it stopped.
+
+    Returns:
+        Import report with total_rows, imported, failed, per-row errors and read_error
+    """
+    report = {"total_rows": 0, "imported": 0, "failed": 0, "errors": [], "errors_truncated": False,
+              "read_error": None}
+
+    def add_error(line: int, messages: List[str]):
+        report["failed"] += 1
+        if len(report["errors"]) < BULK_IMPORT_MAX_ERRORS:
+            report["errors"].append({"line": line, "errors": messages})
+        else:
+            report["errors_truncated"] = True
+
+    def flush(chunk: List[Tuple[int, Dict[str, Any]]]):
+        try:
+            rows = db.execute(insert(Product).returning(Product.id, Product.name, Product.stock),
+                              [values for _, values in chunk])
+            record_changes(db, [{"seller_id": seller_id, "product_id": row.id, "operation": "insert",
+                                 "name": row.name, "stock": row.stock, "previous_stock": None} for row in rows])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            for line, _ in chunk:
+                add_error(line, [f"Insert failed: {e.__class__.__name__}"])
+            return
+        report["imported"] += len(chunk)
+
+    chunk, line = [], 0
+    rows = iter(rows)
+    while True:
+        try:
+            line, row = next(rows)
+        except StopIteration:
+            break
+        except (UnicodeDecodeError, csv.Error) as e:
+            report["read_error"] = f"Could not read the file after line {line}: {e}"
+            break
+        report["total_rows"] += 1
+        try:
+            product = validate_import_row(row)
+        except (ValidationError, ValueError) as e:
+            add_error(line, row_errors(e))
+            continue
+        chunk.append((line, {"seller_id": seller_id, "name": product.product_name.strip(),
+                             "description": product.description, "price": product.price, "stock": product.stock}))
+        if len(chunk) >= chunk_rows:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    return report
+
+
+# Export the bulk import helpers
+__all__ = [
+    "import_products", "iter_import_rows", "validate_import_row", "import_format",
+    "IMPORT_FORMATS", "BULK_IMPORT_CHUNK_ROWS", "BULK_IMPORT_MAX_ERRORS"
+]
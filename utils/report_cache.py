@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from typing import BinaryIO, Optional, Tuple
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+from utils.report_streaming import iter_file
+
+logger = logging.getLogger("report_cache")
+
+# Rendered reports live here, one file per cache key
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "seller_report_cache"))
+# Total size kept on disk before least recently used reports are deleted
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+class ReportCache:
+    """Disk cache of rendered reports, addressed by what the report was built from
+
+    The key hashes the report type, seller, resolved date range and a data
+    version, so a changed input simply produces a new key and stale files age
+    out through LRU eviction. A file's mtime is when it was rendered (sent as
+    Last-Modified); its atime is set explicitly on every hit and drives eviction.
+    """
+
+    def __init__(self, directory: str = REPORT_CACHE_DIR, max_bytes: int = REPORT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(report_type: str, seller_id, *parts) -> str:
+        """Build the cache key for a report
+
+        Args:
+            report_type: e.g. 'sales' or 'inventory'
+            seller_id: Seller the report belongs to
+            *parts: Resolved date range and data version, compared by str()
+        """
+        material = json.dumps([report_type, str(seller_id)] + [str(part) for part in parts])
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def read(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Get a cached report and when it was rendered
+
+        Returns:
+            (content, mtime) or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            stat = os.stat(path)
+            os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            return None
+        return content, stat.st_mtime
+
+    def open(self, key: str) -> Optional[Tuple[BinaryIO, float]]:
+        """Open a cached report for streaming and mark it recently used
+
+        Returns:
+            (open binary file, mtime) or None on a miss; the caller closes the file
+        """
+        path = self._path(key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        mtime = os.fstat(f.fileno()).st_mtime
+        try:
+            os.utime(path, (time.time(), mtime))
+        except FileNotFoundError:
+            pass
+        return f, mtime
+
+    def contains(self, key: str) -> bool:
+        """Check for a cached report without opening it, marking it recently used"""
+        path = self._path(key)
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def temp_path(self) -> str:
+        """Create an empty temp file in the cache directory for a renderer to write to
+
+        Renderers in other processes write here; commit() then moves the file
+        into place, so the cache entry is the render output itself.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        return tmp_path
+
+    def discard(self, tmp_path: str) -> None:
+        """Remove a temp file whose render failed"""
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def commit(self, key: str, tmp_path: str) -> Tuple[BinaryIO, float]:
+        """Move a rendered temp file into the cache atomically and evict old reports
+
+        Returns:
+            (open binary file, mtime); the handle stays valid even if the
+            entry is evicted straight away
+        """
+        f = open(tmp_path, "rb")
+        try:
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            f.close()
+            self.discard(tmp_path)
+            raise
+        self.evict()
+        return f, os.fstat(f.fileno()).st_mtime
+
+    def write(self, key: str, content: bytes) -> float:
+        """Store a rendered report atomically and evict old ones if over budget
+
+        Returns:
+            The file's mtime, for Last-Modified
+        """
+        tmp_path = self.temp_path()
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+        except OSError:
+            self.discard(tmp_path)
+            raise
+        f, mtime = self.commit(key, tmp_path)
+        f.close()
+        return mtime
+
+    def evict(self) -> int:
+        """Delete least recently used reports until the cache fits in max_bytes
+
+        Returns:
+            The number of files deleted
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(".pdf"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            if removed:
+                logger.info(f"Evicted {removed} cached reports")
+            return removed
+
+
+def etag_for(key: str) -> str:
+    return f'"{key}"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Check an If-None-Match header against a strong ETag"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def pdf_response(f: BinaryIO, filename: str, etag: str, last_modified: float) -> StreamingResponse:
+    """Stream an open PDF file as a download carrying validators for conditional requests"""
+    return StreamingResponse(
+        iter_file(f),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(os.fstat(f.fileno()).st_size),
+            "ETag": etag,
+            "Last-Modified": formatdate(last_modified, usegmt=True),
+            # Revalidate every time: the ETag changes whenever the report's data does
+            "Cache-Control": "private, no-cache"
+        }
+    )
+
+
+# Create the process-wide report cache
+report_cache = ReportCache()
+
+
+# Export the cache and response helpers
+__all__ = [
+    "ReportCache", "report_cache", "etag_for", "etag_matches", "not_modified_response", "pdf_response"
+]
@@ -0,0 +1,291 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from models.base import ReportJob
+
+logger = logging.getLogger("report_jobs")
+
+# Jobs worked on at once per process; rendering itself is bounded by the PDF render pool
+REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", 2))
+# Seconds an idle worker waits before looking for queued jobs again
+REPORT_JOB_POLL_INTERVAL = float(os.getenv("REPORT_JOB_POLL_INTERVAL", 2.0))
+# Attempts before a job is marked failed
+REPORT_JOB_MAX_ATTEMPTS = int(os.getenv("REPORT_JOB_MAX_ATTEMPTS", 3))
+# Running jobs not finished after this many seconds are assumed lost with their worker and requeued
+REPORT_JOB_STALE_SECONDS = int(os.getenv("REPORT_JOB_STALE_SECONDS", 900))
+
+# What a job handler gets: the claimed job as plain data, and a session to load report data with
+JobHandler = Callable[[Dict[str, Any], Session], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def job_data(job: ReportJob) -> Dict[str, Any]:
+    """Copy a job row into a plain dict, decoding its JSON columns"""
+    return {
+        "id": job.id,
+        "seller_id": job.seller_id,
+        "report_type": job.report_type,
+        "params": json.loads(job.params or "{}"),
+        "seller_info": json.loads(job.seller_info or "{}"),
+        "deliver_to": job.deliver_to,
+        "language": job.language,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error,
+        "cache_key": job.cache_key,
+        "delivery_status": job.delivery_status,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+
+
+def enqueue_report_job(db: Session, seller_id: int, report_type: str, params: Dict[str, Any],
+                       seller_info: Dict[str, Any], deliver_to: Optional[str] = None,
+                       language: str = "en") -> ReportJob:
+    """Queue a report for the workers
+
+    Args:
+        db: Database session (committed here)
+        seller_id: Seller the report belongs to
+        report_type: Report the handler should build, e.g. 'sales' or 'inventory'
+        params: Report parameters, stored as JSON
+        seller_info: The authenticated seller, stored as JSON for the report header
+        deliver_to: WhatsApp number to send the finished report to, if any
+        language: Language of the WhatsApp caption
+    """
+    job = ReportJob(
+        seller_id=seller_id,
+        report_type=report_type,
+        params=json.dumps(params),
+        seller_info=json.dumps(seller_info, default=str),
+        deliver_to=deliver_to,
+        language=language,
+        status="queued",
+        attempts=0
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def requeue_stale_jobs(db: Session, stale_seconds: int = REPORT_JOB_STALE_SECONDS) -> int:
+    """Put back jobs whose worker died mid-run; returns how many were requeued"""
+    cutoff = _utcnow() - timedelta(seconds=stale_seconds)
+    result = db.execute(
+        update(ReportJob)
+        .where(ReportJob.status == "running", ReportJob.started_at < cutoff)
+        .values(status="queued")
+        # Rows are re-read when claimed; skip comparing the cutoff against loaded objects
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if result.rowcount:
+        logger.warning(f"Requeued {result.rowcount} stale report jobs")
+    return result.rowcount
+
+
+def claim_report_job(db: Session) -> Optional[Dict[str, Any]]:
+    """Claim the oldest queued job for this worker
+
+    The conditional UPDATE only succeeds for one worker per job, so several
+    workers (and several processes) can poll the same table.
+
+    Returns:
+        The claimed job as plain data, or None if nothing is queued
+    """
+    while True:
+        job_id = db.execute(
+            select(ReportJob.id).where(ReportJob.status == "queued").order_by(ReportJob.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            return None
+        claimed = db.execute(
+            update(ReportJob)
+            .where(ReportJob.id == job_id, ReportJob.status == "queued")
+            .values(status="running", started_at=_utcnow(), attempts=ReportJob.attempts + 1)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return job_data(db.get(ReportJob, job_id, populate_existing=True))
+        # Another worker won this job; try the next one
+
+
+def complete_report_job(db: Session, job_id: int, result: Optional[Dict[str, Any]] = None) -> None:
+    """Mark a job done, storing result columns such as cache_key and delivery_status"""
+    db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id)
+        .values(status="done", error=None, finished_at=_utcnow(), **(result or {}))
+    )
+    db.commit()
+
+
+def fail_report_job(db: Session, job_id: int, error: str, max_attempts: int = REPORT_JOB_MAX_ATTEMPTS) -> str:
+    """Requeue a failed job, or mark it failed once it is out of attempts
+
+    Returns:
+        The job's new status
+    """
+    job = db.get(ReportJob, job_id, populate_existing=True)
+    job.status = "queued" if job.attempts < max_attempts else "failed"
+    job.error = error[:2000]
+    if job.status == "failed":
+        job.finished_at = _utcnow()
+    db.commit()
+    return job.status
+
+
+def release_report_job(db: Session, job_id: int) -> None:
+    """Requeue a claimed job that was interrupted, without counting the attempt"""
+    db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id, ReportJob.status == "running")
+        .values(status="queued", attempts=ReportJob.attempts - 1)
+    )
+    db.commit()
+
+
+class ReportJobWorkers:
+    """Asyncio workers that claim report jobs from the database and run a handler
+
+    Workers run inside the event loop of the web process (or of
+    backend/report_worker.py). The handler does its blocking work through the
+    threadpool and its rendering through the PDF process pool, so a few
+    workers keep both busy without blocking request handling.
+    """
+
+    def __init__(self, handler: JobHandler, session_factory: Callable[[], Session],
+                 workers: int = REPORT_JOB_WORKERS, poll_interval: float = REPORT_JOB_POLL_INTERVAL,
+                 max_attempts: int = REPORT_JOB_MAX_ATTEMPTS,
+                 on_failed: Optional[Callable[[Dict[str, Any], str], Awaitable[None]]] = None):
+        """Initialize the workers; nothing runs until start()
+
+        Args:
+            handler: Async function (job, db) -> result columns to store on the job, or None
+            session_factory: Creates the sessions used to claim, run and update jobs
+            workers: Jobs worked on at once
+            poll_interval: Seconds an idle worker waits before polling again
+            max_attempts: Attempts before a job is marked failed
+            on_failed: Async function (job, error) called once a job has used up its attempts
+        """
+        self.handler = handler
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.on_failed = on_failed
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        with self.session_factory() as db:
+            return claim_report_job(db)
+
+    def _complete(self, job_id: int, result: Optional[Dict[str, Any]]) -> None:
+        with self.session_factory() as db:
+            complete_report_job(db, job_id, result)
+
+    def _fail(self, job_id: int, error: str) -> str:
+        with self.session_factory() as db:
+            return fail_report_job(db, job_id, error, self.max_attempts)
+
+    def _release(self, job_id: int) -> None:
+        with self.session_factory() as db:
+            release_report_job(db, job_id)
+
+    def _requeue_stale(self) -> int:
+        with self.session_factory() as db:
+            return requeue_stale_jobs(db)
+
+    async def run_once(self) -> bool:
+        """Claim and run one job
+
+        Returns:
+            True if a job was run (successfully or not), False if none was queued
+        """
+        job = await run_in_threadpool(self._claim)
+        if job is None:
+            return False
+
+        db = self.session_factory()
+        try:
+            result = await self.handler(job, db)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back instead of leaving it to go stale
+            self._release(job["id"])
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            status = await run_in_threadpool(self._fail, job["id"], error)
+            logger.error(f"Report job {job['id']} attempt {job['attempts']} failed ({status}): {e}")
+            if status == "failed" and self.on_failed is not None:
+                try:
+                    await self.on_failed(job, error)
+                except Exception as callback_error:
+                    logger.error(f"Report job {job['id']} failure callback failed: {callback_error}")
+        else:
+            await run_in_threadpool(self._complete, job["id"], result)
+            logger.info(f"Report job {job['id']} done")
+        finally:
+            await run_in_threadpool(db.close)
+        return True
+
+    def notify(self) -> None:
+        """Wake idle workers, e.g. right after a job was queued by this process"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                worked = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # e.g. the database is unreachable; keep the worker alive
+                logger.error(f"Report job worker error: {e}")
+                worked = False
+            if not worked:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    def start(self) -> None:
+        """Requeue jobs lost by a previous run and start the workers in the running event loop"""
+        if self._tasks or self.workers <= 0:
+            return
+        try:
+            self._requeue_stale()
+        except Exception as e:
+            logger.error(f"Could not requeue stale report jobs: {e}")
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs they were running go back to the queue"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Export the job queue helpers and workers
+__all__ = [
+    "ReportJobWorkers", "enqueue_report_job", "claim_report_job", "complete_report_job", "fail_report_job",
+    "release_report_job", "requeue_stale_jobs", "job_data", "REPORT_JOB_WORKERS", "REPORT_JOB_MAX_ATTEMPTS"
+]
@@ -0,0 +1,96 @@
+import csv
+import io
+import itertools
+import os
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+from reportlab.platypus import LongTable
+
+from utils.report_template import TableLayout, REPORT_TABLE_STYLE
+
+# Rows per LongTable chunk; kept even so zebra striping lines up across chunks
+REPORT_TABLE_CHUNK_ROWS = max(2, int(os.getenv("REPORT_TABLE_CHUNK_ROWS", 500)) // 2 * 2)
+# Bytes of CSV text buffered before a chunk is sent
+CSV_STREAM_CHUNK_BYTES = int(os.getenv("CSV_STREAM_CHUNK_BYTES", 64 * 1024))
+# Bytes of a streamed file read per chunk
+FILE_STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class StreamedFlowables(list):
+    """Flowable list for doc.build that pulls from an iterator on demand
+
+    ReportLab consumes flowables from the front of the list it is given, so
+    refilling lazily keeps only the chunk being laid out in memory instead of
+    every table for the whole report.
+    """
+
+    def __init__(self, source: Iterable, lookahead: int = 2):
+        super().__init__()
+        self._source = iter(source)
+        self._lookahead = lookahead
+        self._refill()
+
+    def _refill(self) -> None:
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self) -> int:
+        self._refill()
+        return list.__len__(self)
+
+
+def table_chunks(layout: TableLayout, rows: Iterable[Sequence[Any]],
+                 chunk_style: Optional[Callable[[List[Sequence[Any]]], List[tuple]]] = None,
+                 chunk_rows: int = REPORT_TABLE_CHUNK_ROWS) -> Iterator[LongTable]:
+    """Split table rows into LongTables of chunk_rows rows, each repeating the header
+
+    Args:
+        layout: Column titles, widths and base style
+        rows: Table rows (consumed lazily)
+        chunk_style: Optional function (chunk's body rows) -> extra style commands for that table
+        chunk_rows: Rows per table
+    """
+    rows = iter(rows)
+    for chunk in iter(lambda: list(itertools.islice(rows, chunk_rows)), []):
+        yield layout.table(chunk, chunk_style(chunk) if chunk_style is not None else ())
+
+
+def iter_csv(header: Sequence[str], rows: Iterable[Sequence[Any]],
+             chunk_bytes: int = CSV_STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """Encode rows as CSV, yielding roughly chunk_bytes at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_file(f, chunk_bytes: int = FILE_STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """Stream an open binary file and close it afterwards
+
+    The handle stays readable even if the file is unlinked (e.g. evicted) meanwhile.
+    """
+    try:
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+
+# Export the streaming helpers
+__all__ = [
+    "StreamedFlowables", "table_chunks", "iter_csv", "iter_file", "REPORT_TABLE_STYLE",
+    "REPORT_TABLE_CHUNK_ROWS"
+]
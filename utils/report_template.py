@@ -0,0 +1,156 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import LongTable, Paragraph, Spacer, TableStyle
+
+# Paragraph styles shared by every report, built once per process (each render
+# pool worker builds its own on import) instead of on every request
+_SAMPLE_STYLES = getSampleStyleSheet()
+TITLE_STYLE = _SAMPLE_STYLES["Title"]
+NORMAL_STYLE = _SAMPLE_STYLES["Normal"]
+INFO_STYLE = ParagraphStyle(
+    'ReportInfo',
+    parent=NORMAL_STYLE,
+    fontSize=10,
+    leading=12
+)
+SUMMARY_STYLE = ParagraphStyle(
+    'Summary',
+    parent=NORMAL_STYLE,
+    fontSize=12,
+    leading=14,
+    spaceAfter=12
+)
+INVOICE_SUMMARY_STYLE = ParagraphStyle(
+    'InvoiceSummary',
+    parent=NORMAL_STYLE,
+    fontSize=10,
+    alignment=2,  # Right alignment
+    leading=14,
+    spaceAfter=12
+)
+FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    parent=NORMAL_STYLE,
+    fontSize=8,
+    leading=10,
+    alignment=1  # Center alignment
+)
+
+# Styles shared by every report table; ROWBACKGROUNDS replaces one command per row
+REPORT_TABLE_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.beige, colors.white]),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+]
+
+# Row heights under REPORT_TABLE_STYLE: ReportLab's 12pt cell leading plus
+# 3pt top padding and 3pt (header: 12pt) bottom padding
+HEADER_ROW_HEIGHT = 12 + 3 + 12
+BODY_ROW_HEIGHT = 12 + 3 + 3
+
+
+class TableLayout:
+    """Column titles, widths and compiled base style of a report table
+
+    Layouts are module-level constants, so the TableStyle is built once per
+    process. Tables get fixed row heights for single-line rows, which spares
+    ReportLab from measuring every cell, the bulk of layout time on large tables.
+    """
+
+    def __init__(self, header: Sequence[str], col_widths: Sequence[float],
+                 base_style: Sequence[tuple] = REPORT_TABLE_STYLE):
+        self.header = list(header)
+        self.col_widths = list(col_widths)
+        self.style = TableStyle(base_style)
+
+    @staticmethod
+    def row_height(row: Sequence[Any]) -> Optional[float]:
+        # Multi-line cells are left for ReportLab to measure
+        for cell in row:
+            if not isinstance(cell, (int, float)) and "\n" in str(cell):
+                return None
+        return BODY_ROW_HEIGHT
+
+    def table(self, rows: List[Sequence[Any]], extra_styles: Sequence[tuple] = ()) -> LongTable:
+        """Build a table of rows under this layout's header
+
+        Args:
+            rows: Body rows
+            extra_styles: Style commands on top of the base style, e.g. from column_value_styles
+        """
+        table = LongTable(
+            [self.header] + list(rows),
+            colWidths=self.col_widths,
+            rowHeights=[HEADER_ROW_HEIGHT] + [self.row_height(row) for row in rows],
+            repeatRows=1
+        )
+        table.setStyle(self.style)
+        if extra_styles:
+            table.setStyle(TableStyle(list(extra_styles)))
+        return table
+
+
+def column_value_styles(rows: Iterable[Sequence[Any]], column: int, value_styles: Dict[Any, List[tuple]],
+                        first_row: int = 1) -> List[tuple]:
+    """Style a column by cell value with one range command per run of equal values
+
+    Args:
+        rows: Body rows in table order
+        column: Column whose value selects the style
+        value_styles: Value -> style commands without coordinates, e.g. {"Low": [('TEXTCOLOR', colors.orange)]}
+        first_row: Table row index of the first body row (1 below a header)
+
+    Returns:
+        Style commands such as ('TEXTCOLOR', (3, 4), (3, 9), colors.orange)
+    """
+    commands = []
+
+    def add_run(value, start: int, end: int) -> None:
+        for command in value_styles.get(value, ()):
+            commands.append((command[0], (column, start), (column, end)) + tuple(command[1:]))
+
+    run_value, run_start, index = None, None, first_row
+    for index, row in enumerate(rows, start=first_row):
+        value = row[column]
+        if run_start is not None and value != run_value:
+            add_run(run_value, run_start, index - 1)
+            run_start = None
+        if run_start is None:
+            run_value, run_start = value, index
+    if run_start is not None:
+        add_run(run_value, run_start, index)
+    return commands
+
+
+def report_header(title: str, info_lines: Sequence[str]) -> list:
+    """Title and info block that open every report, each followed by a spacer"""
+    return [
+        Paragraph(title, TITLE_STYLE),
+        Spacer(1, 0.25*inch),
+        Paragraph("<br/>".join(info_lines), INFO_STYLE),
+        Spacer(1, 0.25*inch)
+    ]
+
+
+# Column layouts of the report tables
+INVENTORY_TABLE = TableLayout(["Product ID", "Product Name", "Stock", "Status"],
+                              [0.8*inch, 3*inch, 0.8*inch, 1.2*inch])
+ORDER_TABLE = TableLayout(["Order ID", "Product", "Quantity", "Price", "Total", "Date"],
+                          [0.8*inch, 2*inch, 0.8*inch, 0.8*inch, 0.8*inch, 1*inch])
+INVOICE_TABLE = TableLayout(["Product", "Quantity", "Unit Price", "Total"],
+                            [2.5*inch, 1*inch, 1.25*inch, 1.25*inch])
+
+
+# Export the template pieces
+__all__ = [
+    "TableLayout", "column_value_styles", "report_header", "REPORT_TABLE_STYLE",
+    "TITLE_STYLE", "NORMAL_STYLE", "INFO_STYLE", "SUMMARY_STYLE", "INVOICE_SUMMARY_STYLE", "FOOTER_STYLE",
+    "INVENTORY_TABLE", "ORDER_TABLE", "INVOICE_TABLE"
+]
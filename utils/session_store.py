@@ -0,0 +1,246 @@
+from abc import ABC, abstractmethod
+import os
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# Default location for the shared session database
+data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# Conversations idle for longer than this start over
+DEFAULT_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 2 * 60 * 60))
+DEFAULT_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", 50000))
+DEFAULT_SWEEP_INTERVAL_SECONDS = int(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", 5 * 60))
+
+
+class SessionStore(ABC):
+    """Interface for per-user conversation state keyed by user id or phone number"""
+
+    @abstractmethod
+    def get(self, key: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Get the session data for a key and restart its TTL
+
+        Args:
+            key: The user id or phone number
+            default: Value returned when there is no live session
+
+        Returns:
+            A copy of the session data, or the default
+        """
+
+    @abstractmethod
+    def set(self, key: str, data: Dict[str, Any]) -> None:
+        """Replace the session data for a key and restart its TTL
+
+        Args:
+            key: The user id or phone number
+            data: JSON-serialisable session data
+        """
+
+    def update(self, key: str, **fields: Any) -> Dict[str, Any]:
+        """Merge fields into the session data for a key
+
+        Args:
+            key: The user id or phone number
+            **fields: Fields to set
+
+        Returns:
+            The updated session data
+        """
+        data = self.get(key) or {}
+        data.update(fields)
+        self.set(key, data)
+        return data
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the session for a key
+
+        Args:
+            key: The user id or phone number
+        """
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+class Session:
+    """Compact session record"""
+
+    __slots__ = ("data", "expires_at")
+
+    def __init__(self, data: Dict[str, Any], expires_at: float):
+        self.data = data
+        self.expires_at = expires_at
+
+
+class MemorySessionStore(SessionStore):
+    """In-process session store bounded by both size (LRU) and idle time (TTL)"""
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 time_func: Callable[[], float] = time.monotonic):
+        """Initialize the store
+
+        Args:
+            ttl_seconds: Idle time after which a session expires
+            max_entries: Maximum number of sessions; the least recently used are evicted first
+            time_func: Clock used for expiry (injectable for tests)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._time = time_func
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        now = self._time()
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                return default
+            if session.expires_at <= now:
+                del self._sessions[key]
+                return default
+            # Reading a session counts as activity, which keeps LRU and expiry order identical
+            session.expires_at = now + self.ttl_seconds
+            self._sessions.move_to_end(key)
+            return dict(session.data)
+
+    def set(self, key: str, data: Dict[str, Any]) -> None:
+        now = self._time()
+        with self._lock:
+            self._sessions[key] = Session(dict(data), now + self.ttl_seconds)
+            self._sessions.move_to_end(key)
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self, now: float) -> None:
+        # Least recently used sessions, which are also the first to expire, sit at the front
+        while len(self._sessions) > self.max_entries:
+            self._sessions.popitem(last=False)
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.expires_at > now:
+                break
+            self._sessions.popitem(last=False)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store in a SQLite file so that every worker on a host sees the same state"""
+
+    def __init__(self, db_path: str, namespace: str = "default", ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 sweep_interval_seconds: int = DEFAULT_SWEEP_INTERVAL_SECONDS,
+                 time_func: Callable[[], float] = time.time):
+        """Initialize the store
+
+        Args:
+            db_path: Path to the SQLite database file
+            namespace: Separates independent conversation flows sharing one file
+            ttl_seconds: Idle time after which a session expires
+            sweep_interval_seconds: Minimum time between expiry sweeps
+            time_func: Wall clock used for expiry (shared across processes)
+        """
+        self.db_path = db_path
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._time = time_func
+        self._local = threading.local()
+        self._next_sweep = self._time() + sweep_interval_seconds
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "namespace TEXT NOT NULL, session_key TEXT NOT NULL, data TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, PRIMARY KEY (namespace, session_key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        now = self._time()
+        self._maybe_sweep(now)
+        # Reading a session counts as activity and restarts its TTL, as in the memory store
+        row = self._connection().execute(
+            "UPDATE sessions SET expires_at = ? WHERE namespace = ? AND session_key = ? AND expires_at > ? "
+            "RETURNING data",
+            (now + self.ttl_seconds, self.namespace, key, now)
+        ).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def set(self, key: str, data: Dict[str, Any]) -> None:
+        now = self._time()
+        self._maybe_sweep(now)
+        self._connection().execute(
+            "INSERT INTO sessions (namespace, session_key, data, expires_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(namespace, session_key) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+            (self.namespace, key, json.dumps(data, ensure_ascii=False), now + self.ttl_seconds)
+        )
+
+    def delete(self, key: str) -> None:
+        self._connection().execute(
+            "DELETE FROM sessions WHERE namespace = ? AND session_key = ?",
+            (self.namespace, key)
+        )
+
+    def sweep_expired(self) -> int:
+        """Delete expired sessions in every namespace
+
+        Returns:
+            The number of sessions removed
+        """
+        cursor = self._connection().execute("DELETE FROM sessions WHERE expires_at <= ?", (self._time(),))
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE namespace = ? AND expires_at > ?",
+            (self.namespace, self._time())
+        ).fetchone()[0]
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval_seconds
+            self.sweep_expired()
+
+
+def create_session_store(namespace: str, backend: Optional[str] = None, db_path: Optional[str] = None) -> SessionStore:
+    """Create the session store configured for this deployment
+
+    Args:
+        namespace: Name of the conversation flow using the store
+        backend: 'memory' or 'sqlite'; defaults to the SESSION_BACKEND env variable
+        db_path: SQLite file path; defaults to the SESSION_DB env variable
+
+    Returns:
+        A session store instance
+    """
+    backend = backend or os.getenv("SESSION_BACKEND", "memory")
+    if backend == "sqlite":
+        db_path = db_path or os.getenv("SESSION_DB", os.path.join(data_dir, "sessions.db"))
+        return SQLiteSessionStore(db_path, namespace=namespace)
+    return MemorySessionStore()
+
+
+# Export the session store classes
+__all__ = ["SessionStore", "Session", "MemorySessionStore", "SQLiteSessionStore", "create_session_store"]
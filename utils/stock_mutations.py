@@ -0,0 +1,125 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from models.base import Product
+from utils.inventory_feed import record_changes
+
+# Columns returned for every changed product
+STOCK_RETURNING = (Product.id, Product.name, Product.stock, Product.version)
+
+
+def _apply(db: Session, seller_id: int, criteria, stock, expected_version: Optional[int] = None,
+           delta: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Run one UPDATE ... RETURNING against a single product and record it in the change feed
+
+    Every mutation bumps the product's version, so a caller holding an older
+    version can make its write conditional on nothing having changed since.
+    The caller commits.
+
+    Returns:
+        The changed product as {id, name, stock, version}, or None if no row matched
+    """
+    statement = update(Product).where(*criteria)
+    if expected_version is not None:
+        statement = statement.where(Product.version == expected_version)
+    row = db.execute(
+        statement.values(stock=stock, version=Product.version + 1)
+        .returning(*STOCK_RETURNING)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        return None
+    record_changes(db, [{"seller_id": seller_id, "product_id": row.id, "operation": "update", "name": row.name,
+                         "stock": row.stock, "previous_stock": row.stock - delta if delta is not None else None}])
+    return dict(row._mapping)
+
+
+def set_stock(db: Session, seller_id: int, product_id: int, stock: int,
+              expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Set a product's stock to an absolute value in one statement"""
+    return _apply(db, seller_id, [Product.id == product_id, Product.seller_id == seller_id], stock, expected_version)
+
+
+def set_stock_by_name(db: Session, seller_id: int, name: str, stock: int,
+                      expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Set the stock of a seller's product found by name in one statement
+
+    A name shared by several products updates the oldest one.
+    """
+    oldest = (select(func.min(Product.id))
+              .where(Product.seller_id == seller_id, Product.name == name)
+              .scalar_subquery())
+    return _apply(db, seller_id, [Product.id == oldest], stock, expected_version)
+
+
+def adjust_stock(db: Session, seller_id: int, product_id: int, delta: int,
+                 expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Add to or take from a product's stock in one statement
+
+    The change is made by the database (SET stock = stock + :delta), so
+    concurrent adjustments all count. A decrement only applies while enough
+    stock is left (WHERE stock >= :n); otherwise nothing changes and None
+    is returned, the same as for an unknown product.
+    """
+    criteria = [Product.id == product_id, Product.seller_id == seller_id]
+    if delta < 0:
+        criteria.append(Product.stock >= -delta)
+    return _apply(db, seller_id, criteria, func.coalesce(Product.stock, 0) + delta, expected_version, delta)
+
+
+def reserve_stock(db: Session, seller_id: int, product_id: int, quantity: int) -> Optional[Dict[str, Any]]:
+    """Take `quantity` units if they are all available, or nothing
+
+    Returns:
+        The product after the reservation, or None if it is unknown or short of stock
+    """
+    if quantity <= 0:
+        raise ValueError("Reserved quantity must be positive")
+    return adjust_stock(db, seller_id, product_id, -quantity)
+
+
+def set_stocks_by_name(db: Session, seller_id: int,
+                       stock_by_name: Dict[str, int]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Set the stock of several of a seller's products by name with one UPDATE
+
+    The products are looked up with one SELECT and changed together by
+    UPDATE ... SET stock = CASE id ... END. Like set_stock_by_name, a name
+    shared by several products updates the oldest one.
+
+    Returns:
+        (changed products in stock_by_name order, names that match no product)
+    """
+    product_ids = {}
+    for product_id, name in db.execute(
+        select(Product.id, Product.name)
+        .where(Product.seller_id == seller_id, Product.name.in_(list(stock_by_name)))
+        .order_by(Product.id)
+    ):
+        product_ids.setdefault(name, product_id)
+
+    stock_by_id = {product_ids[name]: stock for name, stock in stock_by_name.items() if name in product_ids}
+    changed = {}
+    if stock_by_id:
+        rows = db.execute(
+            update(Product)
+            .where(Product.id.in_(list(stock_by_id)))
+            .values(stock=case(stock_by_id, value=Product.id), version=Product.version + 1)
+            .returning(*STOCK_RETURNING)
+            .execution_options(synchronize_session=False)
+        )
+        changed = {row.id: dict(row._mapping) for row in rows}
+        record_changes(db, [{"seller_id": seller_id, "product_id": product["id"], "operation": "update",
+                             "name": product["name"], "stock": product["stock"], "previous_stock": None}
+                            for product in changed.values()])
+
+    updated = [changed[product_ids[name]] for name in stock_by_name
+               if name in product_ids and product_ids[name] in changed]
+    return updated, [name for name in stock_by_name if name not in product_ids]
+
+
+# Export the stock mutation helpers
+__all__ = [
+    "set_stock", "set_stock_by_name", "adjust_stock", "reserve_stock", "set_stocks_by_name"
+]
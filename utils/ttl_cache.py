@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """Small in-process result cache with a fixed time-to-live and LRU eviction
+
+    Unlike the session store, reads do not extend an entry's lifetime, so a
+    cached result is never served for longer than ttl_seconds.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10000,
+                 time_func: Callable[[], float] = time.monotonic):
+        """Initialize the cache
+
+        Args:
+            ttl_seconds: Seconds an entry stays valid after it is set
+            max_entries: Entries kept before the least recently used is evicted
+            time_func: Clock used for expiry (injectable for tests)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._time = time_func
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Get a live entry, or the default if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= self._time():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value for ttl_seconds"""
+        with self._lock:
+            self._entries[key] = (value, self._time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Export the cache class
+__all__ = ["TTLCache"]
@@ -0,0 +1,312 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("whatsapp_sender")
+
+GRAPH_API_URL = os.getenv("WHATSAPP_GRAPH_API_URL", "https://graph.facebook.com/v15.0")
+
+# Cloud API default throughput is 80 messages/second per phone number id
+DEFAULT_RATE_PER_SECOND = float(os.getenv("WHATSAPP_RATE_PER_SECOND", 80))
+DEFAULT_BURST = int(os.getenv("WHATSAPP_RATE_BURST", 80))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("WHATSAPP_MAX_CONCURRENCY", 20))
+DEFAULT_MAX_RETRIES = int(os.getenv("WHATSAPP_MAX_RETRIES", 3))
+
+# Statuses worth retrying: throttling and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class TokenBucket:
+    """Async token bucket limiting the send rate of one phone number id"""
+
+    def __init__(self, rate_per_second: float, capacity: int, time_func: Callable[[], float] = time.monotonic):
+        """Initialize the bucket
+
+        Args:
+            rate_per_second: Tokens added per second
+            capacity: Maximum tokens held, i.e. the allowed burst
+            time_func: Clock used for refills (injectable for tests)
+        """
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._time = time_func
+        self._tokens = float(capacity)
+        self._updated_at = time_func()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until one is available
+
+        Returns:
+            The number of seconds spent waiting
+        """
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = self._time()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate_per_second
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+class WhatsAppSender:
+    """Outbound WhatsApp Cloud API sender
+
+    A single long-lived HTTP client is shared by every send so that connections
+    (and TLS sessions) are reused. Sends are limited per phone number id by a
+    token bucket, bounded in flight by a semaphore, and retried with
+    exponential backoff on 429/5xx responses.
+    """
+
+    def __init__(self, access_token: Optional[str] = None, phone_number_id: Optional[str] = None,
+                 base_url: str = GRAPH_API_URL, rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+                 burst: int = DEFAULT_BURST, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, timeout: float = 10.0):
+        """Initialize the sender
+
+        Args:
+            access_token: Graph API access token; defaults to the ACCESS_TOKEN env variable
+            phone_number_id: Sending phone number id; defaults to the PHONE_NUMBER_ID env variable
+            base_url: Graph API base URL (point it at a stub server in tests)
+            rate_per_second: Sustained messages per second per phone number id
+            burst: Messages allowed back to back before rate limiting kicks in
+            max_concurrency: Maximum requests in flight
+            max_retries: Retries after the first attempt for retryable failures
+            backoff_base: First retry delay in seconds, doubled on every retry
+            backoff_max: Upper bound for a single retry delay
+            timeout: Request timeout in seconds
+        """
+        self.access_token = access_token or os.getenv("ACCESS_TOKEN")
+        self.phone_number_id = phone_number_id or os.getenv("PHONE_NUMBER_ID")
+        self.base_url = base_url.rstrip("/")
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.metrics = {
+            "sent": 0,
+            "failed": 0,
+            "retries": 0,
+            "throttled": 0,
+            "rate_limit_wait_seconds": 0.0,
+            "request_seconds": 0.0,
+        }
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared HTTP client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=HTTP2_AVAILABLE,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                ),
+                headers={"Authorization": f"Bearer {self.access_token}"}
+            )
+        return self._client
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _get_bucket(self, phone_number_id: str) -> TokenBucket:
+        bucket = self._buckets.get(phone_number_id)
+        if bucket is None:
+            bucket = TokenBucket(self.rate_per_second, self.burst)
+            self._buckets[phone_number_id] = bucket
+        return bucket
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None and response.headers.get("Retry-After"):
+            try:
+                return min(float(response.headers["Retry-After"]), self.backoff_max)
+            except ValueError:
+                pass
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        # Full jitter keeps retrying workers from hitting the API in lockstep
+        return random.uniform(0, delay)
+
+    async def post(self, path: str, phone_number_id: Optional[str] = None, **request_kwargs: Any) -> Optional[httpx.Response]:
+        """POST to the Graph API with rate limiting, bounded concurrency and retries
+
+        Args:
+            path: Path relative to the phone number id, e.g. 'messages'
+            phone_number_id: Sending phone number id; defaults to the configured one
+            **request_kwargs: Passed through to httpx (json, files, data, ...)
+
+        Returns:
+            The final response, or None if every attempt failed at the transport level
+        """
+        phone_number_id = phone_number_id or self.phone_number_id
+        url = f"/{phone_number_id}/{path}"
+        bucket = self._get_bucket(phone_number_id)
+
+        response = None
+        for attempt in range(self.max_retries + 1):
+            self.metrics["rate_limit_wait_seconds"] += await bucket.acquire()
+            async with self._get_semaphore():
+                started = time.perf_counter()
+                try:
+                    response = await self.client.post(url, **request_kwargs)
+                except httpx.TransportError as e:
+                    logger.warning(f"WhatsApp send to {url} failed: {e}")
+                    response = None
+                finally:
+                    self.metrics["request_seconds"] += time.perf_counter() - started
+
+            if response is not None and response.status_code not in RETRYABLE_STATUS_CODES:
+                return response
+            if response is not None and response.status_code == 429:
+                self.metrics["throttled"] += 1
+            if attempt < self.max_retries:
+                self.metrics["retries"] += 1
+                await asyncio.sleep(self._retry_delay(attempt, response))
+
+        return response
+
+    async def send_payload(self, payload: Dict[str, Any], phone_number_id: Optional[str] = None) -> bool:
+        """Send a Cloud API message payload
+
+        Args:
+            payload: The message body, without 'messaging_product'
+            phone_number_id: Sending phone number id; defaults to the configured one
+
+        Returns:
+            True if the message was accepted
+        """
+        response = await self.post(
+            "messages",
+            phone_number_id=phone_number_id,
+            json={"messaging_product": "whatsapp", **payload}
+        )
+        delivered = response is not None and response.status_code == 200
+        if delivered:
+            self.metrics["sent"] += 1
+        else:
+            self.metrics["failed"] += 1
+            status_code = response.status_code if response is not None else None
+            logger.error(f"WhatsApp message to {payload.get('to')} failed with status {status_code}")
+        return delivered
+
+    async def send_text(self, to: str, body: str, phone_number_id: Optional[str] = None) -> bool:
+        """Send a text message
+
+        Args:
+            to: Recipient phone number
+            body: Message text
+            phone_number_id: Sending phone number id; defaults to the configured one
+
+        Returns:
+            True if the message was accepted
+        """
+        return await self.send_payload({"to": to, "text": {"body": body}}, phone_number_id)
+
+    async def upload_media(self, content: bytes, filename: str, mime_type: str,
+                           phone_number_id: Optional[str] = None) -> Optional[str]:
+        """Upload a file to the Cloud API media endpoint
+
+        Args:
+            content: File bytes (kept in memory so retries can resend them)
+            filename: File name shown to the recipient
+            mime_type: e.g. 'application/pdf'
+            phone_number_id: Sending phone number id; defaults to the configured one
+
+        Returns:
+            The media id to reference in a message, or None if the upload failed
+        """
+        response = await self.post(
+            "media",
+            phone_number_id=phone_number_id,
+            data={"messaging_product": "whatsapp", "type": mime_type},
+            files={"file": (filename, content, mime_type)}
+        )
+        if response is None or response.status_code != 200:
+            status_code = response.status_code if response is not None else None
+            logger.error(f"WhatsApp media upload of {filename} failed with status {status_code}")
+            return None
+        return response.json().get("id")
+
+    async def send_document(self, to: str, media_id: str, filename: str, caption: Optional[str] = None,
+                            phone_number_id: Optional[str] = None) -> bool:
+        """Send an uploaded file as a document message
+
+        Args:
+            to: Recipient phone number
+            media_id: Id returned by upload_media
+            filename: File name shown to the recipient
+            caption: Optional text under the document
+            phone_number_id: Sending phone number id; defaults to the configured one
+
+        Returns:
+            True if the message was accepted
+        """
+        document = {"id": media_id, "filename": filename}
+        if caption:
+            document["caption"] = caption
+        return await self.send_payload({"to": to, "type": "document", "document": document}, phone_number_id)
+
+    async def send_batch(self, messages: Iterable[Tuple[str, str]], phone_number_id: Optional[str] = None) -> List[bool]:
+        """Send many text messages concurrently within the rate and concurrency limits
+
+        Args:
+            messages: (recipient, text) pairs
+            phone_number_id: Sending phone number id; defaults to the configured one
+
+        Returns:
+            Delivery results in the same order as the messages
+        """
+        return list(await asyncio.gather(
+            *(self.send_text(to, body, phone_number_id) for to, body in messages)
+        ))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get a snapshot of the delivery metrics
+
+        Returns:
+            Counters for sent, failed, retried and throttled messages plus time totals
+        """
+        return dict(self.metrics)
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Create a default sender instance
+whatsapp_sender = WhatsAppSender()
+
+# Export the sender classes and instance
+__all__ = ["TokenBucket", "WhatsAppSender", "whatsapp_sender"]